@@ -0,0 +1,48 @@
+# bench_car_matcher.py
+# 자동차 전처리(preprocessor_of_car) 처리량 측정: python -m bench.bench_car_matcher --rows 100000
+
+import argparse
+import random
+import time
+import pandas as pd
+from popup.preprocessing.car_processing.car_preprocessor import (
+    CAR_CATEGORY_CSV_PATH, CAR_BRAND_CSV_PATH, preprocessor_of_car
+)
+
+# 차종명 / 제조사 키워드 / 일반 문자열을 섞은 물건정보 생성
+def make_titles(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    cars = pd.read_csv(CAR_CATEGORY_CSV_PATH)['차종'].tolist()
+    brands = pd.read_csv(CAR_BRAND_CSV_PATH)['키워드'].tolist()
+    titles = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.6:
+            title = f"{rng.randint(2005, 2024)}년식 {rng.choice(cars)} 승용 ({rng.randint(10, 99)}가{rng.randint(1000, 9999)})"
+        elif r < 0.85:
+            title = f"{rng.choice(brands)} 차량 1대 (차대번호 KMH{rng.randint(100000, 999999)})"
+        else:
+            title = f"불용 차량 매각 {rng.randint(1, 999)}번"
+        titles.append(title)
+    return pd.DataFrame({'대분류': '자동차', '중분류': '승용차', '물건정보': titles})
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_titles(args.rows)
+    preprocessor_of_car(df.head(10))  # 워밍업
+
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        preprocessor_of_car(df)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    print(f"rows={args.rows} best={best:.3f}s rows/sec={args.rows / best:,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# bench_features.py
+# 요청당 특성 준비 비용 비교 (이전: 예측기마다 복사 / 날짜 변환, 이후: 공통 특성 한 번 생성)
+# python -m bench.bench_features --rows 1 --repeat 2000
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from popup.features import DATE_FEATURE_COLS, BID_COLS, build_features
+
+ROUND_COLS = ["대분류", "중분류", "기관"] + DATE_FEATURE_COLS + ["1차최저입찰가"]
+PRICE_COLS = ["대분류", "중분류", "기관"] + DATE_FEATURE_COLS + BID_COLS[:2]
+
+# 전처리 결과와 같은 형태의 입력 (이전 서버처럼 object로 변환한 요청 프레임 기준)
+def make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1500, n), unit="D")
+    df = pd.DataFrame({
+        "일련번호": [f"2024-{i:06d}-001" for i in range(n)],
+        "대분류": rng.choice(["물품", "자동차", "기계"], n),
+        "중분류": rng.choice(["기타", "승용차", "가전"], n),
+        "물건정보": "책상 외 10점",
+        "기관": rng.choice(["국방부", "기타", "지방자치단체"], n),
+        "최초입찰시기": dates.strftime("%Y-%m-%d %H:%M"),
+        "낙찰차수": 1,
+        "1차최저입찰가": rng.integers(10_000, 10_000_000, n),
+    })
+    for col in BID_COLS[1:]:
+        df[col] = pd.NA
+    return df.astype("object")
+
+# 이전 방식: 예측기(차수, 가격)마다 복사 + 날짜 변환 + 파생 변수 + 입력 복사
+def _legacy_prepare(df: pd.DataFrame):
+    for col in BID_COLS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    outputs = []
+    for cols, copy_x in ((ROUND_COLS, False), (PRICE_COLS, True)):
+        df_new = df.copy()
+        df_new["최초입찰시기"] = pd.to_datetime(df_new["최초입찰시기"])
+        df_new["최초입찰_연도"] = df_new["최초입찰시기"].dt.year
+        df_new["최초입찰_월"] = df_new["최초입찰시기"].dt.month
+        df_new["최초입찰_일"] = df_new["최초입찰시기"].dt.day
+        df_new["최초입찰_요일"] = df_new["최초입찰시기"].dt.weekday
+        X = df_new[cols].copy() if copy_x else df_new[cols]
+        outputs.append(X)
+    return outputs
+
+# 이후 방식: 특성 한 번 생성, 예측기는 같은 프레임에서 칼럼만 선택
+def _shared_prepare(df: pd.DataFrame):
+    df = build_features(df)
+    return [df[ROUND_COLS], df[PRICE_COLS]]
+
+def measure(fn, frame: pd.DataFrame, repeat: int) -> tuple:
+    fn(frame.copy())  # 워밍업
+
+    # 지연 시간: 입력 복사는 측정에서 제외
+    inputs = [frame.copy() for _ in range(repeat)]
+    start = time.perf_counter()
+    for df in inputs:
+        fn(df)
+    latency = (time.perf_counter() - start) / repeat
+
+    # 메모리: 호출 1회 후 남아 있는 할당 블록 수(결과 포함)와 최대 사용량
+    df = frame.copy()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    result = fn(df)
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(max(s.count_diff, 0) for s in after.compare_to(before, "lineno"))
+    del result
+    return latency, blocks, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    frame = make_frame(args.rows)
+    for name, fn in (("before", _legacy_prepare), ("after", _shared_prepare)):
+        latency, blocks, peak = measure(fn, frame, args.repeat)
+        print(f"{name:6s} rows={args.rows} latency={latency * 1e3:.3f}ms "
+              f"retained_blocks={blocks} peak={peak / 1024:.1f}KiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# fixtures.py
+# 오프라인 부하 테스트용 로컬 대체물 생성: 작은 학습 모델(로컬 모델 저장소), SQLite DB, 요청 본문(JSONL)
+# python -m bench.fixtures --out bench_data
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.neighbors import KernelDensity
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder
+from xgboost import XGBClassifier, XGBRegressor
+from popup.features import DATE_FEATURE_COLS, BID_COLS, build_features
+from popup.registry import ARTIFACTS, add_artifact, verify
+from popup.preprocessing.car_processing.car_preprocessor import CAR_CATEGORY_CSV_PATH
+from popup.preprocessing.preprocessing.preprocessor import _MAP_KEYWORDS_CSV_PATH
+
+TARGET_COL = "낙찰가율_최초최저가기준"
+ETC_CATEGORIES = [("물품", "가전"), ("물품", "사무기기"), ("기계", "공작기계"), ("물품", "기타")]
+CAR_BASE_COLS = ["대분류", "중분류", "소분류", "제조사", "차종", "기관"]
+ETC_BASE_COLS = ["대분류", "중분류", "기관"]
+
+# 경매 결과 형태의 합성 데이터: DB 행과 학습 데이터로 함께 사용
+def make_rows(n: int, car_share: float = 0.4, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cars = pd.read_csv(CAR_CATEGORY_CSV_PATH)
+    agencies = pd.read_csv(_MAP_KEYWORDS_CSV_PATH, encoding="utf-8-sig")
+
+    is_car = rng.random(n) < car_share
+    car_rows = cars.iloc[rng.integers(0, len(cars), n)].reset_index(drop=True)
+    etc_rows = [ETC_CATEGORIES[i] for i in rng.integers(0, len(ETC_CATEGORIES), n)]
+    dates = pd.Timestamp("2019-01-01") + pd.to_timedelta(rng.integers(0, 2000, n), unit="D") \
+        + pd.to_timedelta(rng.choice([10, 11, 14], n), unit="h")
+    first_bid = np.round(rng.lognormal(15, 1.2, n), -3)
+
+    df = pd.DataFrame({
+        "일련번호": [f"{d.year}-{i:05d}-001" for i, d in enumerate(dates)],
+        "대분류": np.where(is_car, "자동차", [m for m, _ in etc_rows]),
+        "중분류": np.where(is_car, car_rows["중분류"], [s for _, s in etc_rows]),
+        "소분류": np.where(is_car, car_rows["소분류"], None),
+        "제조사": np.where(is_car, car_rows["제조사"], None),
+        "차종": np.where(is_car, car_rows["차종"], None),
+        "물건정보": np.where(is_car, [f"{y}년식 {c}" for y, c in zip(rng.integers(2005, 2024, n), car_rows["차종"])],
+                           "불용품 일괄 매각"),
+        "기관": agencies["group"].to_numpy()[rng.integers(0, len(agencies), n)],
+        "최초입찰시기": dates.strftime("%Y-%m-%d %H:%M"),
+        "낙찰차수": rng.choice([1, 2, 3, 4, 5], n, p=[0.45, 0.25, 0.15, 0.1, 0.05]),
+    })
+
+    # 차수마다 10%씩 낮아지는 최저입찰가 (낙찰 차수 이후는 결측)
+    for order, col in enumerate(BID_COLS, start=1):
+        df[col] = np.where(df["낙찰차수"] >= order, first_bid * (1 - 0.1 * (order - 1)), np.nan)
+    df[TARGET_COL] = np.clip(rng.normal(1.05 - 0.08 * df["낙찰차수"], 0.15), 0.2, 2.5)   # 1차 최저입찰가 대비 비율
+    return df
+
+# 모델 학습 입력: 전처리 결과와 같은 공통 특성 생성
+def _features(df: pd.DataFrame) -> pd.DataFrame:
+    return build_features(df.copy())
+
+def _pipeline(cat_cols: list, estimator, step: str) -> Pipeline:
+    preprocessor = ColumnTransformer(
+        transformers=[("ohe", OneHotEncoder(handle_unknown="ignore"), cat_cols)],
+        remainder="passthrough"
+    )
+    return Pipeline([("preprocessor", preprocessor), (step, estimator)])
+
+# KDE 누적분포 (학습 스크립트와 같은 형태의 dict)
+def _kde_dict(values, num_grid: int = 1000, margin: float = 0.5, bandwidth: float = 0.05) -> dict:
+    values = np.asarray(values, dtype=float).reshape(-1, 1)
+    x_min, x_max = values.min() - margin, values.max() + margin
+    x_range = np.linspace(x_min, x_max, num_grid).reshape(-1, 1)
+    kde = KernelDensity(kernel="gaussian", bandwidth=bandwidth).fit(values)
+    cdf = np.cumsum(np.exp(kde.score_samples(x_range))) * (x_range[1, 0] - x_range[0, 0])
+    return {"kde": kde, "x_range": x_range.flatten(), "cdf": cdf, "x_min": x_min, "x_max": x_max}
+
+# 작은 모델을 학습해 로컬 모델 저장소에 등록 (서버는 ONBID_MODEL_DIR / ONBID_MODEL_OFFLINE=1로 사용)
+def build_models(model_dir: str, rows: pd.DataFrame, n_estimators: int = 20):
+    df = _features(rows)
+    artifacts = {}
+
+    # 낙찰 차수 분류
+    label_encoder = LabelEncoder()
+    y_round = label_encoder.fit_transform(df["낙찰차수"].astype(str))
+    round_cols = ETC_BASE_COLS + DATE_FEATURE_COLS + ["1차최저입찰가"]
+    pipeline = _pipeline(ETC_BASE_COLS, XGBClassifier(n_estimators=n_estimators, max_depth=3,
+                                                      eval_metric="mlogloss", random_state=42), "classifier")
+    pipeline.fit(df[round_cols], y_round)
+    artifacts[("asteroidddd/onbid-map-round", "auction_pipeline.pkl")] = pipeline
+    artifacts[("asteroidddd/onbid-map-round", "label_encoder.pkl")] = label_encoder
+
+    # 차수별 낙찰가율 회귀 (자동차 / 기타)
+    for repo, is_car, base_cols in (("asteroidddd/onbid-map-carp", True, CAR_BASE_COLS),
+                                    ("asteroidddd/onbid-map-etcp", False, ETC_BASE_COLS)):
+        subset = df[(df["대분류"] == "자동차") == is_car]
+        for order in range(1, 6):
+            cols = base_cols + DATE_FEATURE_COLS + BID_COLS[:order]
+            pipeline = _pipeline(base_cols, XGBRegressor(n_estimators=n_estimators, max_depth=4, random_state=42),
+                                 "regressor")
+            pipeline.fit(subset[cols], subset[TARGET_COL])
+            artifacts[(repo, f"models_by_order/order{order}/pipeline.pkl")] = pipeline
+
+    # 낙찰가율 분포 (전체 / 대분류 / 중분류)
+    values = df[TARGET_COL]
+    artifacts[("asteroidddd/onbid-map-prob", "models/overall_dict.pkl")] = _kde_dict(values)
+    artifacts[("asteroidddd/onbid-map-prob", "models/major_dict.pkl")] = {
+        k: _kde_dict(g[TARGET_COL]) for k, g in df.groupby("대분류") if len(g) >= 2}
+    artifacts[("asteroidddd/onbid-map-prob", "models/minor_dict.pkl")] = {
+        k: _kde_dict(g[TARGET_COL]) for k, g in df.groupby("중분류") if len(g) >= 2}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for (repo_id, filename), obj in artifacts.items():
+            src = os.path.join(tmp, "artifact.pkl")
+            joblib.dump(obj, src)
+            add_artifact(repo_id, filename, src, "fixture", model_dir)
+
+    missing = verify(model_dir, ARTIFACTS)
+    if missing:
+        raise RuntimeError(f"누락된 모델 파일: {missing}")
+
+# Snowflake 대신 사용할 SQLite DB (ONBID_DB_BACKEND=sqlite, ONBID_DB_SQLITE_PATH)
+def build_db(path: str, rows: pd.DataFrame):
+    if os.path.exists(path):
+        os.remove(path)
+    results_cols = ["일련번호", "대분류", "중분류", "물건정보", "기관", "최초입찰시기", "낙찰차수"] + BID_COLS + [TARGET_COL]
+    car_cols = ["일련번호", "대분류", "중분류", "소분류", "제조사", "차종", "물건정보", "기관", "최초입찰시기",
+                "낙찰차수"] + BID_COLS + [TARGET_COL]
+    conn = sqlite3.connect(path)
+    try:
+        rows[results_cols].to_sql("ONBID_RESULTS", conn, index=False)
+        rows.loc[rows["대분류"] == "자동차", car_cols].to_sql("CAR_TABLE", conn, index=False)
+        conn.execute('CREATE INDEX idx_results_serial ON ONBID_RESULTS ("일련번호")')
+        conn.execute('CREATE INDEX idx_car_serial ON CAR_TABLE ("일련번호")')
+        conn.commit()
+    finally:
+        conn.close()
+
+# 클라이언트가 보내는 형태의 요청 본문 (일부는 DB에 없는 물건, 일부는 같은 물건 반복)
+def build_payloads(path: str, rows: pd.DataFrame, n: int, miss_share: float = 0.3,
+                   repeat_share: float = 0.3, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(n):
+        if records and rng.random() < repeat_share:
+            records.append(records[rng.integers(0, len(records))])
+            continue
+        row = rows.iloc[rng.integers(0, len(rows))]
+        serial = row["일련번호"] if rng.random() >= miss_share else f"2099-{i:05d}-001"
+        min_bid = int(row["1차최저입찰가"] * rng.choice([1.0, 0.9, 0.8]))
+        payload = {
+            "id": serial,
+            "category": f"[{row['대분류']} / {row['중분류']}]",
+            "mainCategory": row["대분류"],
+            "subCategory": row["중분류"],
+            "title": row["물건정보"],
+            "endDate": row["최초입찰시기"],
+            "agency": row["기관"],
+            "minBidPrice": f"{min_bid:,}",
+            "failureCount": str(int(row["낙찰차수"]) - 1),
+            "bidAmount": int(min_bid * rng.uniform(0.9, 1.2)),
+        }
+        endpoint = "/predict" if rng.random() < 0.6 else "/prob_predict"
+        records.append({"endpoint": endpoint, "payload": payload})
+
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+# 대체물 전체 생성 후 서버 실행용 환경 변수 반환
+def build_all(out_dir: str, rows: int = 3000, payloads: int = 2000, seed: int = 0) -> dict:
+    os.makedirs(out_dir, exist_ok=True)
+    data = make_rows(rows, seed=seed)
+    model_dir = os.path.join(out_dir, "models")
+    db_path = os.path.join(out_dir, "onbid.sqlite3")
+    payload_path = os.path.join(out_dir, "payloads.jsonl")
+
+    build_models(model_dir, data)
+    build_db(db_path, data)
+    build_payloads(payload_path, data, payloads, seed=seed)
+    return fixture_env(out_dir)
+
+# 대체물을 사용하도록 서버에 넘길 환경 변수
+def fixture_env(out_dir: str) -> dict:
+    return {
+        "ONBID_MODEL_DIR": os.path.abspath(os.path.join(out_dir, "models")),
+        "ONBID_MODEL_OFFLINE": "1",
+        "ONBID_DB_BACKEND": "sqlite",
+        "ONBID_DB_SQLITE_PATH": os.path.abspath(os.path.join(out_dir, "onbid.sqlite3")),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 부하 테스트용 모델 / DB / 요청 본문 생성")
+    parser.add_argument("--out", default="bench_data")
+    parser.add_argument("--rows", type=int, default=3000, help="합성 경매 결과 행 수 (DB, 학습 데이터)")
+    parser.add_argument("--payloads", type=int, default=2000, help="요청 본문 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = build_all(args.out, args.rows, args.payloads, args.seed)
+    print(f"생성 완료: {args.out}")
+    for key, value in env.items():
+        print(f"  {key}={value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# loadtest.py
+# 예측 서버 부하 테스트: 기록한(또는 생성한) 요청 본문을 동시 연결 N개로 재생하고 엔드포인트별 처리량 / 지연 시간 분위수 보고
+#
+# 요청 기록:   ONBID_RECORD=requests_log.jsonl python -m popup.serve
+# 재생:        python -m bench.loadtest replay --payloads requests_log.jsonl --concurrency 8 --duration 30
+# 오프라인 실행: python -m bench.loadtest run --fixtures bench_data --concurrency 8 --duration 30
+#              (로컬 모델 저장소 / SQLite DB / 요청 본문을 생성한 뒤 서버를 띄워 재생)
+
+import argparse
+import http.client
+import itertools
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+import numpy as np
+
+PERCENTILES = (50, 90, 99)
+
+# JSONL 요청 본문 읽기: {"endpoint": 경로, "payload": 본문} (popup.recorder 기록 형식)
+def load_payloads(path: str, endpoints: list | None = None) -> list:
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if endpoints and record["endpoint"] not in endpoints:
+                continue
+            records.append((record["endpoint"], json.dumps(record["payload"], ensure_ascii=False).encode("utf-8")))
+    if not records:
+        raise ValueError(f"재생할 요청이 없습니다: {path}")
+    return records
+
+# 요청 하나 전송: (상태 코드, 지연 시간(초)), 연결 오류는 상태 코드 0
+def _send(host: str, port: int, endpoint: str, body: bytes, timeout: float) -> tuple:
+    start = time.perf_counter()
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request("POST", endpoint, body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        status = response.status
+    except (OSError, http.client.HTTPException):
+        status = 0
+    finally:
+        conn.close()
+    return status, time.perf_counter() - start
+
+# 동시 연결 concurrency개로 재생 (requests개를 보내거나 duration초 동안 반복, 워밍업 구간은 집계 제외)
+def replay(url: str, records: list, concurrency: int = 8, requests: int | None = None,
+           duration: float | None = None, warmup: float = 0.0, timeout: float = 30.0) -> dict:
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+
+    order = itertools.cycle(records)
+    lock = threading.Lock()
+    samples = []   # (엔드포인트, 상태 코드, 지연 시간)
+    sent = [0]
+
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = None if duration is None else measure_from + duration
+    limit = len(records) if requests is None and duration is None else requests
+
+    def worker():
+        local = []
+        while True:
+            with lock:
+                if limit is not None and sent[0] >= limit:
+                    break
+                sent[0] += 1
+                endpoint, body = next(order)
+            now = time.perf_counter()
+            if stop_at is not None and now >= stop_at:
+                break
+            status, latency = _send(host, port, endpoint, body, timeout)
+            if now >= measure_from:
+                local.append((endpoint, status, latency))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - max(measure_from, start)
+    return summarize(samples, elapsed, concurrency)
+
+# 엔드포인트별 / 전체 처리량, 지연 시간 분위수(ms), 상태 코드 분포
+def summarize(samples: list, elapsed: float, concurrency: int) -> dict:
+    def stats(rows: list) -> dict:
+        latencies = np.array([r[2] for r in rows]) * 1000
+        statuses = {}
+        for r in rows:
+            statuses[str(r[1])] = statuses.get(str(r[1]), 0) + 1
+        result = {
+            "requests": len(rows),
+            "rps": round(len(rows) / elapsed, 1) if elapsed > 0 else 0.0,
+            "status": statuses,
+        }
+        if len(rows):
+            for p in PERCENTILES:
+                result[f"p{p}_ms"] = round(float(np.percentile(latencies, p)), 2)
+            result["max_ms"] = round(float(latencies.max()), 2)
+        return result
+
+    report = {"elapsed_seconds": round(elapsed, 2), "concurrency": concurrency, "endpoints": {}}
+    for endpoint in sorted({r[0] for r in samples}):
+        report["endpoints"][endpoint] = stats([r for r in samples if r[0] == endpoint])
+    report["total"] = stats(samples)
+    return report
+
+def print_report(report: dict):
+    print(f"동시 연결 {report['concurrency']}개, 측정 {report['elapsed_seconds']}초")
+    header = f"{'endpoint':<16}{'requests':>10}{'rps':>10}" + "".join(f"{f'p{p}(ms)':>11}" for p in PERCENTILES) \
+        + f"{'max(ms)':>11}  status"
+    print(header)
+    rows = list(report["endpoints"].items()) + [("total", report["total"])]
+    for name, s in rows:
+        line = f"{name:<16}{s['requests']:>10}{s['rps']:>10}"
+        line += "".join(f"{s.get(f'p{p}_ms', '-'):>11}" for p in PERCENTILES) + f"{s.get('max_ms', '-'):>11}"
+        line += "  " + " ".join(f"{k}:{v}" for k, v in sorted(s["status"].items()))
+        print(line)
+
+# 서버가 모델을 로드하고 응답할 때까지 대기
+def wait_ready(url: str, timeout: float = 120.0):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=2)
+            conn.request("GET", "/health")
+            body = json.loads(conn.getresponse().read())
+            conn.close()
+            if body.get("model_loaded"):
+                return
+        except (OSError, ValueError, http.client.HTTPException):
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"서버가 {timeout}초 안에 준비되지 않았습니다: {url}")
+
+# 대체물을 사용하는 서버 실행 (운영 서버 또는 개발 서버)
+def start_server(env: dict, port: int, server: str = "serve", workers: int = 1, threads: int | None = None,
+                 log_path: str | None = None) -> subprocess.Popen:
+    server_env = {**os.environ, **env, "ONBID_PORT": str(port), "ONBID_HOST": "127.0.0.1"}
+    if server == "serve":
+        cmd = [sys.executable, "-m", "popup.serve", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers)]
+        if threads is not None:
+            cmd += ["--threads", str(threads)]
+    else:
+        cmd = [sys.executable, "-c", f"from popup.server import app; app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    log = open(log_path, "w") if log_path else subprocess.DEVNULL
+    return subprocess.Popen(cmd, env=server_env, stdout=log, stderr=subprocess.STDOUT)
+
+def stop_server(proc: subprocess.Popen, timeout: float = 30.0):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+def _add_replay_args(parser):
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 연결 수")
+    parser.add_argument("--requests", type=int, default=None, help="보낼 요청 수 (기본: 파일 전체 한 번)")
+    parser.add_argument("--duration", type=float, default=None, help="측정 시간(초), 지정하면 요청 본문을 반복 재생")
+    parser.add_argument("--warmup", type=float, default=0.0, help="집계에서 제외할 시작 구간(초)")
+    parser.add_argument("--endpoint", action="append", help="재생할 엔드포인트만 선택 (여러 번 지정 가능)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="요청당 시간 제한(초)")
+    parser.add_argument("--json", dest="json_path", default=None, help="결과를 JSON 파일로 저장 (회귀 추적용)")
+
+def _run_replay(args, url: str, payloads: str) -> dict:
+    records = load_payloads(payloads, args.endpoint)
+    report = replay(url, records, args.concurrency, args.requests, args.duration, args.warmup, args.timeout)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="예측 서버 부하 테스트 (요청 본문 재생)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_replay = sub.add_parser("replay", help="실행 중인 서버에 요청 본문 재생")
+    p_replay.add_argument("--url", default="http://127.0.0.1:5001")
+    p_replay.add_argument("--payloads", required=True, help="요청 본문 JSONL (ONBID_RECORD 기록 또는 bench.fixtures 생성)")
+    _add_replay_args(p_replay)
+
+    p_run = sub.add_parser("run", help="로컬 대체물(모델 / SQLite)로 서버를 띄워 재생 후 종료")
+    p_run.add_argument("--fixtures", default="bench_data", help="bench.fixtures 출력 디렉토리 (없으면 생성)")
+    p_run.add_argument("--payloads", default=None, help="요청 본문 JSONL (기본: 대체물 디렉토리의 payloads.jsonl)")
+    p_run.add_argument("--server", choices=["serve", "dev"], default="serve")
+    p_run.add_argument("--port", type=int, default=5099)
+    p_run.add_argument("--workers", type=int, default=1)
+    p_run.add_argument("--threads", type=int, default=None, help="프로세스당 스레드 수 (기본: 운영 서버 기본값)")
+    p_run.add_argument("--env", action="append", default=[], help="서버에 넘길 환경 변수 KEY=VALUE (여러 번 지정 가능)")
+    _add_replay_args(p_run)
+
+    args = parser.parse_args()
+    if args.command == "replay":
+        _run_replay(args, args.url, args.payloads)
+        return
+
+    from .fixtures import build_all, fixture_env
+    if os.path.exists(os.path.join(args.fixtures, "onbid.sqlite3")):
+        env = fixture_env(args.fixtures)
+    else:
+        print(f"대체물 생성: {args.fixtures}")
+        env = build_all(args.fixtures)
+    env.update(item.split("=", 1) for item in args.env)
+
+    url = f"http://127.0.0.1:{args.port}"
+    proc = start_server(env, args.port, args.server, args.workers, args.threads,
+                        log_path=os.path.join(args.fixtures, "server.log"))
+    try:
+        wait_ready(url)
+        _run_replay(args, url, args.payloads or os.path.join(args.fixtures, "payloads.jsonl"))
+    finally:
+        stop_server(proc)
+
+if __name__ == "__main__":
+    main()
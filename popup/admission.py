@@ -0,0 +1,67 @@
+# admission.py
+
+import os
+import threading
+import time
+from .metrics import ADMISSION
+
+# 설정: 환경 변수로 변경 가능 (프로세스 단위)
+CHEAP_LIMIT     = int(os.getenv("ONBID_ADMIT_CHEAP", "64"))          # 가벼운 요청 동시 처리 수 (/health, 캐시 적중 등)
+EXPENSIVE_LIMIT = int(os.getenv("ONBID_ADMIT_EXPENSIVE", str(2 * (os.cpu_count() or 1))))  # 전체 예측 동시 처리 수
+QUEUE_LIMIT     = int(os.getenv("ONBID_ADMIT_QUEUE", str(2 * (os.cpu_count() or 1))))      # 자리를 기다릴 수 있는 요청 수 (넘으면 429)
+QUEUE_WAIT      = float(os.getenv("ONBID_ADMIT_WAIT_MS", "500")) / 1000   # 최대 대기 시간(초) (넘으면 503)
+RETRY_AFTER     = int(os.getenv("ONBID_RETRY_AFTER", "1"))           # Retry-After 헤더(초)
+
+# 거절 사유: 대기열이 가득 참(429) / 기다렸지만 자리가 나지 않음(503)
+class Rejected(Exception):
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+# 동시 처리 수 제한 + 크기가 제한된 대기열
+class Limiter:
+
+    def __init__(self, name: str, limit: int, queue: int = QUEUE_LIMIT, wait: float = QUEUE_WAIT):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue = max(0, queue)
+        self.wait = wait
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+
+    # 자리 확보: 바로 들어가거나, 대기열에서 최대 timeout초 기다림 (실패 시 Rejected)
+    def acquire(self, timeout: float | None = None):
+        wait = self.wait if timeout is None else min(self.wait, timeout)
+        with self._cond:
+            if self._active < self.limit:
+                self._active += 1
+                ADMISSION.inc(cls=self.name, result='admitted')
+                return
+            if self._waiting >= self.queue:
+                ADMISSION.inc(cls=self.name, result='rejected_429')
+                raise Rejected(429, '요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요')
+
+            self._waiting += 1
+            deadline = time.monotonic() + wait
+            try:
+                while self._active >= self.limit:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        ADMISSION.inc(cls=self.name, result='rejected_503')
+                        raise Rejected(503, '서버가 바빠 요청을 처리하지 못했습니다. 잠시 후 다시 시도해 주세요')
+                    self._cond.wait(remaining)
+                self._active += 1
+                ADMISSION.inc(cls=self.name, result='queued')
+            finally:
+                self._waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {'active': self._active, 'waiting': self._waiting, 'limit': self.limit, 'queue': self.queue}
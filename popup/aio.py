@@ -0,0 +1,59 @@
+# aio.py
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .deadline import TIMEOUT_ERRORS
+
+# 설정: 환경 변수로 변경 가능
+ASYNC_ENABLED = os.getenv("ONBID_ASYNC", "1") == "1"                        # 0이면 DB 조회와 전처리를 순서대로 실행
+IO_WORKERS    = int(os.getenv("ONBID_IO_WORKERS", "16"))                    # DB 조회 스레드 수
+CPU_WORKERS   = int(os.getenv("ONBID_CPU_WORKERS", str(os.cpu_count() or 1)))  # 전처리 / 모델 계산 스레드 수 (동시 실행 상한)
+
+# 프로세스당 이벤트 루프 1개 (전용 스레드에서 실행) + I/O용, CPU용 스레드 풀
+# 요청 처리 스레드는 코루틴을 루프에 제출하고 결과를 기다림 (fork 이후에는 자식 프로세스에서 다시 생성)
+class _Runtime:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self.loop = None
+        self.io = None
+        self.cpu = None
+
+    def get(self):
+        if self._pid == os.getpid():
+            return self
+        with self._lock:
+            if self._pid != os.getpid():
+                self.loop = asyncio.new_event_loop()
+                self.io = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="aio-io")
+                self.cpu = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="aio-cpu")
+                threading.Thread(target=self.loop.run_forever, name="aio-loop", daemon=True).start()
+                self._pid = os.getpid()
+        return self
+
+_runtime = _Runtime()
+
+# 동기 코드(Flask 요청 스레드)에서 코루틴 실행 후 결과 반환 (시간 초과 시 코루틴 취소)
+def run(coro, timeout: float | None = None):
+    rt = _runtime.get()
+    future = asyncio.run_coroutine_threadsafe(coro, rt.loop)
+    try:
+        return future.result(timeout)
+    except TIMEOUT_ERRORS:
+        future.cancel()
+        raise
+
+# 동기 코드에서 I/O 작업을 I/O 스레드 풀에 제출 (concurrent.futures.Future 반환)
+def submit_io(fn, *args):
+    return _runtime.get().io.submit(fn, *args)
+
+# 네트워크 I/O(DB 조회 등)를 I/O 스레드 풀에서 실행
+async def to_io(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_runtime.get().io, fn, *args)
+
+# CPU 작업(전처리, 모델 예측)을 크기가 제한된 CPU 스레드 풀에서 실행
+async def to_cpu(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_runtime.get().cpu, fn, *args)
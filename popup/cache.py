@@ -0,0 +1,98 @@
+# cache.py
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from .metrics import CACHE_LOOKUPS
+
+# 설정: 환경 변수로 변경 가능
+CACHE_ENABLED = os.getenv("ONBID_CACHE", "1") == "1"
+CACHE_SIZE    = int(os.getenv("ONBID_CACHE_SIZE", "4096"))   # 최대 물건 수
+CACHE_TTL     = float(os.getenv("ONBID_CACHE_TTL", "600"))   # 유효 시간(초)
+
+# 물건 키에 사용하는 클라이언트 JSON 필드 (일련번호, 카테고리, 최저입찰가, 유찰횟수, 개찰일시)
+KEY_FIELDS = ('id', 'category', 'minBidPrice', 'failureCount', 'endDate')
+NUMERIC_FIELDS = ('minBidPrice', 'failureCount')
+
+def _normalize(value, numeric: bool = False) -> str:
+    if value is None:
+        return ''
+    text = str(value).strip()
+    if numeric:
+        # "1,000,000" / 1000000 / 1000000.0 -> "1000000"
+        try:
+            number = float(text.replace(',', '').replace('원', '').strip())
+        except ValueError:
+            return text
+        return str(int(number)) if number.is_integer() else repr(number)
+    return ' '.join(text.split())
+
+# 물건 키: 정규화한 필드 값의 해시 (입찰가 등 물건과 무관한 값은 포함하지 않음)
+def item_key(data: dict) -> str:
+    parts = [_normalize(data.get(f), f in NUMERIC_FIELDS) for f in KEY_FIELDS]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+# 크기 제한 + 유효 시간이 있는 LRU 캐시
+class TTLCache:
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # 키 -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    # 조회: 없거나 만료되었으면 None
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+            else:
+                self._data.move_to_end(key)
+                self._hits += 1
+        CACHE_LOOKUPS.inc(result='miss' if entry is None else 'hit')
+        return None if entry is None else entry[1]
+
+    # 통계 / LRU 순서를 바꾸지 않고 조회 (요청 분류용)
+    def peek(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    # 저장: 크기를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # 적중률 통계
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._data),
+                'max_size': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,342 @@
+# db.py
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import NamedTuple
+from .features import BID_COLS
+
+SERIAL_COL = "일련번호"
+ROUND_COL  = "낙찰차수"
+DB_NAME    = "ONVID_DB"
+SCHEMA     = "ANALYSIS"
+
+# 설정: 환경 변수로 변경 가능
+DB_BACKEND      = os.getenv("ONBID_DB_BACKEND", "snowflake")       # snowflake | sqlite
+SQLITE_PATH     = os.getenv("ONBID_DB_SQLITE_PATH", "onbid.sqlite3")
+MIRROR_PATH     = os.getenv("ONBID_DB_MIRROR", "")                 # 로컬 미러 파일 (비어 있으면 사용 안 함)
+POOL_SIZE       = int(os.getenv("ONBID_DB_POOL_SIZE", "4"))
+POOL_WAIT       = float(os.getenv("ONBID_DB_POOL_WAIT", "10"))      # 풀 대기 시간(초)
+LOGIN_TIMEOUT   = int(os.getenv("ONBID_DB_LOGIN_TIMEOUT", "10"))    # 접속 시간 제한(초)
+NETWORK_TIMEOUT = int(os.getenv("ONBID_DB_NETWORK_TIMEOUT", "30"))  # 네트워크 시간 제한(초)
+QUERY_TIMEOUT   = int(os.getenv("ONBID_DB_QUERY_TIMEOUT", "10"))    # 쿼리 시간 제한(초)
+IN_BATCH        = int(os.getenv("ONBID_DB_IN_BATCH", "500"))        # 일괄 조회 쿼리당 일련번호 수
+
+# 이력 조회 칼럼: 모델 입력에 쓰는 칼럼만 조회 (자동차 / 기타), 낙찰차수는 SQL에서 계산
+ETC_HISTORY_COLS = [SERIAL_COL, '대분류', '중분류', '물건정보', '기관', '최초입찰시기'] + BID_COLS
+CAR_HISTORY_COLS = [SERIAL_COL, '대분류', '중분류', '소분류', '제조사', '차종', '물건정보', '기관', '최초입찰시기'] + BID_COLS
+
+def history_cols(is_car: bool) -> list:
+    return CAR_HISTORY_COLS if is_car else ETC_HISTORY_COLS
+
+# 조회 칼럼 + 낙찰차수(처음 비어 있는 차수, 모두 있으면 5) 계산식 (Snowflake / SQLite 공통 SQL)
+def history_select(alias: str, is_car: bool) -> str:
+    cols = ", ".join(f'{alias}."{c}"' for c in history_cols(is_car))
+    whens = " ".join(f'WHEN {alias}."{c}" IS NULL THEN {i}' for i, c in enumerate(BID_COLS[:-1], start=1))
+    return f'{cols}, CASE {whens} ELSE {len(BID_COLS)} END AS "{ROUND_COL}"'
+
+# 최저입찰가 값 -> float (숫자로 읽을 수 없는 값은 None: pd.to_numeric(errors="coerce")와 같이 처리)
+def _to_float(value) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+# DB 이력 한 행: 물건 정보 + 차수별 최저입찰가 + 낙찰차수 (자동차가 아니면 소분류 / 제조사 / 차종은 None)
+class RoundHistory(NamedTuple):
+    serial: str
+    round: int               # 낙찰차수
+    bids: tuple              # 1~5차 최저입찰가 (float, 없거나 숫자가 아니면 None)
+    first_bid_at: object     # 최초입찰시기 (DB 값 그대로)
+    major: str | None        # 대분류
+    middle: str | None       # 중분류
+    info: str | None         # 물건정보
+    org: str | None          # 기관
+    minor: str | None = None     # 소분류
+    maker: str | None = None     # 제조사
+    car_type: str | None = None  # 차종
+
+    # history_select 결과 한 행 -> RoundHistory
+    @classmethod
+    def from_row(cls, row, is_car: bool) -> "RoundHistory":
+        values = dict(zip(history_cols(is_car), row))
+        return cls(
+            serial=values[SERIAL_COL],
+            round=int(row[-1]),
+            bids=tuple(_to_float(values[c]) for c in BID_COLS),
+            first_bid_at=values['최초입찰시기'],
+            major=values['대분류'],
+            middle=values['중분류'],
+            info=values['물건정보'],
+            org=values['기관'],
+            minor=values.get('소분류'),
+            maker=values.get('제조사'),
+            car_type=values.get('차종'),
+        )
+
+    # DB 칼럼 이름 -> 값 (history_cols 칼럼 + 낙찰차수)
+    def to_columns(self) -> dict:
+        values = {
+            SERIAL_COL: self.serial, '대분류': self.major, '중분류': self.middle, '소분류': self.minor,
+            '제조사': self.maker, '차종': self.car_type, '물건정보': self.info, '기관': self.org,
+            '최초입찰시기': self.first_bid_at, ROUND_COL: self.round,
+        }
+        values.update(zip(BID_COLS, self.bids))
+        return values
+
+# 커넥션 풀: 프로세스당 한 번 생성, 연결은 필요할 때 최대 size개까지 생성해 재사용
+class ConnectionPool:
+
+    def __init__(self, factory, size: int = POOL_SIZE, wait: float = POOL_WAIT):
+        self._factory = factory
+        self._size = size
+        self._wait = wait
+        self._lock = threading.Lock()
+        self._reset()
+
+    # fork 이후 부모의 연결을 공유하지 않도록 초기화
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = None
+                if self._created < self._size:
+                    self._created += 1
+                    create = True
+                else:
+                    create = False
+
+        if conn is None:
+            if create:
+                try:
+                    conn = self._factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self._wait)
+                except queue.Empty:
+                    raise TimeoutError(f"DB 커넥션 대기 시간 초과 ({self._wait}초)")
+
+        try:
+            yield conn
+        except Exception:
+            # 오류가 난 연결은 버리고 새로 만들도록 함
+            self._discard(conn)
+            raise
+        else:
+            self._idle.put(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def close(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+# SQL 백엔드 공통: 한 번의 쿼리로 존재 여부 확인과 조회를 함께 처리
+class SQLBackend:
+
+    placeholder = "%s"
+
+    def __init__(self, pool_size: int = POOL_SIZE):
+        self.pool = ConnectionPool(self._connect, pool_size)
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _table(self, name: str) -> str:
+        return name
+
+    def _execute(self, cur, query: str, params: tuple):
+        cur.execute(query, params)
+
+    # 조회 쿼리: ONBID_RESULTS에 있는 물건만 (자동차는 ONBID_RESULTS에 있는 경우에만 CAR_TABLE 행)
+    # 모델 입력에 쓰는 칼럼만 읽고 낙찰차수는 DB에서 계산 (history_select)
+    def _select(self, is_car: bool, where: str) -> str:
+        results = self._table("ONBID_RESULTS")
+        if is_car:
+            return f"""
+                SELECT {history_select("c", True)}
+                FROM {self._table("CAR_TABLE")} c
+                WHERE c."{SERIAL_COL}" {where}
+                  AND EXISTS (SELECT 1 FROM {results} r WHERE r."{SERIAL_COL}" = c."{SERIAL_COL}")
+            """
+        return f"""
+                SELECT {history_select("r", False)}
+                FROM {results} r
+                WHERE r."{SERIAL_COL}" {where}
+            """
+
+    # 일련번호로 한 행 조회: ONBID_RESULTS에 없으면 None
+    def fetch_row(self, serial_no: str, is_car: bool) -> RoundHistory | None:
+        query = self._select(is_car, f"= {self.placeholder}") + " LIMIT 1"
+
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                self._execute(cur, query, (serial_no,))
+                row = cur.fetchone()
+            finally:
+                cur.close()
+
+        return None if row is None else RoundHistory.from_row(row, is_car)
+
+    # 여러 일련번호를 IN (...) 쿼리로 한 번에 조회 (IN_BATCH개씩 나누어 실행)
+    # 반환: 일련번호 -> RoundHistory (fetch_row와 같은 조건), 없는 일련번호는 포함되지 않음
+    def fetch_rows(self, serial_nos: list, is_car: bool) -> dict:
+        serial_nos = list(dict.fromkeys(serial_nos))
+        found = {}
+
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                for i in range(0, len(serial_nos), IN_BATCH):
+                    part = serial_nos[i:i + IN_BATCH]
+                    marks = ", ".join([self.placeholder] * len(part))
+                    self._execute(cur, self._select(is_car, f"IN ({marks})"), tuple(part))
+                    for row in cur.fetchall():
+                        found.setdefault(row[0], row)
+            finally:
+                cur.close()
+
+        return {serial: RoundHistory.from_row(row, is_car) for serial, row in found.items()}
+
+    # ONBID_RESULTS의 일련번호만 배치 단위로 읽기 (일련번호 필터 생성용)
+    def iter_serials(self, batch_size: int = 100000):
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(f'SELECT "{SERIAL_COL}" FROM {self._table("ONBID_RESULTS")}')
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield [r[0] for r in rows if r[0] is not None]
+            finally:
+                cur.close()
+
+    # 테이블 전체(또는 워터마크 이후)를 배치 단위로 읽기: (칼럼 목록, 행 목록)을 차례로 반환
+    # (CAR_TABLE은 fetch_row와 같이 ONBID_RESULTS에 있는 행만 반환)
+    def iter_rows(self, table: str, watermark_col: str | None = None, since=None, batch_size: int = 10000):
+        conds, params = [], []
+        if table == "CAR_TABLE":
+            conds.append(
+                f'EXISTS (SELECT 1 FROM {self._table("ONBID_RESULTS")} r WHERE r."{SERIAL_COL}" = t."{SERIAL_COL}")'
+            )
+        if watermark_col is not None and since is not None:
+            conds.append(f't."{watermark_col}" >= {self.placeholder}')
+            params.append(since)
+
+        query = f"SELECT t.* FROM {self._table(table)} t"
+        if conds:
+            query += " WHERE " + " AND ".join(conds)
+        if watermark_col is not None:
+            query += f' ORDER BY t."{watermark_col}"'
+
+        with self.pool.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(query, tuple(params))
+                columns = [d[0] for d in cur.description]
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield columns, rows
+            finally:
+                cur.close()
+
+# Snowflake 백엔드
+class SnowflakeBackend(SQLBackend):
+
+    placeholder = "%s"
+
+    def _connect(self):
+        import snowflake.connector
+        return snowflake.connector.connect(
+            user      = "EKRHKD",
+            password  = "Ehdrnreorhdth5wh",
+            account   = "iwhmypb-tg22545",
+            warehouse = "COMPUTE_WH",
+            database  = DB_NAME,
+            schema    = SCHEMA,
+            login_timeout   = LOGIN_TIMEOUT,
+            network_timeout = NETWORK_TIMEOUT,
+        )
+
+    def _table(self, name: str) -> str:
+        return f"{SCHEMA}.{name}"
+
+    def _execute(self, cur, query: str, params: tuple):
+        cur.execute(query, params, timeout=QUERY_TIMEOUT)
+
+# SQLite 백엔드: 같은 CAR_TABLE / ONBID_RESULTS 스키마를 가진 로컬 파일 (테스트·오프라인용)
+class SQLiteBackend(SQLBackend):
+
+    placeholder = "?"
+
+    def __init__(self, path: str = SQLITE_PATH, pool_size: int = POOL_SIZE):
+        self.path = path
+        super().__init__(pool_size)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=LOGIN_TIMEOUT, check_same_thread=False)
+
+# 프로세스 전역 백엔드
+_backend = None
+_backend_lock = threading.Lock()
+
+def create_backend(kind: str = DB_BACKEND) -> SQLBackend:
+    if kind == "sqlite":
+        return SQLiteBackend(SQLITE_PATH)
+    if kind == "snowflake":
+        return SnowflakeBackend()
+    raise ValueError(f"지원하지 않는 DB 백엔드: {kind}")
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = create_backend(DB_BACKEND)
+                # 로컬 미러가 설정되면 미러를 먼저 조회하고 없을 때만 원격 조회
+                if MIRROR_PATH:
+                    from .mirror import LocalMirror
+                    backend = LocalMirror(MIRROR_PATH, backend)
+                _backend = backend
+    return _backend
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+def fetch_row(serial_no: str, is_car: bool) -> RoundHistory | None:
+    return get_backend().fetch_row(serial_no, is_car)
+
+def fetch_rows(serial_nos: list, is_car: bool) -> dict:
+    return get_backend().fetch_rows(serial_nos, is_car)
@@ -0,0 +1,44 @@
+# deadline.py
+
+import asyncio
+import concurrent.futures
+import os
+import time
+
+# 설정: 환경 변수로 변경 가능
+DEADLINE_MS = float(os.getenv("ONBID_DEADLINE_MS", "3000"))          # 요청당 기본 처리 시간 예산 (0이면 제한 없음)
+RESERVE_MS  = float(os.getenv("ONBID_DEADLINE_RESERVE_MS", "300"))   # DB 단계 이후 모델 계산용으로 남겨 둘 시간
+HEADER      = "X-Deadline-Ms"                                        # 요청별 예산(ms) 헤더
+
+# 시간 초과 예외: Python 3.11 전에는 concurrent.futures / asyncio의 TimeoutError가 내장 TimeoutError와 다른 클래스
+TIMEOUT_ERRORS = (TimeoutError, concurrent.futures.TimeoutError, asyncio.TimeoutError)
+
+# 요청 처리 기한: 단계마다 남은 시간을 시간 제한으로 사용
+class Deadline:
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = budget_ms
+        self.expires = time.monotonic() + budget_ms / 1000
+
+    # 남은 시간(초), reserve_ms만큼은 이후 단계용으로 남겨 둠
+    def remaining(self, reserve_ms: float = 0.0) -> float:
+        return max(0.0, self.expires - time.monotonic() - reserve_ms / 1000)
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires
+
+# 요청 헤더(X-Deadline-Ms) 또는 기본 설정으로 기한 생성 (0 이하이면 None: 제한 없음)
+def from_headers(headers) -> Deadline | None:
+    value = headers.get(HEADER)
+    try:
+        budget_ms = float(value) if value is not None else DEADLINE_MS
+    except ValueError:
+        budget_ms = DEADLINE_MS
+    return Deadline(budget_ms) if budget_ms > 0 else None
+
+# 기한이 없으면 default, 있으면 남은 시간과 default 중 작은 값
+def timeout_for(deadline: Deadline | None, default: float | None = None, reserve_ms: float = 0.0) -> float | None:
+    if deadline is None:
+        return default
+    remaining = deadline.remaining(reserve_ms)
+    return remaining if default is None else min(default, remaining)
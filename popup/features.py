@@ -0,0 +1,33 @@
+# features.py
+
+import numpy as np
+import pandas as pd
+
+# 모델 공통 특성 칼럼
+DATE_COL = "최초입찰시기"
+DATE_FEATURE_COLS = ["최초입찰_연도", "최초입찰_월", "최초입찰_일", "최초입찰_요일"]
+BID_COLS = [f"{i}차최저입찰가" for i in range(1, 6)]
+
+# 날짜 파생 변수가 이미 있는지 (있으면 예측기는 복사 / 재계산 없이 그대로 사용)
+def has_features(df: pd.DataFrame) -> bool:
+    return all(c in df.columns for c in DATE_FEATURE_COLS)
+
+# 특성 생성: 전처리 결과에 날짜 파생 변수를 추가하고 차수별 최저입찰가를 float64로 고정
+# 요청당 한 번만 실행하며 입력 DataFrame을 직접 변경 (모든 예측기가 같은 프레임을 사용)
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+
+    # 날짜 컬럼을 datetime으로 한 번만 변환 후 파생 변수 생성 (.dt 접근자보다 DatetimeIndex가 빠름)
+    if not pd.api.types.is_datetime64_any_dtype(df[DATE_COL]):
+        df[DATE_COL] = pd.to_datetime(df[DATE_COL])
+    dates = pd.DatetimeIndex(df[DATE_COL])
+    df["최초입찰_연도"] = dates.year
+    df["최초입찰_월"] = dates.month
+    df["최초입찰_일"] = dates.day
+    df["최초입찰_요일"] = dates.weekday
+
+    # 입찰가 칼럼 타입 고정 (결측은 NaN)
+    for col in BID_COLS:
+        if col in df.columns and df[col].dtype != np.float64:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float64)
+
+    return df
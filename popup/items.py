@@ -0,0 +1,113 @@
+# items.py
+
+import traceback
+import pandas as pd
+from .preprocessor import preprocessor, preprocessor_batch, ROW_COL
+from .metrics import BATCH_FALLBACKS
+
+# 클라이언트 JSON 키 -> 모델 입력 칼럼 매핑
+ITEM_FIELDS = {
+    '일련번호': 'id',
+    '카테고리': 'category',
+    '대분류': 'mainCategory',
+    '중분류': 'subCategory',
+    '물건정보': 'title',
+    '제조사 / 모델명': 'name',
+    '개찰일시': 'endDate',
+    '입찰방식': 'bidType',
+    '처분방식 / 자산구분': 'assetType',
+    '용도': 'usage',
+    '제조사': 'manufacturer',
+    '모델명': 'modelName',
+    '감정평가금액': 'evaluationPrice',
+    '유찰횟수': 'failureCount',
+    '기관/담당부점': 'agency',
+    '최저입찰가 (예정가격)(원)': 'minBidPrice',
+}
+
+# 모델 입력값 구성 (불필요한 정보까지 보내도 모델에서 처리)
+def build_input_data(data: dict, bid_amount=None) -> dict:
+    input_data = {'입찰가': bid_amount}
+    for col, key in ITEM_FIELDS.items():
+        input_data[col] = data.get(key, '')
+    return input_data
+
+# 물건 목록 DataFrame -> 클라이언트 JSON 형태 dict 목록 (온비드 내보내기 칼럼이면 JSON 키로 변경)
+def records_from_frame(df: pd.DataFrame) -> list:
+    if '일련번호' in df.columns:
+        df = df.rename(columns={col: key for col, key in ITEM_FIELDS.items() if col in df.columns})
+    if 'id' not in df.columns:
+        raise ValueError('일련번호(id) 칼럼이 없습니다')
+    return df.to_dict('records')
+
+# 여러 물건 일괄 예측: 입력 순서대로 결과(또는 항목별 오류) 반환
+def predict_items(model, items: list) -> list:
+
+    results = [None] * len(items)
+    frames = []
+
+    # 일괄 전처리 (DB 조회는 자동차 / 기타별로 IN 쿼리 한 번)
+    valid = [pos for pos, data in enumerate(items) if isinstance(data, dict)]
+    for pos, data in enumerate(items):
+        if not isinstance(data, dict):
+            results[pos] = {'error': '전처리 중 오류: 물건 정보는 JSON 객체여야 합니다'}
+    if valid:
+        input_df = pd.DataFrame([build_input_data(items[pos], items[pos].get('bidAmount')) for pos in valid])
+        try:
+            for part in preprocessor_batch(input_df):
+                if not part.empty:
+                    part.index = [valid[row] for row in part.pop(ROW_COL)]
+                    frames.append(part)
+        except Exception as e:
+            # 일괄 경로의 오류는 한 행씩 처리로 가려지므로 기록해 둠 (느려지기만 하고 드러나지 않음)
+            print(f"일괄 전처리 오류, 한 행씩 다시 처리합니다: {e}")
+            traceback.print_exc()
+            BATCH_FALLBACKS.inc(stage='preprocess')
+            frames = []
+
+    # 일괄 전처리 결과에 없는 항목은 한 행씩 전처리 (실패한 항목만 오류 처리)
+    done = {pos for frame in frames for pos in frame.index}
+    for pos in valid:
+        if pos in done:
+            continue
+        try:
+            input_df = pd.DataFrame([build_input_data(items[pos], items[pos].get('bidAmount'))])
+            input_df = preprocessor(input_df)
+            input_df.index = [pos]
+            frames.append(input_df)
+        except Exception as e:
+            results[pos] = {'error': f'전처리 중 오류: {str(e)}'}
+
+    if not frames:
+        return results
+
+    # 전체 행을 묶어서 (자동차/기타, 차수)별 예측
+    batch_df = pd.concat(frames)
+    price_df = model.price_predict_batch(batch_df)
+
+    ok = price_df['error'].isna()
+    for pos in price_df.index[~ok]:
+        results[pos] = {'error': f'모델 예측 중 오류: {price_df.loc[pos, "error"]}'}
+
+    ok_df = batch_df.loc[ok[ok].index].copy()
+    if ok_df.empty:
+        return results
+
+    # 추천 낙찰가율 기준 확률 일괄 계산
+    ok_df['낙찰가율_최초최저가기준'] = price_df.loc[ok_df.index, 'predicted']
+    try:
+        probs = model.prob_predict_batch(ok_df)
+    except Exception as e:
+        for pos in ok_df.index:
+            results[pos] = {'error': f'모델 예측 중 오류: {str(e)}'}
+        return results
+
+    for pos in ok_df.index:
+        recommend_bid = ok_df.loc[pos, '1차최저입찰가'] * ok_df.loc[pos, '낙찰가율_최초최저가기준']
+        predicted_rate = min(max(float(probs.loc[pos]), 0), 100)
+        results[pos] = {
+            'predicted_rate': round(predicted_rate, 2),
+            'recommend_bid': round(float(recommend_bid), 0)
+        }
+
+    return results
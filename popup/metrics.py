@@ -0,0 +1,271 @@
+# metrics.py
+# 지표는 프로세스마다 따로 모임: 운영 서버(serve.py)처럼 작업 프로세스가 여러 개면 각 프로세스가 공유 디렉터리에
+# 자기 값을 파일(<pid>.json)로 주기적으로 기록하고, /metrics를 받은 프로세스가 모든 파일을 합쳐서 응답
+#   카운터/히스토그램: 모든 프로세스 값의 합 (종료된 프로세스의 파일도 남겨 두어 합계가 줄지 않음)
+#   게이지: 살아 있는 프로세스만, worker="<pid>" 라벨을 붙여 프로세스별로 출력
+# 공유 디렉터리가 없으면(개발 서버 등 단일 프로세스) 자기 값만 출력
+
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 구간(초)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 설정: 환경 변수로 변경 가능
+MULTIPROCESS_DIR = os.getenv("ONBID_METRICS_DIR", "")               # 프로세스 간 공유 디렉터리 (비어 있으면 serve.py가 임시 디렉터리 생성)
+FLUSH_INTERVAL   = float(os.getenv("ONBID_METRICS_FLUSH", "5"))      # 공유 디렉터리에 기록하는 주기(초)
+
+_registry = []
+_collectors = []
+_dir = ""
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+# 카운터: 라벨 조합별 누적 값
+class Counter:
+
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: tuple = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[n]) for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[n]) for n in self.labels), 0)
+
+    def dump(self) -> list:
+        with self._lock:
+            return [[list(k), v] for k, v in self._values.items()]
+
+    # 프로세스별 값 {pid: dump()} -> 합계
+    def merge(self, dumps: dict) -> dict:
+        merged = {}
+        for items in dumps.values():
+            for k, v in items:
+                merged[tuple(k)] = merged.get(tuple(k), 0) + v
+        return merged
+
+    def lines(self, values: dict) -> list:
+        return [f"{self.name}{_format_labels(self.labels, k)} {v}" for k, v in sorted(values.items())]
+
+    def collect(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+        return self.lines(values)
+
+# 게이지: 라벨 조합별 현재 값
+class Gauge(Counter):
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = tuple(str(labels[n]) for n in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    # 현재 값은 더할 수 없으므로 프로세스별로 worker 라벨을 붙여 출력
+    def merge(self, dumps: dict) -> dict:
+        return {tuple(k) + (pid,): v for pid, items in dumps.items() for k, v in items}
+
+    def lines(self, values: dict) -> list:
+        names = self.labels + ("worker",) if values and len(next(iter(values))) > len(self.labels) else self.labels
+        return [f"{self.name}{_format_labels(names, k)} {v}" for k, v in sorted(values.items())]
+
+# 히스토그램: 라벨 조합별 구간 개수, 합계, 개수
+class Histogram:
+
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[n]) for n in self.labels)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def dump(self) -> list:
+        with self._lock:
+            return [[list(k), [list(counts), total, n]] for k, (counts, total, n) in self._values.items()]
+
+    # 프로세스별 값 {pid: dump()} -> 구간 개수, 합계, 개수를 각각 더함
+    def merge(self, dumps: dict) -> dict:
+        merged = {}
+        for items in dumps.values():
+            for k, (counts, total, n) in items:
+                entry = merged.get(tuple(k))
+                if entry is None:
+                    entry = merged[tuple(k)] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += n
+        return merged
+
+    def lines(self, values: dict) -> list:
+        lines = []
+        for key, (counts, total, n) in sorted(values.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + ("+Inf",), counts):
+                cumulative += c
+                le = 'le="{}"'.format(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {n}")
+        return lines
+
+    def collect(self) -> list:
+        with self._lock:
+            values = {k: [list(counts), total, n] for k, (counts, total, n) in self._values.items()}
+        return self.lines(values)
+
+# 출력/기록 직전에 게이지 값을 갱신하는 함수 등록 (각 프로세스가 자기 상태를 기록하도록)
+def add_collector(fn):
+    _collectors.append(fn)
+    return fn
+
+def _run_collectors():
+    for fn in _collectors:
+        fn()
+
+# 여러 프로세스의 지표를 합칠 공유 디렉터리 지정 (빈 문자열이면 프로세스 자기 값만 출력)
+def set_multiprocess_dir(path: str):
+    global _dir
+    _dir = path
+
+# 모든 값 초기화 (fork 직후 작업 프로세스에서 호출해 부모 값이 프로세스 수만큼 중복 합산되지 않도록 함)
+def reset():
+    for metric in _registry:
+        with metric._lock:
+            metric._values = {}
+
+# 현재 프로세스 값을 공유 디렉터리에 기록 (읽는 프로세스가 쓰다 만 파일을 보지 않도록 임시 파일 후 교체)
+# gauges=False: 요청을 처리하지 않는 부모 프로세스처럼 카운터/히스토그램만 기록
+def write_snapshot(gauges: bool = True):
+    if not _dir:
+        return
+    if gauges:
+        _run_collectors()
+    data = {metric.name: metric.dump() for metric in _registry if gauges or metric.kind != "gauge"}
+    path = os.path.join(_dir, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+# 종료된 프로세스의 파일을 <pid>-<시각>.json으로 보관 (같은 pid가 재사용되어도 누적 값이 덮이지 않도록)
+def retire(pid: int):
+    if not _dir:
+        return
+    path = os.path.join(_dir, f"{pid}.json")
+    try:
+        os.replace(path, os.path.join(_dir, f"{pid}-{time.time_ns()}.json"))
+    except FileNotFoundError:
+        pass
+
+# FLUSH_INTERVAL마다 기록하는 백그라운드 스레드 시작 (작업 프로세스에서 호출)
+def start_flusher(interval: float = FLUSH_INTERVAL) -> threading.Event:
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            try:
+                write_snapshot()
+            except OSError as e:
+                print(f"지표 기록 실패: {e}")
+    threading.Thread(target=loop, name="metrics-flush", daemon=True).start()
+    return stop
+
+def _alive(name: str) -> bool:
+    if not name.isdigit():
+        return False
+    try:
+        os.kill(int(name), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+# 공유 디렉터리의 프로세스별 값 {파일 이름(pid): {지표 이름: dump()}}
+def _read_snapshots() -> dict:
+    snapshots = {}
+    for path in glob.glob(os.path.join(_dir, "*.json")):
+        try:
+            with open(path, encoding="utf-8") as f:
+                snapshots[os.path.basename(path)[:-len(".json")]] = json.load(f)
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+# Prometheus 텍스트 형식 출력
+def render() -> str:
+    snapshots = None
+    if not _dir:
+        _run_collectors()
+    else:
+        write_snapshot()
+        snapshots = _read_snapshots()
+        live = {name for name in snapshots if _alive(name)}
+
+    out = []
+    for metric in _registry:
+        out.append(f"# HELP {metric.name} {metric.doc}")
+        out.append(f"# TYPE {metric.name} {metric.kind}")
+        if snapshots is None:
+            out.extend(metric.collect())
+        else:
+            dumps = {name: snap.get(metric.name, []) for name, snap in snapshots.items()
+                     if metric.kind != "gauge" or name in live}
+            out.extend(metric.lines(metric.merge(dumps)))
+    return "\n".join(out) + "\n"
+
+# 기본 지표
+STAGE_LATENCY = Histogram("onbid_stage_latency_seconds", "단계별 처리 시간", ("stage",))
+REQUEST_LATENCY = Histogram("onbid_request_latency_seconds", "엔드포인트별 요청 처리 시간", ("endpoint",))
+DB_LOOKUPS = Counter("onbid_db_lookups_total", "DB 조회 결과 (hit: 이력 있음, miss: 없음, filtered: 일련번호 필터로 조회 생략, timeout: 기한 초과)", ("result",))
+MODEL_ROUTES = Counter("onbid_model_route_total", "가격 모델 선택 (segment: car/etc, round: 1~5)", ("segment", "round"))
+CACHE_LOOKUPS = Counter("onbid_cache_lookups_total", "물건 캐시 조회 결과 (hit / miss)", ("result",))
+SINGLEFLIGHT = Counter("onbid_singleflight_total", "동시 요청 병합 (leader: 직접 계산, follower: 결과 공유, timeout: 대기 시간 초과)", ("role",))
+PRECOMPUTED = Counter("onbid_precomputed_lookups_total", "사전 계산 추천 조회 결과 (hit / miss / stale: 물건 정보나 모델이 바뀜)", ("result",))
+ADMISSION = Counter("onbid_admission_total", "요청 수락 결과 (cls: cheap/expensive, result: admitted/queued/rejected_429/rejected_503)", ("cls", "result"))
+ERRORS = Counter("onbid_errors_total", "엔드포인트별 오류 응답 수", ("endpoint", "status"))
+BATCH_FALLBACKS = Counter("onbid_batch_fallback_total", "일괄 전처리가 실패해 한 행씩 다시 처리한 횟수 (stage: preprocess)", ("stage",))
+
+# 단계별 처리 시간 측정
+@contextmanager
+def timed(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.observe(time.perf_counter() - start, stage=stage)
@@ -0,0 +1,232 @@
+# mirror.py
+# ONBID_RESULTS / CAR_TABLE 로컬 미러 (ONBID_DB_MIRROR)
+# 증분 동기화는 워터마크 칼럼(기본 최초입찰시기) 기준이라, 최초입찰시기는 그대로이고 차수가 진행되면서 바뀐 행은
+# 워터마크 이후 범위에 들어오지 않음. 그래서 매번 워터마크에서 RESYNC_DAYS일 이전부터 다시 가져오고
+# (진행 중인 경매가 이 기간 안에 끝나도록 설정), 수정 시각 칼럼이 있으면 --watermark-col로 지정해 사용
+# 주기적으로 --full 동기화를 실행하면 이 기간보다 오래 진행된 물건도 갱신됨
+
+import argparse
+import datetime
+import decimal
+import os
+import sqlite3
+import time
+import pandas as pd
+from .db import (SERIAL_COL, IN_BATCH, POOL_SIZE, LOGIN_TIMEOUT, MIRROR_PATH, DB_BACKEND, ConnectionPool,
+                 RoundHistory, create_backend, history_cols, history_select)
+
+MIRROR_TABLES = ["ONBID_RESULTS", "CAR_TABLE"]
+WATERMARK_COL = os.getenv("ONBID_MIRROR_WATERMARK_COL", "최초입찰시기")
+RESYNC_DAYS   = float(os.getenv("ONBID_MIRROR_RESYNC_DAYS", "90"))   # 증분 동기화 때 워터마크 이전 다시 가져올 기간(일)
+
+# SQLite에 저장할 수 있는 값으로 변환
+def _to_sqlite(value):
+    if value is None:
+        return None
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.datetime, datetime.date, pd.Timestamp)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime.datetime) else value.isoformat()
+    return value
+
+# 워터마크에서 days일 전 (날짜로 읽을 수 없는 워터마크는 그대로)
+def _rewind(watermark, days: float):
+    if watermark is None or days <= 0:
+        return watermark
+    try:
+        return str(pd.Timestamp(watermark) - pd.Timedelta(days=days))
+    except (TypeError, ValueError):
+        return watermark
+
+# ONBID_RESULTS / CAR_TABLE 로컬 미러: 일련번호 인덱스로 조회, 없으면 원격 조회 후 저장(read-through)
+class LocalMirror:
+
+    def __init__(self, path: str = MIRROR_PATH, remote=None, pool_size: int = POOL_SIZE):
+        self.path = path
+        self.remote = remote
+        self.pool = ConnectionPool(self._connect, pool_size)
+        self._columns = {}
+        with self.pool.connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _sync_state "
+                "(table_name TEXT PRIMARY KEY, watermark TEXT, synced_at TEXT)"
+            )
+            conn.commit()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=LOGIN_TIMEOUT, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # 로컬 테이블 칼럼 목록 (없으면 빈 목록)
+    def _table_columns(self, conn, table: str) -> list:
+        if table not in self._columns:
+            cols = [r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')]
+            if not cols:
+                return []
+            self._columns[table] = cols
+        return self._columns[table]
+
+    # 원격 칼럼에 맞춰 테이블 생성 / 칼럼 추가 (일련번호 유니크 인덱스)
+    def _ensure_table(self, conn, table: str, columns: list):
+        existing = self._table_columns(conn, table)
+        if not existing:
+            cols_sql = ", ".join(f'"{c}"' for c in columns)
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({cols_sql})')
+            conn.execute(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS "idx_{table}_serial" ON "{table}" ("{SERIAL_COL}")'
+            )
+        else:
+            for c in columns:
+                if c not in existing:
+                    conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{c}"')
+        self._columns.pop(table, None)
+
+    # 행 저장 (같은 일련번호는 교체)
+    def _upsert(self, conn, table: str, columns: list, rows: list):
+        self._ensure_table(conn, table, columns)
+        cols_sql = ", ".join(f'"{c}"' for c in columns)
+        marks = ", ".join("?" for _ in columns)
+        conn.executemany(
+            f'INSERT OR REPLACE INTO "{table}" ({cols_sql}) VALUES ({marks})',
+            [tuple(_to_sqlite(v) for v in row) for row in rows]
+        )
+
+    # 원격에서 가져온 이력 저장 (조회에 쓰는 칼럼만)
+    def _store(self, conn, table: str, records: list, is_car: bool):
+        cols = history_cols(is_car)
+        self._upsert(conn, table, cols, [[r.to_columns()[c] for c in cols] for r in records])
+        conn.commit()
+
+    # 일련번호로 한 행 조회: 로컬에 없으면 원격 조회 후 로컬에 저장
+    def fetch_row(self, serial_no: str, is_car: bool) -> RoundHistory | None:
+        table = "CAR_TABLE" if is_car else "ONBID_RESULTS"
+
+        with self.pool.connection() as conn:
+            if self._table_columns(conn, table):
+                row = conn.execute(
+                    f'SELECT {history_select("t", is_car)} FROM "{table}" t WHERE t."{SERIAL_COL}" = ? LIMIT 1',
+                    (serial_no,)
+                ).fetchone()
+                if row is not None:
+                    return RoundHistory.from_row(row, is_car)
+
+        if self.remote is None:
+            return None
+
+        # 원격 조회 (read-through)
+        record = self.remote.fetch_row(serial_no, is_car)
+        if record is not None:
+            with self.pool.connection() as conn:
+                self._store(conn, table, [record], is_car)
+        return record
+
+    # 여러 일련번호 조회: 로컬에서 IN 쿼리로 찾고, 없는 일련번호만 원격에서 한 번에 조회 후 저장
+    def fetch_rows(self, serial_nos: list, is_car: bool) -> dict:
+        table = "CAR_TABLE" if is_car else "ONBID_RESULTS"
+        serial_nos = list(dict.fromkeys(serial_nos))
+        found = {}
+
+        with self.pool.connection() as conn:
+            if self._table_columns(conn, table):
+                for i in range(0, len(serial_nos), IN_BATCH):
+                    part = serial_nos[i:i + IN_BATCH]
+                    marks = ", ".join("?" for _ in part)
+                    rows = conn.execute(
+                        f'SELECT {history_select("t", is_car)} FROM "{table}" t WHERE t."{SERIAL_COL}" IN ({marks})',
+                        tuple(part)
+                    ).fetchall()
+                    for row in rows:
+                        found.setdefault(row[0], RoundHistory.from_row(row, is_car))
+
+        missing = [s for s in serial_nos if s not in found]
+        if missing and self.remote is not None:
+            remote = self.remote.fetch_rows(missing, is_car)
+            if remote:
+                with self.pool.connection() as conn:
+                    self._store(conn, table, list(remote.values()), is_car)
+                found.update(remote)
+        return found
+
+    def get_watermark(self, table: str):
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT watermark FROM _sync_state WHERE table_name = ?", (table,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    # 일괄 동기화: 마지막 워터마크의 resync_days일 전 이후 행을 가져와 저장 (full=True면 전체)
+    # (워터마크 이전에 시작해 아직 진행 중인 물건의 차수별 최저입찰가도 갱신)
+    def sync(self, remote=None, tables=MIRROR_TABLES, watermark_col: str = WATERMARK_COL,
+             full: bool = False, batch_size: int = 10000, resync_days: float = RESYNC_DAYS) -> dict:
+        remote = remote or self.remote
+        if remote is None:
+            raise ValueError("동기화할 원격 DB가 없습니다")
+
+        counts = {}
+        for table in tables:
+            watermark = None if full else self.get_watermark(table)
+            since = _rewind(watermark, resync_days)
+            wm_idx = None
+            n = 0
+
+            with self.pool.connection() as conn:
+                for columns, rows in remote.iter_rows(table, watermark_col, since, batch_size):
+                    if wm_idx is None:
+                        wm_idx = columns.index(watermark_col) if watermark_col in columns else -1
+                    self._upsert(conn, table, columns, rows)
+                    if wm_idx >= 0:
+                        values = [_to_sqlite(r[wm_idx]) for r in rows if r[wm_idx] is not None]
+                        if values:
+                            watermark = max([watermark] + values) if watermark is not None else max(values)
+                    n += len(rows)
+                    conn.commit()
+
+                conn.execute(
+                    "INSERT OR REPLACE INTO _sync_state (table_name, watermark, synced_at) VALUES (?, ?, ?)",
+                    (table, watermark, datetime.datetime.now().isoformat(sep=" "))
+                )
+                conn.commit()
+
+            counts[table] = n
+        return counts
+
+    # 테이블별 행 수와 워터마크
+    def stats(self) -> dict:
+        result = {}
+        with self.pool.connection() as conn:
+            for table in MIRROR_TABLES:
+                if not self._table_columns(conn, table):
+                    result[table] = {"rows": 0, "watermark": None}
+                    continue
+                n = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                result[table] = {"rows": n}
+        for table in MIRROR_TABLES:
+            result[table]["watermark"] = self.get_watermark(table)
+        return result
+
+# 명령행: python -m popup.mirror sync | stats
+def main():
+    parser = argparse.ArgumentParser(description="ONBID_RESULTS / CAR_TABLE 로컬 미러 관리")
+    parser.add_argument("command", choices=["sync", "stats"])
+    parser.add_argument("--path", default=MIRROR_PATH or "onbid_mirror.sqlite3", help="미러 SQLite 파일 경로")
+    parser.add_argument("--backend", default=DB_BACKEND, help="원격 DB 백엔드 (snowflake | sqlite)")
+    parser.add_argument("--tables", nargs="+", default=MIRROR_TABLES, choices=MIRROR_TABLES)
+    parser.add_argument("--watermark-col", default=WATERMARK_COL, help="증분 동기화 기준 칼럼 (수정 시각 칼럼 권장)")
+    parser.add_argument("--resync-days", type=float, default=RESYNC_DAYS,
+                        help="워터마크 이전 다시 가져올 기간(일), 진행 중인 물건의 차수 변경 반영")
+    parser.add_argument("--full", action="store_true", help="워터마크를 무시하고 전체 동기화")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    mirror = LocalMirror(args.path)
+    if args.command == "sync":
+        start = time.time()
+        counts = mirror.sync(create_backend(args.backend), args.tables, args.watermark_col,
+                             args.full, args.batch_size, args.resync_days)
+        print(f"동기화 완료 ({time.time() - start:.1f}초): {counts}")
+    else:
+        print(mirror.stats())
+
+if __name__ == "__main__":
+    main()
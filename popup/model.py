@@ -1,67 +1,130 @@
-
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from .metrics import timed, MODEL_ROUTES
 from .predict_model.round_model.onbid_map_round_predict import RoundPredictor
 from .predict_model.price_model.car_price_model.onbid_map_carp_predict import CarPricePredictor
 from .predict_model.price_model.etc_price_model.onbid_map_etcp_predict import EtcPricePredictor
 from .predict_model.probability_model.onbid_map_prob_predict import ProbPredictor
 
+# 설정: 환경 변수로 변경 가능
+LAZY_MODELS  = os.getenv("ONBID_LAZY_MODELS", "0") == "1"   # 1이면 가격 모델을 처음 사용할 때 로드
+LOAD_WORKERS = int(os.getenv("ONBID_LOAD_WORKERS", "8"))     # 병렬 로드 스레드 수
+
 # 모델 개체 불러오기
 class PredictModel():
 
-    # 생성자
-    def __init__(self):
-        self._prob_model = ProbPredictor()
-        self._round_model = RoundPredictor()
-        self._car1 = CarPricePredictor(1)
-        self._car2 = CarPricePredictor(2)
-        self._car3 = CarPricePredictor(3)
-        self._car4 = CarPricePredictor(4)
-        self._car5 = CarPricePredictor(5)
-        self._etc1 = EtcPricePredictor(1)
-        self._etc2 = EtcPricePredictor(2)
-        self._etc3 = EtcPricePredictor(3)
-        self._etc4 = EtcPricePredictor(4)
-        self._etc5 = EtcPricePredictor(5)
-    
+    # 생성자: 모델 파일을 스레드 풀에서 병렬로 로드
+    def __init__(self, lazy: bool = LAZY_MODELS, workers: int = LOAD_WORKERS):
+        start = time.perf_counter()
+        self._lazy = lazy
+        self._load_lock = threading.Lock()
+
+        # (자동차 여부, 차수) -> 가격 모델
+        self._price_models = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            prob_future = pool.submit(ProbPredictor)
+            round_future = pool.submit(RoundPredictor)
+            price_futures = {}
+            if not lazy:
+                for order in range(1, 6):
+                    price_futures[(True, order)] = pool.submit(CarPricePredictor, order)
+                    price_futures[(False, order)] = pool.submit(EtcPricePredictor, order)
+
+            self._prob_model = prob_future.result()
+            self._round_model = round_future.result()
+            for key, future in price_futures.items():
+                self._price_models[key] = future.result()
+
+        self.load_seconds = time.perf_counter() - start
+        print(f"모델 로드 완료: {self.load_seconds:.2f}초 "
+              f"({2 + len(self._price_models)}개 모델, {'지연 로드' if lazy else '전체 로드'})")
+
+    # 차수별 가격 모델 선택 (5차 이상은 5차 모델, 지연 로드 모드에서는 처음 사용할 때 로드)
+    def _price_model(self, is_car: bool, used_round: int):
+        key = (bool(is_car), min(max(int(used_round), 1), 5))
+        model = self._price_models.get(key)
+        if model is None:
+            with self._load_lock:
+                model = self._price_models.get(key)
+                if model is None:
+                    start = time.perf_counter()
+                    model = CarPricePredictor(key[1]) if key[0] else EtcPricePredictor(key[1])
+                    self._price_models[key] = model
+                    print(f"가격 모델 로드: {'자동차' if key[0] else '기타'} {key[1]}차 "
+                          f"({time.perf_counter() - start:.2f}초)")
+        return model
+
     # 가격 예측 메소드
     def price_predict(self, df: pd.DataFrame):
 
-    # 낙찰 차수 설정
-        pred_round = self._round_model.predict(df)[0]
+        # 낙찰 차수 설정
+        with timed('round_model'):
+            pred_round = self._round_model.predict(df)[0]
         now_round = df.loc[0, '낙찰차수'] + 1
-        used_round = max(pred_round, now_round)
+        used_round = min(max(pred_round, now_round), 5)
 
         # 모델 선택 및 예측
-        if df.loc[0, '대분류'] == '자동차':
-            if used_round == 1:
-                result = self._car1.predict(df).iloc[0]
-            elif used_round == 2:
-                result = self._car2.predict(df).iloc[0]
-            elif used_round == 3:
-                result = self._car3.predict(df).iloc[0]
-            elif used_round == 4:
-                result = self._car4.predict(df).iloc[0]
-            else:
-                result = self._car5.predict(df).iloc[0]
-        else:
-            if used_round == 1:
-                result = self._etc1.predict(df).iloc[0]
-            elif used_round == 2:
-                result = self._etc2.predict(df).iloc[0]
-            elif used_round == 3:
-                result = self._etc3.predict(df).iloc[0]
-            elif used_round == 4:
-                result = self._etc4.predict(df).iloc[0]
-            else:
-                result = self._etc5.predict(df).iloc[0]
+        is_car = df.loc[0, '대분류'] == '자동차'
+        MODEL_ROUTES.inc(segment='car' if is_car else 'etc', round=used_round)
+        with timed('price_model'):
+            result = self._price_model(is_car, used_round).predict(df).iloc[0]
+
+        return result
+
+    # 가격 일괄 예측 메소드: (자동차/기타, 차수)별로 묶어 파이프라인 한 번씩 호출
+    def price_predict_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+
+        result = pd.DataFrame({'predicted': float('nan'), 'error': None}, index=df.index)
+
+        # 낙찰 차수 일괄 예측 (실패 시 행 단위로 재시도)
+        rounds = pd.Series(pd.NA, index=df.index, dtype='object')
+        try:
+            with timed('round_model'):
+                rounds[:] = self._round_model.predict(df)
+        except Exception:
+            for idx in df.index:
+                try:
+                    rounds[idx] = self._round_model.predict(df.loc[[idx]])[0]
+                except Exception as e:
+                    result.loc[idx, 'error'] = f'차수 예측 오류: {str(e)}'
+
+        ok = rounds.notna()
+        if not ok.any():
+            return result
+
+        now_round = df.loc[ok, '낙찰차수'].astype(int) + 1
+        used_round = pd.concat([rounds[ok].astype(int), now_round], axis=1).max(axis=1).clip(1, 5)
+        is_car = df.loc[ok, '대분류'] == '자동차'
+
+        # 그룹별 예측 (모델 로드 실패는 그 그룹 항목만 오류, 예측 실패 시 행 단위로 재시도해 오류 항목만 표시)
+        for (car, used), idx in used_round.groupby([is_car, used_round]).groups.items():
+            MODEL_ROUTES.inc(len(idx), segment='car' if car else 'etc', round=used)
+            try:
+                model = self._price_model(car, used)
+            except Exception as e:
+                result.loc[idx, 'error'] = f'가격 모델 로드 오류: {str(e)}'
+                continue
+            group = df.loc[idx]
+            try:
+                with timed('price_model'):
+                    result.loc[idx, 'predicted'] = model.predict(group).values
+            except Exception:
+                for i in idx:
+                    try:
+                        result.loc[i, 'predicted'] = model.predict(df.loc[[i]]).iloc[0]
+                    except Exception as e:
+                        result.loc[i, 'error'] = str(e)
 
         return result
 
     # 확률 예측 메소드
-        # 확률 예측 메소드
     def prob_predict(self, df: pd.DataFrame):
         # 확률 계산
-        prob = self._prob_model.predict(df).iloc[0]
+        with timed('kde'):
+            prob = self._prob_model.predict(df).iloc[0]
 
         # 단일 스칼라 값만 추출해서 반환 (예: float)
         if isinstance(prob, pd.Series):
@@ -70,3 +133,18 @@ class PredictModel():
             return prob
         else:
             raise ValueError(f"예상치 못한 결과 타입: {type(prob)}")
+
+    # 확률 일괄 예측 메소드: 입력 인덱스 그대로 Series 반환
+    def prob_predict_batch(self, df: pd.DataFrame) -> pd.Series:
+        with timed('kde'):
+            return self._prob_model.predict(df)
+
+    # 확률 곡선 메소드: 첫 행의 (대분류, 중분류) 기준으로 여러 낙찰가율의 확률 계산
+    def prob_curve(self, df: pd.DataFrame, ratios=None) -> tuple:
+        first = df.iloc[0]
+        return self._prob_model.predict_curve(first['대분류'], first['중분류'], ratios)
+
+    # 목표 확률 입찰가율 메소드: 첫 행의 (대분류, 중분류) 기준 역CDF
+    def prob_quantile(self, df: pd.DataFrame, probs):
+        first = df.iloc[0]
+        return self._prob_model.quantile(first['대분류'], first['중분류'], probs)
@@ -0,0 +1,213 @@
+# precompute.py
+# 추천 입찰가 사전 계산: 진행 중인 물건 목록(CSV / Parquet)을 청크 단위로 병렬 예측해 일련번호 키-값 저장소에 기록
+# python -m popup.precompute active_listings.csv --store recommendations.sqlite3 --workers 4
+# 서버는 ONBID_PRECOMPUTE=recommendations.sqlite3이면 /predict에서 저장소를 먼저 조회
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from .cache import item_key
+from .db import ConnectionPool, LOGIN_TIMEOUT
+from .items import predict_items, records_from_frame
+from .metrics import PRECOMPUTED
+from .registry import manifest_version
+
+# 설정: 환경 변수로 변경 가능
+PRECOMPUTE_PATH = os.getenv("ONBID_PRECOMPUTE", "")                           # 비어 있으면 사용 안 함
+CHUNK_SIZE      = int(os.getenv("ONBID_PRECOMPUTE_CHUNK", "500"))              # 청크당 물건 수
+WORKERS         = int(os.getenv("ONBID_PRECOMPUTE_WORKERS", str(os.cpu_count() or 1)))
+
+# 일련번호 -> 추천 결과 저장소 (SQLite, 일련번호 기본 키로 조회)
+# 물건 정보(item_key)나 모델(manifest_version)이 계산 시점과 다르면 사용하지 않음
+class RecommendationStore:
+
+    def __init__(self, path: str = PRECOMPUTE_PATH, model_version: str | None = None):
+        self.path = path
+        self.model_version = model_version if model_version is not None else (manifest_version() or "")
+        self.pool = ConnectionPool(self._connect)
+        with self.pool.connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS recommendations ("
+                "serial TEXT PRIMARY KEY, item_key TEXT, predicted_rate REAL, recommend_bid REAL, "
+                "model_version TEXT, scored_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS _chunks (source TEXT, chunk INTEGER, items INTEGER, done_at REAL, "
+                "PRIMARY KEY (source, chunk))"
+            )
+            conn.commit()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=LOGIN_TIMEOUT, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    # 요청 본문으로 조회: /predict 응답과 같은 형태의 dict, 없거나 오래된 결과면 None
+    def get(self, data: dict) -> dict | None:
+        serial = str(data.get('id') or '').strip()
+        if not serial:
+            PRECOMPUTED.inc(result='miss')
+            return None
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT item_key, predicted_rate, recommend_bid, model_version FROM recommendations WHERE serial = ?",
+                (serial,)
+            ).fetchone()
+        if row is None:
+            PRECOMPUTED.inc(result='miss')
+            return None
+        if row[0] != item_key(data) or row[3] != self.model_version:
+            PRECOMPUTED.inc(result='stale')
+            return None
+        PRECOMPUTED.inc(result='hit')
+        return {'predicted_rate': row[1], 'recommend_bid': row[2]}
+
+    # 청크 결과 저장과 완료 표시를 한 트랜잭션으로 기록 (중단되어도 청크 단위로 이어서 계산)
+    def put_chunk(self, source: str, chunk: int, rows: list):
+        now = time.time()
+        with self.pool.connection() as conn:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO recommendations VALUES (?, ?, ?, ?, ?, ?)",
+                    [(serial, key, rate, bid, self.model_version, now) for serial, key, rate, bid in rows]
+                )
+                conn.execute("INSERT OR REPLACE INTO _chunks VALUES (?, ?, ?, ?)", (source, chunk, len(rows), now))
+
+    def done_chunks(self, source: str) -> set:
+        with self.pool.connection() as conn:
+            return {r[0] for r in conn.execute("SELECT chunk FROM _chunks WHERE source = ?", (source,))}
+
+    def reset(self, source: str):
+        with self.pool.connection() as conn:
+            with conn:
+                conn.execute("DELETE FROM _chunks WHERE source = ?", (source,))
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+
+# 물건 목록을 청크 단위로 읽기: 온비드 내보내기 칼럼(일련번호, 카테고리, ...) 또는 클라이언트 JSON 키(id, category, ...)
+# 파일 전체를 메모리에 올리지 않고, 청크 경계는 항상 chunk_size개 단위 (체크포인트의 청크 번호가 바뀌지 않도록)
+def iter_listings(path: str, chunk_size: int = CHUNK_SIZE):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        frames = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+        frames = (df.astype(object).where(df.notna(), "").astype(str) for df in frames)
+    else:
+        frames = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig", chunksize=chunk_size)
+
+    buffer = []
+    for df in frames:
+        buffer.extend(records_from_frame(df))
+        while len(buffer) >= chunk_size:
+            yield buffer[:chunk_size]
+            buffer = buffer[chunk_size:]
+    if buffer:
+        yield buffer
+
+# 물건 목록 전체 읽기 (작은 파일 확인용)
+def read_listings(path: str) -> list:
+    return [item for chunk in iter_listings(path) for item in chunk]
+
+# 입력 파일 식별자 (경로 + 크기 + 수정 시각): 파일이 바뀌면 처음부터 다시 계산
+def source_id(path: str, chunk_size: int) -> str:
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{int(stat.st_mtime)}:{chunk_size}"
+
+# 작업 프로세스용 모델 (부모가 로드한 뒤 fork로 공유)
+_model = None
+
+def _score_chunk(chunk: int, items: list) -> tuple:
+    results = predict_items(_model, items)
+    rows, errors = [], 0
+    for data, result in zip(items, results):
+        if result is None or 'error' in result:
+            errors += 1
+            continue
+        rows.append((str(data['id']).strip(), item_key(data), result['predicted_rate'], result['recommend_bid']))
+    return chunk, rows, errors
+
+# 전체 계산: 완료된 청크는 건너뛰고 나머지를 병렬로 계산, 청크마다 진행 상황(items/sec) 출력
+# 입력은 청크 단위로 읽고, 작업 프로세스마다 최대 2개 청크까지만 대기시킴 (메모리와 대기 중인 결과 수 제한)
+def precompute(path: str, store: RecommendationStore, model=None, chunk_size: int = CHUNK_SIZE,
+               workers: int = WORKERS, restart: bool = False) -> dict:
+    global _model
+    source = source_id(path, chunk_size)
+    if restart:
+        store.reset(source)
+    done = store.done_chunks(source)
+    print(f"물건 목록: {path} (청크당 {chunk_size}개, 완료된 청크 {len(done)}개는 건너뜀)")
+
+    if _model is None:
+        from .model import PredictModel
+        _model = model if model is not None else PredictModel()
+
+    start = time.perf_counter()
+    total = scored = errors = skipped = 0
+
+    def finish(chunk, rows, n_errors, n_items):
+        nonlocal scored, errors
+        store.put_chunk(source, chunk, rows)
+        scored += n_items
+        errors += n_errors
+        elapsed = time.perf_counter() - start
+        print(f"청크 {chunk + 1} 완료: {scored}개, {scored / elapsed:.1f} items/sec, 오류 {errors}개")
+
+    # 완료되지 않은 청크만 (청크 번호, 물건 목록)으로 반환
+    def pending_chunks():
+        nonlocal total, skipped
+        for chunk, items in enumerate(iter_listings(path, chunk_size)):
+            total += len(items)
+            if chunk in done:
+                skipped += 1
+                continue
+            yield chunk, items
+
+    if workers <= 1:
+        for chunk, items in pending_chunks():
+            finish(*_score_chunk(chunk, items), len(items))
+    else:
+        # fork: 작업 프로세스가 부모의 모델을 copy-on-write로 공유 (모델을 다시 로드하지 않음)
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            pending = deque()
+            for chunk, items in pending_chunks():
+                pending.append((pool.submit(_score_chunk, chunk, items), len(items)))
+                while len(pending) >= workers * 2:
+                    future, n_items = pending.popleft()
+                    finish(*future.result(), n_items)
+            while pending:
+                future, n_items = pending.popleft()
+                finish(*future.result(), n_items)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        'items': total,
+        'scored': scored,
+        'errors': errors,
+        'skipped_chunks': skipped,
+        'seconds': round(elapsed, 2),
+        'items_per_sec': round(scored / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    print(f"완료: {summary}")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="진행 중인 물건의 추천 입찰가 사전 계산")
+    parser.add_argument("listings", help="물건 목록 (CSV / Parquet)")
+    parser.add_argument("--store", default=PRECOMPUTE_PATH or "recommendations.sqlite3", help="결과 저장소 (SQLite)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="작업 프로세스 수")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 계산")
+    args = parser.parse_args()
+
+    precompute(args.listings, RecommendationStore(args.store), chunk_size=args.chunk_size,
+               workers=args.workers, restart=args.restart)
+
+if __name__ == "__main__":
+    main()
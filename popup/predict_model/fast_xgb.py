@@ -0,0 +1,259 @@
+# fast_xgb.py
+
+import argparse
+import math
+import os
+import tempfile
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from ..registry import MODEL_DIR, fetch_artifact, add_artifact, local_path
+
+FAST_FILENAME = "fast_pipeline.pkl"
+FASTPATH_ENABLED = os.getenv("ONBID_FASTPATH", "1") == "1"   # 0이면 내보낸 파일이 있어도 파이프라인 사용
+
+# 빠른 예측 대상 파이프라인: (레포, 파이프라인 파일, 빠른 예측 파일)
+EXPORT_TARGETS = [
+    ("asteroidddd/onbid-map-round", "auction_pipeline.pkl", FAST_FILENAME),
+] + [
+    (repo, f"models_by_order/order{order}/pipeline.pkl", f"models_by_order/order{order}/{FAST_FILENAME}")
+    for repo in ("asteroidddd/onbid-map-carp", "asteroidddd/onbid-map-etcp")
+    for order in range(1, 6)
+]
+
+# 파이프라인(ColumnTransformer + OneHotEncoder + XGB)에서 원-핫 어휘와 부스터 추출
+def export_pipeline(pipeline) -> dict:
+    ct = pipeline.steps[0][1]
+    est = pipeline.steps[-1][1]
+    feature_names = list(ct.feature_names_in_)
+
+    cat_cols, categories, pass_cols = [], [], []
+    for name, trans, cols in ct.transformers_:
+        if isinstance(cols, slice):
+            cols = feature_names[cols]
+        cols = [feature_names[c] if isinstance(c, (int, np.integer)) else c for c in cols]
+        if isinstance(trans, str) and trans == "drop":
+            continue
+        # 'passthrough' (버전에 따라 학습 후 func=None인 FunctionTransformer로 저장됨)
+        if (isinstance(trans, str) and trans == "passthrough") or getattr(trans, "func", "") is None:
+            pass_cols += cols
+            continue
+        if getattr(trans, "handle_unknown", None) != "ignore" or getattr(trans, "drop_idx_", None) is not None \
+                or getattr(trans, "_infrequent_enabled", False):
+            raise ValueError(f"지원하지 않는 원-핫 인코더 설정입니다: {name}")
+        cat_cols += cols
+        categories += [list(c) for c in trans.categories_]
+
+    # 반복 범위: sklearn 래퍼의 predict와 동일하게 (조기 종료 시 best_iteration까지)
+    try:
+        iteration_range = tuple(est._get_iteration_range(None))
+    except AttributeError:
+        iteration_range = (0, 0)
+
+    spec = {
+        "kind": "classifier" if hasattr(est, "classes_") else "regressor",
+        "cat_cols": cat_cols,
+        "categories": categories,
+        "pass_cols": pass_cols,
+        "sparse": bool(getattr(ct, "sparse_output_", False)),
+        "booster": bytes(est.get_booster().save_raw()),
+        "iteration_range": iteration_range,
+        "missing": float(est.missing) if est.missing is not None else float("nan"),
+        "objective": est.get_params().get("objective"),
+    }
+    if spec["kind"] == "classifier":
+        spec["classes"] = np.asarray(est.classes_)
+    return spec
+
+def _is_nan(value) -> bool:
+    return isinstance(value, float) and math.isnan(value)
+
+# 딕셔너리/DataFrame 입력에서 특성 벡터를 직접 만들어 부스터로 예측
+class FastPipeline:
+
+    def __init__(self, spec: dict):
+        import xgboost as xgb
+
+        self.kind = spec["kind"]
+        self.cat_cols = spec["cat_cols"]
+        self.pass_cols = spec["pass_cols"]
+        self.sparse = spec["sparse"]
+        self.iteration_range = spec["iteration_range"]
+        self.missing = spec["missing"]
+        self.objective = spec.get("objective")
+        self.classes = spec.get("classes")
+
+        self.booster = xgb.Booster()
+        self.booster.load_model(bytearray(spec["booster"]))
+
+        # 범주값 -> 열 위치 (NaN 범주는 따로 보관)
+        self._lookup = []
+        self._nan_pos = []
+        offset = 0
+        for cats in spec["categories"]:
+            table, nan_pos = {}, -1
+            for j, c in enumerate(cats):
+                if _is_nan(c):
+                    nan_pos = offset + j
+                else:
+                    table.setdefault(c, offset + j)
+            self._lookup.append(table)
+            self._nan_pos.append(nan_pos)
+            offset += len(cats)
+        self._pass_offset = offset
+        self.n_features = offset + len(self.pass_cols)
+
+    @property
+    def feature_cols(self) -> list:
+        return self.cat_cols + self.pass_cols
+
+    # 칼럼별 값 목록 -> 특성 행렬 (학습 시 ColumnTransformer 출력이 희소였으면 CSR, 아니면 밀집)
+    def _matrix(self, columns: dict, n: int):
+        rows, cols, vals = [], [], []
+        for table, nan_pos, col in zip(self._lookup, self._nan_pos, self.cat_cols):
+            for i, v in enumerate(columns[col]):
+                pos = nan_pos if _is_nan(v) else table.get(v, -1)
+                if pos >= 0:
+                    rows.append(i)
+                    cols.append(pos)
+                    vals.append(1.0)
+        for t, col in enumerate(self.pass_cols):
+            pos = self._pass_offset + t
+            for i, v in enumerate(columns[col]):
+                v = np.nan if v is None or v is pd.NA else float(v)
+                # 희소 출력에서는 0이 저장되지 않음 (XGBoost에서 결측으로 처리됨)
+                if self.sparse and v == 0:
+                    continue
+                rows.append(i)
+                cols.append(pos)
+                vals.append(v)
+
+        if self.sparse:
+            from scipy import sparse
+            return sparse.csr_matrix((vals, (rows, cols)), shape=(n, self.n_features), dtype=np.float64)
+        X = np.zeros((n, self.n_features), dtype=np.float64)
+        X[rows, cols] = vals
+        return X
+
+    def _predict_matrix(self, X) -> np.ndarray:
+        preds = self.booster.inplace_predict(X, iteration_range=self.iteration_range, missing=self.missing)
+        if self.kind == "regressor":
+            return preds
+
+        # XGBClassifier.predict와 같은 방식으로 클래스 결정
+        if preds.ndim > 1 and preds.shape[1] > 1:
+            idx = np.argmax(preds, axis=1)
+        elif self.objective == "multi:softmax":
+            idx = preds.astype(np.int64)
+        else:
+            idx = (preds > 0.5).astype(np.int64)
+        return self.classes[idx]
+
+    # 딕셔너리 목록 입력 예측
+    def predict_records(self, records: list) -> np.ndarray:
+        columns = {c: [r.get(c) for r in records] for c in self.feature_cols}
+        return self._predict_matrix(self._matrix(columns, len(records)))
+
+    # DataFrame 입력 예측 (파이프라인 predict와 같은 결과)
+    def predict(self, df: pd.DataFrame) -> np.ndarray:
+        columns = {c: df[c].tolist() for c in self.feature_cols}
+        return self._predict_matrix(self._matrix(columns, len(df)))
+
+# 로컬 모델 저장소에 내보낸 빠른 예측기가 있으면 로드 (없으면 None)
+def load_fast_pipeline(repo_id: str, filename: str, model_dir: str = MODEL_DIR):
+    if not FASTPATH_ENABLED:
+        return None
+    path = local_path(repo_id, filename, model_dir)
+    if path is None:
+        return None
+    try:
+        return FastPipeline(joblib.load(path))
+    except Exception as e:
+        print(f"빠른 예측기 로드 실패, 파이프라인 사용: {filename} ({e})")
+        return None
+
+# 전체 파이프라인 내보내기: 로컬 모델 저장소에 빠른 예측 파일 등록 (중간 파일은 임시 디렉토리에 만들고 삭제)
+def export_all(model_dir: str = MODEL_DIR):
+    for repo_id, pipeline_file, fast_file in EXPORT_TARGETS:
+        pipeline = joblib.load(fetch_artifact(repo_id, pipeline_file, model_dir))
+        spec = export_pipeline(pipeline)
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = os.path.join(tmp, FAST_FILENAME)
+            joblib.dump(spec, tmp_path)
+            add_artifact(repo_id, fast_file, tmp_path, "exported", model_dir)
+        print(f"{repo_id}/{fast_file}: 특성 {len(spec['cat_cols'])}개 범주 + {len(spec['pass_cols'])}개 수치, "
+              f"{'희소' if spec['sparse'] else '밀집'} 입력")
+
+# 무작위 입력 생성: 학습된 범주 + 미지 범주 + 수치(결측 포함)
+def _random_frame(spec: dict, n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col, cats in zip(spec["cat_cols"], spec["categories"]):
+        choices = list(cats) + ["__미지범주__"]
+        data[col] = [choices[i] for i in rng.integers(0, len(choices), n)]
+    for col in spec["pass_cols"]:
+        values = rng.choice([0.0, 1.0, 2024.0, 1.5e6, 3.2e7], n)
+        values[rng.random(n) < 0.1] = np.nan
+        data[col] = values
+    return pd.DataFrame(data)
+
+# 검증: 파이프라인과 빠른 예측기의 결과 및 단일 행 지연 시간 비교
+def verify_all(model_dir: str = MODEL_DIR, data_path: str | None = None, n: int = 2000) -> bool:
+    ok = True
+    test_df = pd.read_csv(data_path) if data_path else None
+    for repo_id, pipeline_file, fast_file in EXPORT_TARGETS:
+        pipeline = joblib.load(fetch_artifact(repo_id, pipeline_file, model_dir))
+        spec_path = local_path(repo_id, fast_file, model_dir)
+        if spec_path is None:
+            print(f"{repo_id}/{fast_file}: 내보낸 파일 없음")
+            ok = False
+            continue
+        spec = joblib.load(spec_path)
+        fast = FastPipeline(spec)
+
+        cols = list(pipeline.steps[0][1].feature_names_in_)
+        X = test_df[cols] if test_df is not None else _random_frame(spec, n)[cols]
+        expected = pipeline.predict(X)
+        actual = fast.predict(X)
+        if spec["kind"] == "regressor":
+            diff = float(np.max(np.abs(expected.astype(np.float64) - actual.astype(np.float64)))) if len(X) else 0.0
+            same = diff <= 1e-6
+            detail = f"최대 오차 {diff:.3g}"
+        else:
+            same = bool(np.array_equal(expected, actual))
+            detail = f"일치율 {np.mean(expected == actual):.4f}"
+
+        # 단일 행 지연 시간
+        row = X.iloc[[0]]
+        record = row.iloc[0].to_dict()
+        t_pipe = _bench(lambda: pipeline.predict(row))
+        t_fast = _bench(lambda: fast.predict_records([record]))
+        print(f"{repo_id}/{pipeline_file}: {'OK' if same else '불일치'} ({detail}), "
+              f"단일 행 {t_pipe * 1e3:.2f}ms -> {t_fast * 1e3:.3f}ms")
+        ok = ok and same
+    return ok
+
+def _bench(fn, repeat: int = 200) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+# 명령행: python -m popup.predict_model.fast_xgb export | verify
+def main():
+    parser = argparse.ArgumentParser(description="XGBoost 빠른 예측기 내보내기 / 검증")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--data", default=None, help="검증용 CSV (없으면 무작위 입력)")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_all(args.model_dir)
+    else:
+        if not verify_all(args.model_dir, args.data):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
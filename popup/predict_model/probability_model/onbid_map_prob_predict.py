@@ -1,9 +1,10 @@
 # onbid_map_prob_predict.py
 
+import threading
 import pandas as pd
 import joblib
 import numpy as np
-from huggingface_hub import hf_hub_download
+from ...registry import fetch_artifact
 
 # 누적확률(CDF) 계산 헬퍼 함수
 def _get_cdf_from_dict(model_dict, value: float) -> float:
@@ -21,6 +22,23 @@ def _get_cdf_from_dict(model_dict, value: float) -> float:
     return float(cdf[idx])
 
 
+# 누적확률(CDF) 벡터 계산 헬퍼 함수: 여러 값을 searchsorted 한 번으로 계산
+def _get_cdf_array_from_dict(model_dict, values) -> np.ndarray:
+    x_min = model_dict['x_min']
+    x_max = model_dict['x_max']
+    x_range = model_dict['x_range']
+    cdf = np.asarray(model_dict['cdf'], dtype=float)
+
+    values = np.asarray(values, dtype=float)
+    idx = np.searchsorted(x_range, values, side='right') - 1
+    probs = cdf[np.clip(idx, 0, len(cdf) - 1)]
+
+    # 범위 밖의 값은 0 / 1로 고정
+    probs = np.where(values <= x_min, 0.0, probs)
+    probs = np.where(values >= x_max, 1.0, probs)
+    return probs
+
+
 # 앙상블 확률 계산 헬퍼 함수
 def _compute_ensemble_prob(
     overall_dict: dict,
@@ -52,6 +70,37 @@ def _compute_ensemble_prob(
     return (p_all * w_all + p_major * w_major + p_minor * w_minor) / total_w
 
 
+# 앙상블 확률 벡터 계산 헬퍼 함수: 하나의 (대분류, 중분류)에 대해 여러 값을 한 번에 계산
+def _compute_ensemble_prob_array(
+    overall_dict: dict,
+    major_dict: dict,
+    minor_dict: dict,
+    major: str,
+    minor: str,
+    values,
+    w_all: float,
+    w_major: float,
+    w_minor: float
+) -> np.ndarray:
+    # 전체 모델에서의 CDF
+    p_all = _get_cdf_array_from_dict(overall_dict, values)
+
+    # 대분류 모델
+    if major in major_dict:
+        p_major = _get_cdf_array_from_dict(major_dict[major], values)
+    else:
+        p_major = p_all
+
+    # 중분류 모델
+    if minor in minor_dict:
+        p_minor = _get_cdf_array_from_dict(minor_dict[minor], values)
+    else:
+        p_minor = p_all
+
+    total_w = w_all + w_major + w_minor
+    return (p_all * w_all + p_major * w_major + p_minor * w_minor) / total_w
+
+
 # KDE 기반 확률 예측 클래스
 class ProbPredictor:
     # 생성자
@@ -62,16 +111,16 @@ class ProbPredictor:
         weights: tuple = (1.0, 1.0, 1.0)
     ):
 
-        # Hugging Face 허브에서 모델 파일 다운로드 (public repo이므로 토큰 불필요)
-        overall_path = hf_hub_download(
+        # 로컬 모델 저장소 우선, 없으면 Hugging Face 허브에서 다운로드 (public repo이므로 토큰 불필요)
+        overall_path = fetch_artifact(
             repo_id=repo_id,
             filename=f"{model_subpath}/overall_dict.pkl"
         )
-        major_path = hf_hub_download(
+        major_path = fetch_artifact(
             repo_id=repo_id,
             filename=f"{model_subpath}/major_dict.pkl"
         )
-        minor_path = hf_hub_download(
+        minor_path = fetch_artifact(
             repo_id=repo_id,
             filename=f"{model_subpath}/minor_dict.pkl"
         )
@@ -84,39 +133,131 @@ class ProbPredictor:
         # 가중치 튜플 (w_all, w_major, w_minor)
         self.w_all, self.w_major, self.w_minor = weights
 
+        # 역CDF 테이블: (대분류, 중분류) -> (격자, 누적확률), 실제로 요청된 조합만 처음 사용할 때 생성해 재사용
+        # (모든 조합을 미리 만들면 대부분 나오지 않는 조합이라 로드가 느려지고 메모리만 차지함)
+        # 모델에 없는 분류는 None (전체 모델로 대체)
+        self._inverse_tables = {}
+        self._inverse_lock = threading.Lock()
+
     # 예측
     def predict(self, df: pd.DataFrame) -> pd.Series:
         # Series 형태로 들어오면 DataFrame으로 변환
         if isinstance(df, pd.Series):
             df = pd.DataFrame([df])
 
-        # 입력 DataFrame 복사
-        df_new = df.copy()
-
         # 필수 컬럼 검사
         required_cols = ["대분류", "중분류", "낙찰가율_최초최저가기준"]
-        missing = [c for c in required_cols if c not in df_new.columns]
+        missing = [c for c in required_cols if c not in df.columns]
         if missing:
             raise ValueError(f"필수 컬럼 누락: {missing}")
 
-        # 결과를 담을 리스트
-        probs = []
-        for idx, row in df_new.iterrows():
-            major = str(row["대분류"])
-            minor = str(row["중분류"])
-            value = float(row["낙찰가율_최초최저가기준"])
+        # 컬럼을 배열로 추출 (입력 DataFrame은 복사하지 않음)
+        majors = df["대분류"].astype(str).to_numpy()
+        minors = df["중분류"].astype(str).to_numpy()
+        values = df["낙찰가율_최초최저가기준"].astype(float).to_numpy()
 
-            prob = _compute_ensemble_prob(
+        # (대분류, 중분류) 그룹별로 CDF를 한 번에 계산
+        probs = np.empty(len(df), dtype=float)
+        groups = pd.DataFrame({"major": majors, "minor": minors}).groupby(["major", "minor"], sort=False).indices
+        for (major, minor), pos in groups.items():
+            probs[pos] = _compute_ensemble_prob_array(
                 overall_dict=self.overall_dict,
                 major_dict=self.major_dict,
                 minor_dict=self.minor_dict,
                 major=major,
                 minor=minor,
-                value=value,
+                values=values[pos],
                 w_all=self.w_all,
                 w_major=self.w_major,
                 w_minor=self.w_minor
             )
-            probs.append(prob)
 
-        return pd.Series(probs, index=df_new.index, name="prob_낙찰가율_최초최저가기준")
+        return pd.Series(probs, index=df.index, name="prob_낙찰가율_최초최저가기준")
+
+    # 확률 곡선: 하나의 (대분류, 중분류)에 대해 여러 낙찰가율의 확률을 한 번에 계산
+    def predict_curve(self, major: str, minor: str, values=None) -> tuple:
+        major = str(major)
+        minor = str(minor)
+
+        # 값이 없으면 사용되는 KDE들의 x_range 전체를 격자로 사용
+        if values is None:
+            grids = [self.overall_dict['x_range']]
+            if major in self.major_dict:
+                grids.append(self.major_dict[major]['x_range'])
+            if minor in self.minor_dict:
+                grids.append(self.minor_dict[minor]['x_range'])
+            values = np.unique(np.concatenate(grids))
+        else:
+            values = np.asarray(values, dtype=float)
+
+        probs = _compute_ensemble_prob_array(
+            overall_dict=self.overall_dict,
+            major_dict=self.major_dict,
+            minor_dict=self.minor_dict,
+            major=major,
+            minor=minor,
+            values=values,
+            w_all=self.w_all,
+            w_major=self.w_major,
+            w_minor=self.w_minor
+        )
+        return values, probs
+
+    # 역CDF 테이블 조회: 없으면 잠금 안에서 한 번만 생성 (완성된 튜플만 저장하므로 조회는 잠금 없이)
+    def _inverse_table(self, key: tuple) -> tuple:
+        table = self._inverse_tables.get(key)
+        if table is None:
+            with self._inverse_lock:
+                table = self._inverse_tables.get(key)
+                if table is None:
+                    table = self._inverse_tables[key] = self._build_inverse_table(*key)
+        return table
+
+    # 역CDF 테이블 생성: 사용되는 KDE들의 격자 합집합에서 앙상블 CDF를 단조 배열로 저장
+    def _build_inverse_table(self, major, minor) -> tuple:
+        dicts = [self.overall_dict]
+        if major is not None:
+            dicts.append(self.major_dict[major])
+        if minor is not None:
+            dicts.append(self.minor_dict[minor])
+
+        # x_min 바로 오른쪽 지점도 포함 (x_min에서는 0, 직후부터 cdf[0])
+        grids = [d['x_range'] for d in dicts]
+        grids += [np.nextafter(np.asarray([d['x_min']], dtype=float), np.inf) for d in dicts]
+        xs = np.unique(np.concatenate(grids).astype(float))
+
+        # None인 분류는 빈 dict로 넘겨 전체 모델로 대체
+        ps = _compute_ensemble_prob_array(
+            overall_dict=self.overall_dict,
+            major_dict=self.major_dict if major is not None else {},
+            minor_dict=self.minor_dict if minor is not None else {},
+            major=major,
+            minor=minor,
+            values=xs,
+            w_all=self.w_all,
+            w_major=self.w_major,
+            w_minor=self.w_minor
+        )
+        ps = np.maximum.accumulate(ps)
+
+        # 누적확률이 0인 구간(x_min - margin 쪽)은 제외: 첫 격자점이 낙찰 확률이 생기는 최소 낙찰가율
+        first = min(int(np.searchsorted(ps, 0.0, side='right')), len(xs) - 1)
+        return xs[first:], ps[first:]
+
+    # 분위수(역CDF): 목표 낙찰 확률을 달성하는 최소 낙찰가율 반환 (0 이상)
+    # 확률 0 이하는 낙찰 확률이 생기는 최소 낙찰가율, 1 이상은 누적확률이 가장 큰 첫 낙찰가율
+    def quantile(self, major: str, minor: str, probs) -> np.ndarray:
+        major = str(major)
+        minor = str(minor)
+
+        # 모델에 없는 분류는 전체 모델로 대체되므로 같은 테이블 사용
+        key = (
+            major if major in self.major_dict else None,
+            minor if minor in self.minor_dict else None
+        )
+        xs, ps = self._inverse_table(key)
+
+        # 누적확률이 목표 이상이 되는 첫 격자점 (O(log 격자)), 음수 낙찰가율은 0으로 고정
+        probs = np.asarray(probs, dtype=float)
+        idx = np.searchsorted(ps, probs, side='left')
+        return np.maximum(xs[np.clip(idx, 0, len(xs) - 1)], 0.0)
@@ -1,7 +1,9 @@
 # onbid_map_round_predict.py
 
 import pandas as pd
-from huggingface_hub import hf_hub_download
+from ...registry import fetch_artifact
+from ..fast_xgb import load_fast_pipeline, FAST_FILENAME
+from ...features import DATE_FEATURE_COLS, has_features, build_features
 import joblib
 
 # 경매 데이터프레임 입력 후 파이프라인 예측 수행 클래스: 인스턴스 생성시 모델 로드
@@ -15,14 +17,17 @@ class RoundPredictor:
         label_encoder_filename: str = "label_encoder.pkl"
     ):
         
-        # 모델 파일 다운로드
-        pipeline_path = hf_hub_download(repo_id=repo_id, filename=pipeline_filename)
-        label_path = hf_hub_download(repo_id=repo_id, filename=label_encoder_filename)
+        # 모델 파일 경로 (로컬 모델 저장소 우선, 없으면 다운로드)
+        pipeline_path = fetch_artifact(repo_id=repo_id, filename=pipeline_filename)
+        label_path = fetch_artifact(repo_id=repo_id, filename=label_encoder_filename)
 
         # 모델 로드
         self.pipeline = joblib.load(pipeline_path)
         self.label_encoder = joblib.load(label_path)
 
+        # 내보낸 빠른 예측기가 있으면 사용 (python -m popup.predict_model.fast_xgb export)
+        self.fast = load_fast_pipeline(repo_id, FAST_FILENAME)
+
     # 예측: 데이터프레임 입력 후 차수 반환
     def predict(self, df: pd.DataFrame) -> list:
 
@@ -30,26 +35,18 @@ class RoundPredictor:
         if isinstance(df, pd.Series):
             df = pd.DataFrame([df])
 
-        # 원본 df를 변경하지 않도록 복사본 생성
-        df_new = df.copy()
-
-        # 날짜 컬럼을 datetime으로 변환 후 파생변수 생성
-        df_new["최초입찰시기"] = pd.to_datetime(df_new["최초입찰시기"])
-        df_new["최초입찰_연도"] = df_new["최초입찰시기"].dt.year
-        df_new["최초입찰_월"] = df_new["최초입찰시기"].dt.month
-        df_new["최초입찰_일"] = df_new["최초입찰시기"].dt.day
-        df_new["최초입찰_요일"] = df_new["최초입찰시기"].dt.weekday
+        # 공통 특성이 없으면(전처리를 거치지 않은 입력) 복사본에 생성, 있으면 복사 없이 그대로 사용
+        df_new = df if has_features(df) else build_features(df.copy())
 
         # 학습 시 사용한 컬럼 순서대로 선택
-        feature_cols = [
-            "대분류", "중분류", "기관",
-            "최초입찰_연도", "최초입찰_월", "최초입찰_일", "최초입찰_요일",
-            "1차최저입찰가"
-        ]
-        X_new = df_new[feature_cols]
-
-        # 예측
-        y_pred_le = self.pipeline.predict(X_new)
+        feature_cols = ["대분류", "중분류", "기관"] + DATE_FEATURE_COLS + ["1차최저입찰가"]
+
+        # 예측 (빠른 예측기는 칼럼을 이름으로 읽으므로 모델 입력용 DataFrame을 따로 만들지 않음)
+        if self.fast is not None:
+            y_pred_le = self.fast.predict(df_new)
+        else:
+            y_pred_le = self.pipeline.predict(df_new[feature_cols])
+
         y_pred_labels = self.label_encoder.inverse_transform(y_pred_le)
         y_pred_ints = [int(label) for label in y_pred_labels]
 
@@ -3,18 +3,54 @@
 import pandas as pd
 import numpy as np
 import os
+from functools import lru_cache
+from ..keyword_matcher import KeywordMatcher
 
 # 기본 경로 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CAR_CATEGORY_CSV_PATH = os.path.join(BASE_DIR, "car_category_data.csv")
 CAR_BRAND_CSV_PATH = os.path.join(BASE_DIR, "car_brand_data.csv")
 
+# 차종 / 제조사 매칭기: CSV를 한 번만 읽어 차종명과 제조사 키워드를 한 번의 스캔으로 매칭
+class _CarMatcher:
+
+    def __init__(self, category_path: str, brand_path: str):
+
+        # CSV 파일 읽기 (차종 대문자 변환)
+        self.categories = pd.read_csv(category_path)
+        self.categories['차종'] = self.categories['차종'].str.upper()
+        brands = pd.read_csv(brand_path)
+        self.brand_manufacturers = brands['제조사'].to_numpy(dtype=object)
+
+        # 차종: CSV 순서상 처음 포함된 차종 / 제조사: 처음 포함된 키워드 (대소문자 무시)
+        self._matcher = KeywordMatcher(
+            list(self.categories['차종']),
+            [str(k).upper() for k in brands['키워드']]
+        )
+
+    # 물건정보별 (차종 인덱스, 제조사 키워드 인덱스) 배열 반환 (없으면 -1)
+    def match(self, infos: pd.Series) -> tuple:
+        cat_idx = np.full(len(infos), -1)
+        brand_idx = np.full(len(infos), -1)
+        for i, info in enumerate(infos):
+            c, b = self._matcher.first(str(info).upper())
+            cat_idx[i] = c
+            # 제조사 키워드는 문자열인 물건정보에만 적용
+            if isinstance(info, str):
+                brand_idx[i] = b
+        return cat_idx, brand_idx
+
+# 경로별 매칭기 캐시 (기본 CSV 매칭기는 import 시 미리 생성)
+@lru_cache(maxsize=None)
+def _get_car_matcher(category_path: str, brand_path: str) -> _CarMatcher:
+    return _CarMatcher(category_path, brand_path)
+
+_get_car_matcher(CAR_CATEGORY_CSV_PATH, CAR_BRAND_CSV_PATH)
+
 # 전체 전처리: 자동차 필터링 후 차종, 분류, 제조사 추가
 def preprocessor_of_car(df: pd.DataFrame, max_rounds: int = 5) -> pd.DataFrame:
 
-    # CSV 파일 읽기
-    car_category_df = pd.read_csv(CAR_CATEGORY_CSV_PATH)
-    car_brand_df    = pd.read_csv(CAR_BRAND_CSV_PATH)
+    matcher = _get_car_matcher(CAR_CATEGORY_CSV_PATH, CAR_BRAND_CSV_PATH)
 
     # 자동차만 필터링
     df = df.copy()
@@ -25,38 +61,28 @@ def preprocessor_of_car(df: pd.DataFrame, max_rounds: int = 5) -> pd.DataFrame:
     df['소분류'] = pd.NA
     df['제조사'] = pd.NA
 
-    # 차종 대문자 변환
-    car_category_df = car_category_df.copy()
-    car_category_df['차종'] = car_category_df['차종'].str.upper()
+    # 차종 / 제조사 키워드 매칭
+    cat_idx, brand_idx = matcher.match(df['물건정보'])
 
     # 차종 매칭
-    for idx, row in df.iterrows():
-        info = str(row['물건정보']).upper()
-        matched = car_category_df[car_category_df['차종'].apply(lambda nm: nm in info)]
-        if not matched.empty:
-            first_match = matched.iloc[0]
-            df.at[idx, '차종']   = first_match['차종']
-            df.at[idx, '소분류'] = first_match['소분류']
-            df.at[idx, '중분류'] = first_match['중분류']
-            df.at[idx, '제조사'] = first_match['제조사']
-    
+    hit = cat_idx >= 0
+    if hit.any():
+        first_match = matcher.categories.iloc[cat_idx[hit]]
+        df.loc[hit, '차종']   = first_match['차종'].to_numpy()
+        df.loc[hit, '소분류'] = first_match['소분류'].to_numpy()
+        df.loc[hit, '중분류'] = first_match['중분류'].to_numpy()
+        df.loc[hit, '제조사'] = first_match['제조사'].to_numpy()
+
     # 중분류 처리
     df['중분류'] = df['중분류'].replace({'화물차': '트럭', '차량': '기타차량'})
 
     # 소분류 처리
     df.loc[df['소분류'].isna(), '소분류'] = df.loc[df['소분류'].isna(), '중분류']
 
-    # 제조사 처리
-    if '제조사' not in df.columns:
-        df['제조사'] = pd.NA
-    else:
-        df['제조사'] = df['제조사'].fillna(pd.NA)
-    car_brand_df_local = car_brand_df.copy()
-    for _, row_brand in car_brand_df_local.iterrows():
-        keyword = str(row_brand['키워드'])
-        manufacturer = row_brand['제조사']
-        mask = df['제조사'].isna() & df['물건정보'].str.contains(keyword, case=False, na=False)
-        df.loc[mask, '제조사'] = manufacturer
+    # 제조사 처리: 차종으로 정해지지 않은 경우 제조사 키워드로 보완
+    mask = df['제조사'].isna().to_numpy() & (brand_idx >= 0)
+    if mask.any():
+        df.loc[mask, '제조사'] = matcher.brand_manufacturers[brand_idx[mask]]
 
     # 결측 처리
     df['차종']   = df['차종'].fillna('결측')
@@ -0,0 +1,73 @@
+# keyword_matcher.py
+
+from collections import deque
+
+# 다중 키워드 부분 문자열 매칭 (Aho-Corasick 오토마타)
+# 키워드 목록을 여러 개 받아, 문자열 한 번 스캔으로 목록별 "가장 앞 순서의 일치 키워드" 인덱스를 반환
+class KeywordMatcher:
+
+    def __init__(self, *keyword_lists):
+        self._n_groups = len(keyword_lists)
+        none = [-1] * self._n_groups
+
+        # 트라이 구성: 노드별 전이(dict), 실패 링크, 그룹별 최소 키워드 인덱스
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [list(none)]
+        for g, keywords in enumerate(keyword_lists):
+            for i, keyword in enumerate(keywords):
+                node = 0
+                for ch in str(keyword):
+                    nxt = self._goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[node][ch] = nxt
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._best.append(list(none))
+                    node = nxt
+                if self._best[node][g] == -1:
+                    self._best[node][g] = i
+
+        # 실패 링크 계산 (BFS): 접미사 노드의 일치 결과를 합침
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._best[nxt] = [
+                    _min_index(a, b) for a, b in zip(self._best[nxt], self._best[self._fail[nxt]])
+                ]
+
+        # 빈 키워드는 모든 문자열에 포함됨
+        self._root_best = tuple(self._best[0])
+
+    # 그룹별로 문자열에 포함된 키워드 중 가장 앞 순서의 인덱스 (없으면 -1)
+    def first(self, text: str) -> tuple:
+        goto = self._goto
+        fail = self._fail
+        best_by_node = self._best
+        best = list(self._root_best)
+
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            node_best = best_by_node[node]
+            for g in range(self._n_groups):
+                b = node_best[g]
+                if b != -1 and (best[g] == -1 or b < best[g]):
+                    best[g] = b
+        return tuple(best)
+
+def _min_index(a: int, b: int) -> int:
+    if a == -1:
+        return b
+    if b == -1:
+        return a
+    return min(a, b)
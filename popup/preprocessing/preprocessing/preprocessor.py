@@ -4,6 +4,8 @@
 import pandas as pd
 import numpy as np
 import os
+from functools import lru_cache
+from ..keyword_matcher import KeywordMatcher
 
 # 기본 경로 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -35,37 +37,61 @@ def _basic_preprocess(df: pd.DataFrame) -> pd.DataFrame:
 
     return df
 
-# 기관 처리
-def _classify_org(df_fillted: pd.DataFrame, df_in_name: str, df_map_name: str) -> pd.DataFrame:
+# 기관 분류기: 키워드 CSV를 한 번만 읽어 정확 일치(dict) + 부분 일치(Aho-Corasick)로 분류
+class _OrgClassifier:
 
-    # csv 파일 읽기
-    df_in = pd.read_csv(df_in_name, encoding="utf-8-sig")
-    df_map = pd.read_csv(df_map_name, encoding="utf-8-sig")
+    def __init__(self, df_in_name: str, df_map_name: str):
 
-    # 리스트로 변환
-    map_list = list(df_map.to_dict(orient="records"))
-    in_list = list(df_in.to_dict(orient="records"))
+        # csv 파일 읽기
+        df_in = pd.read_csv(df_in_name, encoding="utf-8-sig")
+        df_map = pd.read_csv(df_map_name, encoding="utf-8-sig")
 
-    # 데이터프레임 복사
-    df_plot = df_fillted.copy()
-    df_plot = df_plot[df_plot["기관"].notna()].copy()
+        # map_keywords: 정확 일치 (같은 키워드는 먼저 나온 행 우선)
+        self._exact = {}
+        for keyword, group in zip(df_map["keyword"], df_map["group"]):
+            self._exact.setdefault(keyword, group)
+
+        # in_keywords: 부분 일치 (CSV 순서가 우선순위)
+        self._in_groups = list(df_in["group"])
+        self._matcher = KeywordMatcher(list(df_in["keyword"]))
 
     # 분류 함수
-    def classify(org_name: str) -> str:
+    def classify(self, org_name: str) -> str:
         # map_keywords: org_name이 keyword와 정확히 일치할 때
-        for row in map_list:
-            if org_name.strip() == row["keyword"]:
-                return row["group"]
-        # in_keywords: org_name에 keyword가 부분 포함되어 있을 때
-        for row in in_list:
-            if row["keyword"] in org_name:
-                return row["group"]
+        key = org_name.strip()
+        if key in self._exact:
+            return self._exact[key]
+        # in_keywords: org_name에 keyword가 부분 포함되어 있을 때 (가장 앞 순서 키워드)
+        idx = self._matcher.first(org_name)[0]
+        if idx != -1:
+            return self._in_groups[idx]
         # 어느 경우에도 해당하지 않으면 "기타"
         return "기타"
 
+    # 기관 칼럼 전체 분류: 고유값만 한 번씩 분류한 뒤 매핑
+    def classify_series(self, orgs: pd.Series) -> pd.Series:
+        mapping = {org: self.classify(org) for org in pd.unique(orgs)}
+        return orgs.map(mapping)
+
+# 경로별 분류기 캐시
+@lru_cache(maxsize=None)
+def _get_org_classifier(df_in_name: str, df_map_name: str) -> _OrgClassifier:
+    return _OrgClassifier(df_in_name, df_map_name)
+
+# 기본 키워드 파일 분류기는 import 시 미리 생성
+_get_org_classifier(_IN_KEYWORDS_CSV_PATH, _MAP_KEYWORDS_CSV_PATH)
+
+# 기관 처리
+def _classify_org(df_fillted: pd.DataFrame, df_in_name: str, df_map_name: str) -> pd.DataFrame:
+
+    classifier = _get_org_classifier(df_in_name, df_map_name)
+
+    # 데이터프레임 복사
+    df_plot = df_fillted[df_fillted["기관"].notna()].copy()
+
     # 기관 처리
-    df_plot["기관"] = df_plot["기관"].apply(classify)
-    
+    df_plot["기관"] = classifier.classify_series(df_plot["기관"])
+
     return df_plot
 
 # 전체 전처리 파이프라인
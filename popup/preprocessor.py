@@ -1,101 +1,234 @@
 import os
+import asyncio
 import numpy as np
 import pandas as pd
-import snowflake.connector
 from .preprocessing.preprocessing.preprocessor import preprocessor as etc_processor
 from .preprocessing.car_processing.car_preprocessor import preprocessor_of_car as car_processor
+from .db import fetch_row, fetch_rows, RoundHistory
+from .features import BID_COLS, build_features
+from .metrics import timed, DB_LOOKUPS
+from .deadline import Deadline, RESERVE_MS, TIMEOUT_ERRORS
+from .serial_filter import might_exist, might_exist_many
+from . import aio
 
-SERIAL_COL = "일련번호"
-DB_NAME    = "ONVID_DB"
-SCHEMA     = "ANALYSIS"
-
-def _connect():
-    return snowflake.connector.connect(
-        user      = "EKRHKD",
-        password  = "Ehdrnreorhdth5wh",
-        account   = "iwhmypb-tg22545",
-        warehouse = "COMPUTE_WH",
-        database  = "ONVID_DB",
-        schema    = "ANALYSIS",
-    )
-
-def _get_DB(serial_no: str, is_car: bool) -> pd.DataFrame:
-    table = "CAR_TABLE" if is_car else "ONBID_RESULTS"
-    query = f"""
-        SELECT *
-        FROM {SCHEMA}.{table}
-        WHERE "{SERIAL_COL}" = %s
-        LIMIT 1
-    """
-
-    with _connect() as conn:
-        df = pd.read_sql(query, conn, params=[serial_no])
-    return df
+# 모델 입력 칼럼 (자동차 / 기타)
+CAR_COLS = [
+    '일련번호', '대분류', '중분류', '소분류', '제조사', '차종', '물건정보', '기관', '최초입찰시기',
+    '낙찰차수', '1차최저입찰가', '2차최저입찰가', '3차최저입찰가', '4차최저입찰가', '5차최저입찰가'
+]
+ETC_COLS = [
+    '일련번호', '대분류', '중분류', '물건정보', '기관', '최초입찰시기', '낙찰차수',
+    '1차최저입찰가', '2차최저입찰가', '3차최저입찰가', '4차최저입찰가', '5차최저입찰가'
+]
+
+# 일괄 전처리 결과에서 입력 행 위치 (전처리 과정에서 정렬 / 제외되므로 입력과 결과를 이 칼럼으로 연결)
+ROW_COL = '_row'
+
+# 기한 안에 DB 조회가 끝나지 않아 DB에 없는 물건과 같이(1차 기본값) 처리한 경우 표시 (DataFrame.attrs)
+DEGRADED_ATTR = 'degraded'
 
-def _in_DB(serial_no: str) -> bool:
-    query = f"""
-        SELECT 1
-        FROM {SCHEMA}.ONBID_RESULTS
-        WHERE "{SERIAL_COL}" = %s
-        LIMIT 1
-    """
-    with _connect() as conn:
-        cur = conn.cursor()
-        cur.execute(query, (serial_no,))
-        exists = cur.fetchone() is not None
-    return exists
-
-def preprocessor(df: pd.DataFrame):
+def preprocessor(df: pd.DataFrame, deadline: Deadline | None = None):
 
     # 기본 변수
     is_car = (df.loc[0, '대분류'] == '자동차')
     id_num = df.loc[0, '일련번호']
 
+    # 일련번호 필터에 없으면 DB 조회 생략, 기한이 있으면 DB 조회를 I/O 스레드에서 먼저 시작
+    absent = _filtered_out(id_num)
+    db_future = aio.submit_io(_db_lookup, id_num, is_car) if deadline is not None and not absent else None
+
     # 기본 전처리
-    df = etc_processor(df)
-    if is_car:
-        df = car_processor(df)
+    df = _text_process(df, is_car)
+
+    # input_df로 만들기 (DB 조회는 한 번의 쿼리로 존재 여부와 행을 함께 확인)
+    degraded = False
+    if absent:
+        DB_row = None
+    elif db_future is None:
+        DB_row = _db_lookup(id_num, is_car)
+    else:
+        try:
+            DB_row = db_future.result(timeout=deadline.remaining(RESERVE_MS))
+        except TIMEOUT_ERRORS:
+            DB_row, degraded = _db_timeout()
+    return _mark(_assemble(df, DB_row, is_car), degraded)
+
+# 비동기 전처리: DB 조회를 먼저 시작하고, 조회하는 동안 문자열 전처리를 CPU 스레드 풀에서 실행
+# 기한 안에 DB 조회가 끝나지 않으면 DB에 없는 물건과 같이 처리 (DEGRADED_ATTR 표시)
+async def preprocessor_async(df: pd.DataFrame, deadline: Deadline | None = None):
+
+    # 기본 변수
+    is_car = (df.loc[0, '대분류'] == '자동차')
+    id_num = df.loc[0, '일련번호']
+
+    absent = _filtered_out(id_num)
+    db_future = None if absent else asyncio.ensure_future(aio.to_io(_db_lookup, id_num, is_car))
+    try:
+        df = await aio.to_cpu(_text_process, df, is_car)
+    except BaseException:
+        if db_future is not None:
+            db_future.cancel()
+        raise
+
+    degraded = False
+    if db_future is None:
+        DB_row = None
+    elif deadline is None:
+        DB_row = await db_future
+    else:
+        try:
+            DB_row = await asyncio.wait_for(asyncio.shield(db_future), timeout=deadline.remaining(RESERVE_MS))
+        except asyncio.TimeoutError:
+            db_future.add_done_callback(lambda f: f.cancelled() or f.exception())  # 늦게 난 오류는 무시
+            DB_row, degraded = _db_timeout()
+    return _mark(await aio.to_cpu(_assemble, df, DB_row, is_car), degraded)
+
+# DB 조회 시간 초과: 조회는 백그라운드에서 끝나도록 두고 DB에 없는 물건과 같이 처리
+def _db_timeout() -> tuple:
+    DB_LOOKUPS.inc(result='timeout')
+    print("DB 조회가 기한 안에 끝나지 않아 1차 기본값으로 예측합니다")
+    return None, True
+
+def _mark(df: pd.DataFrame, degraded: bool) -> pd.DataFrame:
+    if degraded:
+        df.attrs[DEGRADED_ATTR] = True
+    return df
 
-    # input_df로 만들기
-    if _in_DB(id_num):
-        DB_df = _get_DB(id_num, is_car).replace({None: np.nan})
+# 기본 전처리 (기관 분류, 자동차는 차종 / 제조사 매칭)
+def _text_process(df: pd.DataFrame, is_car: bool) -> pd.DataFrame:
+    with timed('etc_processor'):
+        df = etc_processor(df)
+    if is_car:
+        with timed('car_processor'):
+            df = car_processor(df)
+    return df
 
-        bid_cols = [f"{i}차최저입찰가" for i in range(1, 6)]
+# 일련번호 필터로 DB에 확실히 없는 물건인지 확인 (필터가 없으면 항상 False)
+def _filtered_out(id_num) -> bool:
+    if might_exist(id_num):
+        return False
+    DB_LOOKUPS.inc(result='filtered')
+    return True
 
-        def find_first_nan_round(df: pd.DataFrame) -> int | None:
-            for i, col in enumerate(bid_cols, start=1):
-                if col in df.columns and df[col].isna().any():
-                    return i  # 가장 먼저 결측치가 등장한 차수
-            return 5  # 결측치가 없을 경우
+# 일련번호로 DB 조회 (없으면 None)
+def _db_lookup(id_num, is_car: bool) -> RoundHistory | None:
+    with timed('db_lookup'):
+        history = fetch_row(id_num, is_car)
+    DB_LOOKUPS.inc(result='miss' if history is None else 'hit')
+    return history
 
-        DB_df['낙찰차수'] = find_first_nan_round(DB_df)
-        max_round = min(5, df.loc[0, '낙찰차수'])
-        max_round = 1 if max_round <= 0 else max_round
-        DB_df[f'{max_round}차최저입찰가'] = df['최저입찰가']
+# 전처리 결과와 DB 이력을 합쳐 모델 입력 구성 (DB에 없으면 1차 기본값)
+def _assemble(df: pd.DataFrame, history: RoundHistory | None, is_car: bool) -> pd.DataFrame:
+    if history is not None:
+        # DB 이력 + 낙찰차수(처음 비어 있는 차수, DB에서 계산) 차수의 최저입찰가를 현재 최저입찰가로 교체
+        row = _history_row(history)
+        row[BID_COLS[history.round - 1]] = df.loc[0, '최저입찰가']
+        DB_df = pd.DataFrame([row])
     else:
         DB_df = df.copy()
         DB_df['1차최저입찰가'] = df['최저입찰가']
-        DB_df['2차최저입찰가'] = pd.NA
-        DB_df['3차최저입찰가'] = pd.NA
-        DB_df['4차최저입찰가'] = pd.NA
-        DB_df['5차최저입찰가'] = pd.NA
+        DB_df['2차최저입찰가'] = np.nan
+        DB_df['3차최저입찰가'] = np.nan
+        DB_df['4차최저입찰가'] = np.nan
+        DB_df['5차최저입찰가'] = np.nan
         DB_df['낙찰차수'] = 1
         DB_df['최초입찰시기'] = df['개찰일시']
-    
-    for col in [f"{i}차최저입찰가" for i in range(1, 6)]:
-        DB_df[col] = pd.to_numeric(DB_df[col], errors="coerce")
 
     # 칼럼 정리
-    if is_car:
-        col = [
-            '일련번호', '대분류', '중분류', '소분류', '제조사', '차종', '물건정보', '기관', '최초입찰시기', 
-            '낙찰차수', '1차최저입찰가', '2차최저입찰가', '3차최저입찰가', '4차최저입찰가', '5차최저입찰가'
-        ]
-    else:
-        col = [
-            '일련번호', '대분류', '중분류', '물건정보', '기관', '최초입찰시기', '낙찰차수',
-            '1차최저입찰가', '2차최저입찰가', '3차최저입찰가', '4차최저입찰가', '5차최저입찰가'
-        ]
-    DB_df = DB_df[col]
+    DB_df = DB_df[CAR_COLS if is_car else ETC_COLS]
+
+    # 모델 공통 특성 (날짜 파생 변수, 입찰가 타입) 한 번만 생성
+    with timed('features'):
+        DB_df = build_features(DB_df)
+
+    return DB_df
+
+# DB 이력 -> 모델 입력 칼럼 값 (비어 있는 값은 NaN)
+def _history_row(history: RoundHistory) -> dict:
+    return {col: np.nan if value is None else value for col, value in history.to_columns().items()}
+
+# 일괄 전처리: 여러 물건을 자동차 / 기타로 나누어 문자열 전처리와 DB 조회(IN 쿼리 한 번)를 묶어서 실행
+# 반환: (자동차 결과, 기타 결과), 각각 CAR_COLS / ETC_COLS + ROW_COL(입력 행 위치) 칼럼, ROW_COL 순서
+# 행마다 preprocessor와 같은 결과이며, 전처리에서 제외된(한 행씩 처리하면 오류가 나는) 물건은 결과에 없음
+def preprocessor_batch(df: pd.DataFrame) -> tuple:
+    df = df.reset_index(drop=True)
+    df[ROW_COL] = np.arange(len(df))
+
+    # 자동차 여부는 preprocessor와 같이 입력의 대분류 기준
+    is_car = (df['대분류'] == '자동차').to_numpy()
+    results = []
+    for car in (True, False):
+        part = df[is_car == car]
+        processed = _text_process_batch(part, car) if not part.empty else None
+        if processed is None or processed.empty:
+            results.append(pd.DataFrame(columns=(CAR_COLS if car else ETC_COLS) + [ROW_COL]))
+            continue
+
+        # 일련번호 필터에 없는 물건은 조회 대상에서 제외 (모두 없으면 DB 조회 생략)
+        serials = processed['일련번호'].tolist()
+        maybe = might_exist_many(serials)
+        DB_LOOKUPS.inc(int((~maybe).sum()), result='filtered')
+        lookup = [s for s, m in zip(serials, maybe) if m]
+        if lookup:
+            with timed('db_lookup'):
+                histories = fetch_rows(lookup, car)
+        else:
+            histories = {}
+        hit = processed['일련번호'].isin(list(histories))
+        DB_LOOKUPS.inc(int(hit.sum()), result='hit')
+        DB_LOOKUPS.inc(int(len(lookup) - hit.sum()), result='miss')
+        results.append(_assemble_batch(processed, histories, hit, car))
+    return results[0], results[1]
+
+# 문자열 전처리를 한 번에 실행 (한 물건 때문에 전체가 실패하면 한 행씩 처리해 실패한 물건만 제외)
+def _text_process_batch(df: pd.DataFrame, is_car: bool) -> pd.DataFrame | None:
+    try:
+        return _text_process(df, is_car)
+    except Exception:
+        frames = []
+        for pos in range(len(df)):
+            try:
+                frames.append(_text_process(df.iloc[[pos]].reset_index(drop=True), is_car))
+            except Exception:
+                continue
+        frames = [f for f in frames if f is not None]
+        return pd.concat(frames, ignore_index=True) if frames else None
+
+# 전처리 결과와 DB 이력을 합쳐 모델 입력 구성 (_assemble의 일괄 버전)
+def _assemble_batch(df: pd.DataFrame, histories: dict, hit: pd.Series, is_car: bool) -> pd.DataFrame:
+    cols = CAR_COLS if is_car else ETC_COLS
+    frames = []
+
+    # DB에 있는 물건: DB 이력 + 낙찰차수 차수의 최저입찰가를 현재 최저입찰가로 교체
+    if hit.any():
+        found = df.loc[hit, [ROW_COL, '일련번호', '최저입찰가']]
+        DB_df = pd.DataFrame([_history_row(histories[serial]) for serial in found['일련번호']])
+        DB_df[ROW_COL] = found[ROW_COL].to_numpy()
+        rounds = DB_df['낙찰차수'].to_numpy()
+        bids = found['최저입찰가'].to_numpy()
+        for order in np.unique(rounds):
+            mask = rounds == order
+            DB_df.loc[mask, BID_COLS[order - 1]] = bids[mask]
+
+        # 날짜 형식이 행마다 다를 수 있으므로 값마다 변환 (한 행씩 변환하는 preprocessor와 같은 결과)
+        DB_df['최초입찰시기'] = pd.to_datetime(DB_df['최초입찰시기'], format='mixed')
+        frames.append(DB_df[cols + [ROW_COL]])
+
+    # DB에 없는 물건: 1차 기본값
+    if (~hit).any():
+        new_df = df.loc[~hit].copy()
+        new_df['1차최저입찰가'] = new_df['최저입찰가']
+        for col in BID_COLS[1:]:
+            new_df[col] = np.nan
+        new_df['낙찰차수'] = 1
+        new_df['최초입찰시기'] = new_df['개찰일시']
+        frames.append(new_df[cols + [ROW_COL]])
+
+    if not frames:
+        return pd.DataFrame(columns=cols + [ROW_COL])
+    out = pd.concat(frames, ignore_index=True).sort_values(ROW_COL, kind='stable').reset_index(drop=True)
 
-    return DB_df
\ No newline at end of file
+    # 모델 공통 특성 (날짜 파생 변수, 입찰가 타입) 한 번에 생성
+    with timed('features'):
+        out = build_features(out)
+    return out
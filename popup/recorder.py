@@ -0,0 +1,28 @@
+# recorder.py
+# 요청 기록: ONBID_RECORD에 파일 경로를 지정하면 예측 요청 본문을 JSONL로 저장 (부하 테스트 재생용)
+# python -m bench.loadtest replay --payloads <기록 파일>
+
+import json
+import os
+import threading
+import time
+
+# 설정: 환경 변수로 변경 가능
+RECORD_PATH = os.getenv("ONBID_RECORD", "")                                   # 비어 있으면 기록 안 함
+RECORD_ENDPOINTS = tuple(os.getenv("ONBID_RECORD_ENDPOINTS", "/predict,/prob_predict").split(","))
+
+_lock = threading.Lock()
+
+def enabled() -> bool:
+    return bool(RECORD_PATH)
+
+# 한 줄에 요청 하나: {"ts": 시각, "endpoint": 경로, "status": 응답 코드, "payload": 요청 본문}
+# (작업 프로세스가 여러 개여도 줄 단위 append라 섞이지 않음)
+def record(endpoint: str, payload, status: int, path: str = RECORD_PATH):
+    if not path or endpoint not in RECORD_ENDPOINTS or not isinstance(payload, dict):
+        return
+    line = json.dumps({'ts': round(time.time(), 3), 'endpoint': endpoint, 'status': status, 'payload': payload},
+                      ensure_ascii=False)
+    with _lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
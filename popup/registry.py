@@ -0,0 +1,151 @@
+# registry.py
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+
+# 로컬 모델 저장소: manifest.json에 (레포, 파일) -> 경로 / 체크섬 / 버전 기록
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.getenv("ONBID_MODEL_DIR", os.path.join(BASE_DIR, "models"))
+OFFLINE = os.getenv("ONBID_MODEL_OFFLINE", "0") == "1"   # 1이면 Hugging Face 접속 안 함
+MANIFEST_NAME = "manifest.json"
+
+# 서버가 사용하는 모델 파일 목록: (레포, 파일)
+ARTIFACTS = [
+    ("asteroidddd/onbid-map-prob", "models/overall_dict.pkl"),
+    ("asteroidddd/onbid-map-prob", "models/major_dict.pkl"),
+    ("asteroidddd/onbid-map-prob", "models/minor_dict.pkl"),
+    ("asteroidddd/onbid-map-round", "auction_pipeline.pkl"),
+    ("asteroidddd/onbid-map-round", "label_encoder.pkl"),
+] + [
+    (repo, f"models_by_order/order{order}/pipeline.pkl")
+    for repo in ("asteroidddd/onbid-map-carp", "asteroidddd/onbid-map-etcp")
+    for order in range(1, 6)
+]
+
+_lock = threading.Lock()
+_verified = {}
+
+def _key(repo_id: str, filename: str) -> str:
+    return f"{repo_id}/{filename}"
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_manifest(model_dir: str = MODEL_DIR) -> dict:
+    path = os.path.join(model_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"artifacts": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(manifest: dict, model_dir: str = MODEL_DIR):
+    os.makedirs(model_dir, exist_ok=True)
+    path = os.path.join(model_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+# 로컬 저장소 경로 (없거나 체크섬이 다르면 None)
+def local_path(repo_id: str, filename: str, model_dir: str = MODEL_DIR) -> str | None:
+    entry = load_manifest(model_dir)["artifacts"].get(_key(repo_id, filename))
+    if entry is None:
+        return None
+    path = os.path.join(model_dir, entry["path"])
+    if not os.path.exists(path):
+        return None
+
+    # 체크섬은 파일(경로, 수정 시각)당 한 번만 검사
+    stamp = (path, os.path.getmtime(path), entry["sha256"])
+    with _lock:
+        ok = _verified.get(stamp)
+    if ok is None:
+        ok = _sha256(path) == entry["sha256"]
+        with _lock:
+            _verified[stamp] = ok
+    if not ok:
+        print(f"체크섬 불일치로 로컬 모델을 사용하지 않습니다: {path}")
+        return None
+    return path
+
+# 모델 파일 경로: 로컬 저장소 우선, 없으면 Hugging Face 허브에서 다운로드
+def fetch_artifact(repo_id: str, filename: str, model_dir: str = MODEL_DIR) -> str:
+    path = local_path(repo_id, filename, model_dir)
+    if path is not None:
+        return path
+    if OFFLINE:
+        raise FileNotFoundError(f"로컬 모델 저장소에 없는 파일입니다: {_key(repo_id, filename)}")
+    from huggingface_hub import hf_hub_download
+    return hf_hub_download(repo_id=repo_id, filename=filename)
+
+# 파일을 로컬 저장소에 등록 (복사 후 manifest 갱신)
+def add_artifact(repo_id: str, filename: str, src_path: str, version: str = "local",
+                 model_dir: str = MODEL_DIR) -> dict:
+    rel_path = os.path.join(repo_id.split("/")[-1], filename)
+    dst_path = os.path.join(model_dir, rel_path)
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    if os.path.abspath(src_path) != os.path.abspath(dst_path):
+        shutil.copyfile(src_path, dst_path)
+
+    entry = {"path": rel_path, "sha256": _sha256(dst_path), "version": version}
+    with _lock:
+        manifest = load_manifest(model_dir)
+        manifest["artifacts"][_key(repo_id, filename)] = entry
+        save_manifest(manifest, model_dir)
+    return entry
+
+# Hugging Face 허브에서 전체 모델을 받아 로컬 저장소 구성
+def pull(model_dir: str = MODEL_DIR, artifacts: list = ARTIFACTS):
+    from huggingface_hub import hf_hub_download, HfApi
+    api = HfApi()
+    versions = {}
+    for repo_id, filename in artifacts:
+        if repo_id not in versions:
+            versions[repo_id] = api.model_info(repo_id).sha
+        src = hf_hub_download(repo_id=repo_id, filename=filename, revision=versions[repo_id])
+        entry = add_artifact(repo_id, filename, src, versions[repo_id], model_dir)
+        print(f"{_key(repo_id, filename)} -> {entry['path']} ({entry['version'][:7]})")
+
+# 저장소 검사: 누락 / 체크섬 불일치 파일 목록
+def verify(model_dir: str = MODEL_DIR, artifacts: list = ARTIFACTS) -> list:
+    return [_key(r, f) for r, f in artifacts if local_path(r, f, model_dir) is None]
+
+# 저장소 버전: 모델 파일 체크섬 전체의 해시 (모델이 바뀌면 달라짐, 로컬 저장소에 없는 파일이 있으면 None)
+def manifest_version(model_dir: str = MODEL_DIR, artifacts: list = ARTIFACTS) -> str | None:
+    entries = load_manifest(model_dir)["artifacts"]
+    h = hashlib.sha1()
+    for repo_id, filename in sorted(artifacts):
+        entry = entries.get(_key(repo_id, filename))
+        if entry is None:
+            return None
+        h.update(f"{_key(repo_id, filename)}={entry['sha256']}\n".encode("utf-8"))
+    return h.hexdigest()
+
+# 명령행: python -m popup.registry pull | verify
+def main():
+    parser = argparse.ArgumentParser(description="로컬 모델 저장소 관리")
+    parser.add_argument("command", choices=["pull", "verify"])
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    if args.command == "pull":
+        pull(args.model_dir)
+    else:
+        missing = verify(args.model_dir)
+        if missing:
+            print("누락되었거나 체크섬이 다른 파일:")
+            for key in missing:
+                print(f"  {key}")
+        else:
+            print(f"모든 모델 파일 확인 완료: {args.model_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# scheduler.py
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import pandas as pd
+from .deadline import TIMEOUT_ERRORS
+
+# 설정: 환경 변수로 변경 가능
+BATCH_ENABLED  = os.getenv("ONBID_BATCH", "1") == "1"
+BATCH_MAX_WAIT = float(os.getenv("ONBID_BATCH_MAX_WAIT_MS", "5")) / 1000   # 배치 대기 시간(초)
+BATCH_MAX_SIZE = int(os.getenv("ONBID_BATCH_MAX_SIZE", "64"))               # 최대 배치 크기
+BATCH_TIMEOUT  = float(os.getenv("ONBID_BATCH_TIMEOUT", "30"))              # 요청당 결과 대기 시간(초)
+
+# 작업 스레드 종료 표시 (대기열에서 이 값 앞의 작업까지 처리한 뒤 종료)
+_STOP = object()
+
+# 예측 작업 1건: 전처리된 한 행 + (확률만 계산할 경우) 낙찰가율
+class _Job:
+
+    def __init__(self, df: pd.DataFrame, ratio=None):
+        self.df = df
+        self.ratio = ratio
+        self.future = Future()
+
+# 마이크로 배치 스케줄러: 짧은 시간 동안 들어온 요청을 모아 모델을 배치당 한 번씩 실행
+class BatchScheduler:
+
+    def __init__(self, model, max_wait: float = BATCH_MAX_WAIT, max_size: int = BATCH_MAX_SIZE):
+        self.model = model
+        self.max_wait = max_wait
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+
+        # 통계
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._max_depth = 0
+        self._size_hist = {}
+
+    # 작업 스레드는 처음 사용할 때 (fork 이후에는 자식 프로세스에서 다시) 시작
+    def _ensure_worker(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+                self._thread.start()
+
+    # 요청 제출: (추천 낙찰가율, 낙찰 확률) 반환
+    # ratio가 없으면 가격 모델로 추천 낙찰가율을 구해 그 값의 확률을, 있으면 주어진 값의 확률만 계산
+    # 종료된 스케줄러(모델 재로드 직전에 가져간 경우)에 제출하면 요청 스레드에서 바로 처리
+    def submit(self, df: pd.DataFrame, ratio=None, timeout: float = BATCH_TIMEOUT) -> tuple:
+        job = _Job(df, ratio)
+        if not self._stopped:
+            self._ensure_worker()
+        with self._lock:
+            stopped = self._stopped
+            if not stopped:
+                self._queue.put(job)
+        if stopped:
+            self._run_batch([job])
+            return job.future.result()
+        depth = self._queue.qsize()
+        if depth > self._max_depth:
+            self._max_depth = depth
+        try:
+            return job.future.result(timeout=timeout)
+        except TIMEOUT_ERRORS:
+            raise TimeoutError(f"배치 예측 결과를 {timeout:g}초 안에 받지 못했습니다") from None
+
+    # 작업 스레드 종료: 이미 제출된 작업은 모두 처리한 뒤 종료될 때까지 대기 (이후 제출은 요청 스레드에서 처리)
+    def stop(self, timeout: float | None = None):
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            thread = self._thread if self._pid == os.getpid() else None
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
+
+    # 작업 스레드: 첫 요청 이후 max_wait 동안 또는 max_size까지 모아서 처리 (_STOP을 받으면 모은 작업까지 처리 후 종료)
+    def _run(self):
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            jobs = [job]
+            deadline = time.monotonic() + self.max_wait
+            while len(jobs) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                jobs.append(job)
+
+            self._run_batch(jobs)
+
+    # 배치 하나 처리 (오류는 결과를 받지 못한 작업에 전달)
+    def _run_batch(self, jobs: list):
+        self._record(len(jobs))
+        try:
+            self._process(jobs)
+        except Exception as e:
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(e)
+
+    # 배치 처리: 가격 모델(차수 예측 포함) 한 번, 확률 모델 한 번
+    def _process(self, jobs: list):
+        batch_df = pd.concat([job.df for job in jobs], ignore_index=True)
+
+        ratios = pd.Series([job.ratio for job in jobs], dtype=float)
+        price_idx = [i for i, job in enumerate(jobs) if job.ratio is None]
+        if price_idx:
+            price_df = self.model.price_predict_batch(batch_df.loc[price_idx])
+            for i in price_idx:
+                error = price_df.loc[i, 'error']
+                if error is not None and not pd.isna(error):
+                    jobs[i].future.set_exception(RuntimeError(error))
+                else:
+                    ratios[i] = price_df.loc[i, 'predicted']
+
+        ok_idx = [i for i, job in enumerate(jobs) if not job.future.done()]
+        if not ok_idx:
+            return
+
+        prob_df = batch_df.loc[ok_idx].copy()
+        prob_df['낙찰가율_최초최저가기준'] = ratios[ok_idx]
+        probs = self.model.prob_predict_batch(prob_df)
+        for i in ok_idx:
+            jobs[i].future.set_result((float(ratios[i]), float(probs.loc[i])))
+
+    def _record(self, size: int):
+        with self._lock:
+            self._batches += 1
+            self._items += size
+            self._max_batch = max(self._max_batch, size)
+            bucket = 1
+            while bucket < size:
+                bucket *= 2
+            self._size_hist[bucket] = self._size_hist.get(bucket, 0) + 1
+
+    # 튜닝용 통계: 대기열 길이, 배치 크기
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self._max_depth,
+                'batches': self._batches,
+                'items': self._items,
+                'avg_batch_size': round(self._items / self._batches, 2) if self._batches else 0,
+                'max_batch_size': self._max_batch,
+                'batch_size_hist': {f'<={k}': v for k, v in sorted(self._size_hist.items())},
+                'max_wait_ms': self.max_wait * 1000,
+                'max_size': self.max_size,
+            }
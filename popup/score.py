@@ -0,0 +1,147 @@
+# score.py
+# 대용량 물건 목록 일괄 예측: CSV / JSONL을 청크 단위로 읽어 작업 프로세스에 나누어 예측하고 결과를 바로 파일에 기록
+# (입력 크기와 관계없이 메모리에는 처리 중인 청크만 유지)
+# python -m popup.score listings.csv --out scores.csv --workers 4 --chunk-size 1000
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from .items import ITEM_FIELDS, predict_items, records_from_frame
+
+# 설정: 환경 변수로 변경 가능
+CHUNK_SIZE = int(os.getenv("ONBID_SCORE_CHUNK", "1000"))                     # 청크당 물건 수
+WORKERS    = int(os.getenv("ONBID_SCORE_WORKERS", str(os.cpu_count() or 1)))  # 작업 프로세스 수
+
+OUTPUT_FIELDS = ['row', 'id', 'predicted_rate', 'recommend_bid', 'error']
+
+# 입력 읽기: 청크마다 클라이언트 JSON 형태 dict 목록 반환
+def iter_chunks(path: str, chunk_size: int = CHUNK_SIZE):
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            lines = (line for line in f if line.strip())
+            while True:
+                block = list(itertools.islice(lines, chunk_size))
+                if not block:
+                    break
+                items = []
+                for line in block:
+                    data = json.loads(line)
+                    if isinstance(data, dict) and '일련번호' in data:
+                        data = {ITEM_FIELDS.get(k, k): v for k, v in data.items()}
+                    items.append(data)
+                yield items
+    else:
+        reader = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig", chunksize=chunk_size)
+        for df in reader:
+            yield records_from_frame(df)
+
+# 결과 기록: 확장자에 따라 CSV / JSONL, 청크마다 바로 flush
+class _Writer:
+
+    def __init__(self, path: str):
+        self._file = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+        self._jsonl = path.endswith(".jsonl")
+        if not self._jsonl:
+            self._csv = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, rows: list):
+        if self._jsonl:
+            self._file.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        else:
+            self._csv.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+# 작업 프로세스용 모델 (부모가 로드한 뒤 fork로 공유)
+_model = None
+
+# 청크 예측: 입력 순서대로 결과 행 (실패한 항목은 error만 채움)
+def _score_chunk(offset: int, items: list) -> list:
+    results = predict_items(_model, items)
+    rows = []
+    for pos, (data, result) in enumerate(zip(items, results)):
+        result = result or {'error': '결과 없음'}
+        rows.append({
+            'row': offset + pos,
+            'id': data.get('id') if isinstance(data, dict) else None,
+            'predicted_rate': result.get('predicted_rate'),
+            'recommend_bid': result.get('recommend_bid'),
+            'error': result.get('error'),
+        })
+    return rows
+
+# 전체 실행: 작업 프로세스마다 최대 2개 청크까지만 대기시키고, 끝난 청크는 입력 순서대로 기록
+def score(path: str, out: str, model=None, chunk_size: int = CHUNK_SIZE, workers: int = WORKERS,
+          report_every: float = 5.0) -> dict:
+    global _model
+    if _model is None:
+        from .model import PredictModel
+        _model = model if model is not None else PredictModel()
+
+    writer = _Writer(out)
+    start = last_report = time.perf_counter()
+    total = errors = 0
+
+    def emit(rows):
+        nonlocal total, errors, last_report
+        writer.write(rows)
+        total += len(rows)
+        errors += sum(1 for r in rows if r['error'])
+        now = time.perf_counter()
+        if now - last_report >= report_every:
+            last_report = now
+            print(f"{total}개 처리, {total / (now - start):.1f} rows/sec, 오류 {errors}개", file=sys.stderr)
+
+    offsets = itertools.count(0, chunk_size)
+    try:
+        if workers <= 1:
+            for items in iter_chunks(path, chunk_size):
+                emit(_score_chunk(next(offsets), items))
+        else:
+            # fork: 작업 프로세스가 부모의 모델을 copy-on-write로 공유 (모델을 다시 로드하지 않음)
+            ctx = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                pending = deque()
+                for items in iter_chunks(path, chunk_size):
+                    pending.append(pool.submit(_score_chunk, next(offsets), items))
+                    while len(pending) >= workers * 2:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        'rows': total,
+        'errors': errors,
+        'seconds': round(elapsed, 2),
+        'rows_per_sec': round(total / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    print(f"완료: {summary}", file=sys.stderr)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="물건 목록 일괄 예측 (CSV / JSONL 스트리밍)")
+    parser.add_argument("input", help="물건 목록 (CSV 또는 JSONL, 온비드 내보내기 칼럼 또는 클라이언트 JSON 키)")
+    parser.add_argument("--out", default="scores.csv", help="결과 파일 (.csv / .jsonl, -: 표준 출력)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="작업 프로세스 수")
+    args = parser.parse_args()
+
+    score(args.input, args.out, chunk_size=args.chunk_size, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
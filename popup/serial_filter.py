@@ -0,0 +1,185 @@
+# serial_filter.py
+# DB에 없는 물건 거르기: ONBID_RESULTS의 일련번호로 만든 블룸 필터
+# 필터에 없다고 나오면 DB에 확실히 없는 물건이므로 DB 조회 없이 1차 기본값으로 처리 (있다고 나오면 기존대로 조회)
+# python -m popup.serial_filter refresh --out serial_filter.bin            (DB에서 일련번호를 읽어 생성)
+# python -m popup.serial_filter refresh --source serials.csv --out ...     (내보낸 일련번호 목록으로 생성)
+# 서버는 ONBID_SERIAL_FILTER=serial_filter.bin이면 파일을 읽고, 파일이 바뀌면 다시 읽음
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import numpy as np
+from .db import SERIAL_COL, DB_BACKEND, create_backend
+
+# 설정: 환경 변수로 변경 가능
+FILTER_PATH    = os.getenv("ONBID_SERIAL_FILTER", "")                    # 비어 있으면 사용 안 함
+FALSE_POSITIVE = float(os.getenv("ONBID_SERIAL_FILTER_FPR", "0.01"))     # 목표 오탐률 (없는 물건을 있다고 판단할 확률)
+CHECK_INTERVAL = float(os.getenv("ONBID_SERIAL_FILTER_CHECK", "60"))     # 파일 변경 확인 주기(초)
+
+MAGIC = b"ONBIDBF1"
+
+# 일련번호 -> 해시 두 개 (비트 위치는 h1 + i * h2, uint64 연산)
+def _hashes(serials) -> tuple:
+    digests = b"".join(hashlib.blake2b(str(s).encode("utf-8"), digest_size=16).digest() for s in serials)
+    h = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+    return h[:, 0], h[:, 1] | np.uint64(1)
+
+class SerialFilter:
+
+    def __init__(self, bits: np.ndarray, n_bits: int, n_hashes: int, meta: dict | None = None):
+        self.bits = bits
+        self.n_bits = n_bits
+        self.n_hashes = n_hashes
+        self.meta = meta or {}
+
+    # 일련번호 n개, 목표 오탐률 fpr에 맞는 크기로 생성
+    @classmethod
+    def build(cls, serials, fpr: float = FALSE_POSITIVE, **meta) -> "SerialFilter":
+        serials = list(dict.fromkeys(str(s) for s in serials))
+        n = max(len(serials), 1)
+        n_bits = max(64, math.ceil(-n * math.log(fpr) / math.log(2) ** 2))
+        n_bits = (n_bits + 7) // 8 * 8
+        n_hashes = max(1, round(-math.log2(fpr)))
+
+        bits = np.zeros(n_bits // 8, dtype=np.uint8)
+        flt = cls(bits, n_bits, n_hashes, {**meta, 'count': len(serials), 'fpr': fpr, 'built_at': time.time()})
+        for i in range(0, len(serials), 100000):
+            pos = flt._positions(serials[i:i + 100000]).ravel()
+            np.bitwise_or.at(bits, pos >> 3, (1 << (pos & 7)).astype(np.uint8))
+        return flt
+
+    def _positions(self, serials) -> np.ndarray:
+        h1, h2 = _hashes(serials)
+        i = np.arange(self.n_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return ((h1[:, None] + i[None, :] * h2[:, None]) % np.uint64(self.n_bits)).astype(np.int64)
+
+    # 일련번호마다 DB에 있을 수 있으면 True (False면 확실히 없음)
+    def might_contain_many(self, serials) -> np.ndarray:
+        serials = [str(s) for s in serials]
+        if not serials:
+            return np.zeros(0, dtype=bool)
+        pos = self._positions(serials)
+        return ((self.bits[pos >> 3] >> (pos & 7)) & 1).astype(bool).all(axis=1)
+
+    def might_contain(self, serial) -> bool:
+        return bool(self.might_contain_many([serial])[0])
+
+    def __contains__(self, serial) -> bool:
+        return self.might_contain(serial)
+
+    # 파일 형식: MAGIC + 헤더(JSON 한 줄) + 비트 배열 (다른 프로세스가 읽는 중에도 안전하도록 임시 파일 후 교체)
+    def save(self, path: str):
+        header = json.dumps({'n_bits': self.n_bits, 'n_hashes': self.n_hashes, **self.meta}, ensure_ascii=False)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + b"\n" + header.encode("utf-8") + b"\n")
+            f.write(self.bits.tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "SerialFilter":
+        with open(path, "rb") as f:
+            if f.readline().rstrip(b"\n") != MAGIC:
+                raise ValueError(f"일련번호 필터 파일이 아닙니다: {path}")
+            meta = json.loads(f.readline())
+            bits = np.frombuffer(f.read(), dtype=np.uint8)
+        n_bits, n_hashes = meta.pop('n_bits'), meta.pop('n_hashes')
+        if len(bits) * 8 != n_bits:
+            raise ValueError(f"일련번호 필터 파일이 손상되었습니다: {path}")
+        return cls(bits, n_bits, n_hashes, meta)
+
+    def stats(self) -> dict:
+        return {
+            'count': self.meta.get('count'),
+            'fpr': self.meta.get('fpr'),
+            'bytes': len(self.bits),
+            'hashes': self.n_hashes,
+            'built_at': self.meta.get('built_at'),
+            'source': self.meta.get('source'),
+        }
+
+# 프로세스 전역 필터: 처음 사용할 때 읽고, CHECK_INTERVAL마다 파일 수정 시각을 확인해 바뀌었으면 다시 읽음
+_filter = None
+_mtime = None
+_checked = 0.0
+_lock = threading.Lock()
+
+def get_filter(path: str = FILTER_PATH) -> SerialFilter | None:
+    global _filter, _mtime, _checked
+    if not path:
+        return _filter
+    now = time.monotonic()
+    if _checked and now - _checked < CHECK_INTERVAL:
+        return _filter
+    with _lock:
+        if _checked and now - _checked < CHECK_INTERVAL:
+            return _filter
+        _checked = now
+        try:
+            mtime = os.stat(path).st_mtime
+            if mtime != _mtime:
+                _filter, _mtime = SerialFilter.load(path), mtime
+                print(f"일련번호 필터 로드: {path} ({_filter.stats()['count']}개)")
+        except (OSError, ValueError) as e:
+            # 파일이 없거나 읽을 수 없으면 필터 없이 모두 DB 조회
+            print(f"일련번호 필터를 사용할 수 없습니다: {e}")
+            _filter, _mtime = None, None
+    return _filter
+
+# 파일 대신 직접 만든 필터 사용 (None이면 파일을 다시 읽음)
+def set_filter(flt: SerialFilter | None):
+    global _filter, _checked
+    _filter, _checked = flt, (time.monotonic() if flt is not None else 0.0)
+
+# DB에 있을 수 있는 물건인지 (필터가 없으면 항상 True)
+def might_exist(serial) -> bool:
+    flt = get_filter()
+    return True if flt is None else flt.might_contain(serial)
+
+def might_exist_many(serials) -> np.ndarray:
+    flt = get_filter()
+    return np.ones(len(serials), dtype=bool) if flt is None else flt.might_contain_many(serials)
+
+# 내보낸 일련번호 목록 읽기: 한 줄에 하나(.txt) 또는 일련번호 칼럼이 있는 CSV
+def read_serials(path: str) -> list:
+    if path.endswith(".csv"):
+        import pandas as pd
+        return pd.read_csv(path, usecols=[SERIAL_COL], dtype=str, encoding="utf-8-sig")[SERIAL_COL].dropna().tolist()
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description="DB에 없는 물건을 거르는 일련번호 필터 관리")
+    parser.add_argument("command", choices=["refresh", "stats", "check"])
+    parser.add_argument("--out", default=FILTER_PATH or "serial_filter.bin", help="필터 파일 경로")
+    parser.add_argument("--source", default=None, help="내보낸 일련번호 목록 (.txt / .csv, 기본: DB에서 읽기)")
+    parser.add_argument("--backend", default=DB_BACKEND, help="DB 백엔드 (snowflake | sqlite)")
+    parser.add_argument("--fpr", type=float, default=FALSE_POSITIVE, help="목표 오탐률")
+    parser.add_argument("serials", nargs="*", help="check: 확인할 일련번호")
+    args = parser.parse_intermixed_args()
+
+    if args.command == "refresh":
+        start = time.time()
+        if args.source:
+            serials, source = read_serials(args.source), args.source
+        else:
+            backend = create_backend(args.backend)
+            serials = [s for batch in backend.iter_serials() for s in batch]
+            source = f"{args.backend}:ONBID_RESULTS"
+        flt = SerialFilter.build(serials, args.fpr, source=source)
+        flt.save(args.out)
+        print(f"필터 생성 완료 ({time.time() - start:.1f}초): {args.out} {flt.stats()}")
+    elif args.command == "stats":
+        print(SerialFilter.load(args.out).stats())
+    else:
+        flt = SerialFilter.load(args.out)
+        for serial in args.serials:
+            print(serial, "있을 수 있음" if serial in flt else "없음")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# serve.py
+# 운영 서버: 부모 프로세스에서 모델을 한 번 로드한 뒤 작업 프로세스를 fork (모델 메모리는 copy-on-write로 공유)
+# python -m popup.serve --workers 4
+
+import argparse
+import gc
+import os
+import signal
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import BaseWSGIServer, select_address_family
+from . import metrics
+from .admission import RETRY_AFTER, EXPENSIVE_LIMIT, QUEUE_LIMIT
+
+# 설정: 환경 변수로 변경 가능
+HOST    = os.getenv("ONBID_HOST", "0.0.0.0")
+PORT    = int(os.getenv("ONBID_PORT", "5001"))
+WORKERS = int(os.getenv("ONBID_WORKERS", str(os.cpu_count() or 1)))   # 작업 프로세스 수
+THREADS_RESERVE = int(os.getenv("ONBID_THREADS_RESERVE", "4"))        # 무거운 요청이 모두 차 있어도 가벼운 요청에 남겨 둘 스레드 수
+# 프로세스당 요청 처리 스레드 수: 기본값은 무거운 요청(처리 중 + 대기) 상한 + 가벼운 요청 몫
+THREADS = int(os.getenv("ONBID_THREADS", str(EXPENSIVE_LIMIT + QUEUE_LIMIT + max(1, THREADS_RESERVE))))
+BACKLOG = int(os.getenv("ONBID_BACKLOG", "1024"))
+GRACEFUL_TIMEOUT = float(os.getenv("ONBID_GRACEFUL_TIMEOUT", "30"))   # 종료 시 처리 중인 요청 대기 시간(초)
+PENDING = int(os.getenv("ONBID_PENDING", "64"))                       # 스레드를 기다리는 연결 수 상한 (넘으면 바로 503)
+
+# 대기 연결이 가득 찼을 때 Flask를 거치지 않고 보내는 응답
+_BUSY_RESPONSE = (
+    "HTTP/1.1 503 Service Unavailable\r\n"
+    f"Retry-After: {RETRY_AFTER}\r\n"
+    "Content-Length: 0\r\n"
+    "Connection: close\r\n\r\n"
+).encode("ascii")
+
+# 스레드 풀 WSGI 서버: 요청마다 스레드를 만들지 않고 고정 개수의 스레드에서 처리
+class PooledWSGIServer(BaseWSGIServer):
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, app, threads: int = THREADS, fd: int | None = None,
+                 pending: int = PENDING):
+        super().__init__(host, port, app, fd=fd)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="request")
+
+        # 처리 중 + 대기 중인 연결 수 (스레드 풀 대기열이 한없이 길어지지 않도록 제한)
+        self.max_open = threads + max(0, pending)
+        self._open = 0
+        self._open_lock = threading.Lock()
+
+        # 여러 프로세스가 같은 소켓을 기다리므로 다른 프로세스가 먼저 accept해도 멈추지 않도록 논블로킹
+        self.socket.setblocking(False)
+
+    def get_request(self):
+        conn, addr = self.socket.accept()
+        conn.setblocking(True)
+        return conn, addr
+
+    def process_request(self, request, client_address):
+        with self._open_lock:
+            busy = self._open >= self.max_open
+            if not busy:
+                self._open += 1
+        if busy:
+            self._reject(request)
+            return
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._open_lock:
+                self._open -= 1
+
+    # 요청을 읽지 않고 503 응답 후 연결 종료
+    def _reject(self, request):
+        try:
+            request.settimeout(1.0)
+            request.sendall(_BUSY_RESPONSE)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+    # 새 연결 수락 중지 후 처리 중인 요청이 끝날 때까지 대기
+    def drain(self):
+        self.pool.shutdown(wait=True)
+
+# 부모 프로세스에서 리슨 소켓 생성 (작업 프로세스가 같은 소켓에서 accept)
+def _listen(host: str, port: int, backlog: int = BACKLOG) -> socket.socket:
+    sock = socket.socket(select_address_family(host, port), socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+# 작업 프로세스: SIGTERM을 받으면 accept를 멈추고 처리 중인 요청을 마친 뒤 종료
+def _worker(app, sock: socket.socket, host: str, port: int, threads: int):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # Ctrl-C는 부모가 처리
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+    server = PooledWSGIServer(host, port, app, threads, fd=sock.fileno())
+    sock.close()
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, stop)
+
+    # 무거운 요청이 자리를 기다리는 동안에도 스레드가 남아야 /health 등 가벼운 요청을 처리할 수 있음
+    if threads <= EXPENSIVE_LIMIT + QUEUE_LIMIT:
+        print(f"[worker {os.getpid()}] 경고: 스레드 수({threads})가 ONBID_ADMIT_EXPENSIVE + ONBID_ADMIT_QUEUE"
+              f"({EXPENSIVE_LIMIT + QUEUE_LIMIT}) 이하라 가벼운 요청이 무거운 요청 뒤에서 기다릴 수 있습니다")
+    # 지표는 부모에서 물려받은 값을 비우고 이 프로세스 값만 공유 디렉터리에 기록 (/metrics는 전체 합계)
+    metrics.reset()
+    flusher = metrics.start_flusher()
+
+    print(f"[worker {os.getpid()}] 요청 처리 시작 (스레드 {threads}개)")
+    server.serve_forever()
+    server.drain()
+    flusher.set()
+    metrics.write_snapshot()
+    print(f"[worker {os.getpid()}] 종료")
+
+# 부모 프로세스: 작업 프로세스 관리 (비정상 종료 시 재시작, SIGHUP: 모델 재로드 후 순차 교체, SIGTERM/SIGINT: 종료)
+class Master:
+
+    def __init__(self, host: str = HOST, port: int = PORT, workers: int = WORKERS, threads: int = THREADS):
+        self.host = host
+        self.port = port
+        self.n_workers = max(1, workers)
+        self.threads = max(1, threads)
+        self.workers = set()
+        self._stopping = False
+        self._reloading = False
+
+    def _spawn(self):
+        from . import server
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _worker(server.app, self.sock, self.host, self.port, self.threads)
+            except Exception as e:
+                print(f"[worker {os.getpid()}] 오류로 종료: {e}")
+                code = 1
+            finally:
+                sys.stdout.flush()
+                os._exit(code)
+        self.workers.add(pid)
+
+    def _signal(self, signum, frame):
+        if signum == signal.SIGHUP:
+            self._reloading = True
+        else:
+            self._stopping = True
+
+    # 종료된 작업 프로세스 회수
+    def _reap(self) -> list:
+        dead = []
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if pid in self.workers:
+                self.workers.discard(pid)
+                metrics.retire(pid)
+                dead.append((pid, status))
+        return dead
+
+    # 작업 프로세스에 SIGTERM 전송 후 종료 대기 (시간 초과 시 SIGKILL)
+    def _stop_workers(self, pids: set, timeout: float = GRACEFUL_TIMEOUT):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        pending = set(pids)
+        while pending and time.monotonic() < deadline:
+            for pid, _ in self._reap():
+                pending.discard(pid)
+            pending &= self.workers
+            time.sleep(0.05)
+        for pid in pending:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self._reap()
+
+    # 모델을 다시 로드한 뒤 새 작업 프로세스를 띄우고 기존 프로세스를 정상 종료
+    def _reload(self):
+        from . import server
+        self._reloading = False
+        print("모델 재로드 후 작업 프로세스를 교체합니다")
+        try:
+            server.reload_model()
+        except Exception as e:
+            print(f"모델 재로드 실패, 기존 모델로 작업 프로세스만 교체합니다: {e}")
+        gc.freeze()
+        metrics.write_snapshot(gauges=False)
+
+        old = set(self.workers)
+        for _ in range(self.n_workers):
+            self._spawn()
+        self._stop_workers(old)
+
+    def run(self):
+        # 모델은 부모에서 한 번만 로드 (import 시 PredictModel 생성)
+        from . import server
+        if server.model is None:
+            print("모델이 로드되지 않은 상태로 시작합니다")
+
+        self.sock = _listen(self.host, self.port)
+        metrics_dir = self._metrics_dir()
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self._signal)
+
+        # fork 이후 GC가 공유 객체를 건드려 페이지가 복사되지 않도록 현재 객체를 고정
+        gc.freeze()
+        metrics.write_snapshot(gauges=False)
+        print(f"운영 서버 시작: http://{self.host}:{self.port} (작업 프로세스 {self.n_workers}개 x 스레드 {self.threads}개, "
+              f"부모 pid {os.getpid()})")
+
+        while not self._stopping:
+            if self._reloading:
+                self._reload()
+            for pid, status in self._reap():
+                print(f"[worker {pid}] 비정상 종료 (status {status}), 다시 시작합니다")
+            while len(self.workers) < self.n_workers and not self._stopping:
+                self._spawn()
+            time.sleep(0.2)
+
+        print("작업 프로세스를 종료합니다")
+        self._stop_workers(set(self.workers))
+        self.sock.close()
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+    # 작업 프로세스 간 지표 공유 디렉터리 준비 (ONBID_METRICS_DIR이 없으면 임시 디렉터리를 만들고 종료 시 삭제)
+    # 지정한 디렉터리는 이전 실행의 파일을 지움 (서버를 다시 시작하면 카운터도 0부터 시작)
+    def _metrics_dir(self) -> str | None:
+        if metrics.MULTIPROCESS_DIR:
+            os.makedirs(metrics.MULTIPROCESS_DIR, exist_ok=True)
+            for name in os.listdir(metrics.MULTIPROCESS_DIR):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(metrics.MULTIPROCESS_DIR, name))
+            metrics.set_multiprocess_dir(metrics.MULTIPROCESS_DIR)
+            return None
+        path = tempfile.mkdtemp(prefix="onbid_metrics_")
+        metrics.set_multiprocess_dir(path)
+        return path
+
+def main():
+    parser = argparse.ArgumentParser(description="온비드 예측 운영 서버 (pre-fork)")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="작업 프로세스 수")
+    parser.add_argument("--threads", type=int, default=THREADS, help="프로세스당 요청 처리 스레드 수")
+    args = parser.parse_args()
+
+    Master(args.host, args.port, args.workers, args.threads).run()
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,28 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g, Response
 from flask_cors import CORS
 import pandas as pd
+import numpy as np
 import joblib
+import math
 import os
+import time
 from sklearn.base import BaseEstimator, TransformerMixin
 import pandas as pd
 from popup.model import PredictModel
-from .preprocessor import preprocessor
+from .preprocessor import preprocessor, preprocessor_async, DEGRADED_ATTR
+from .items import build_input_data, predict_items
+from .scheduler import BatchScheduler, BATCH_ENABLED, BATCH_TIMEOUT
+from .cache import TTLCache, CACHE_ENABLED, item_key
+from .singleflight import SingleFlight
+from .deadline import from_headers as request_deadline, timeout_for, TIMEOUT_ERRORS
+from .admission import Limiter, Rejected, CHEAP_LIMIT, EXPENSIVE_LIMIT, RETRY_AFTER
+from . import aio
+from . import recorder
+from .precompute import RecommendationStore, PRECOMPUTE_PATH
+from .registry import manifest_version
+from .serial_filter import get_filter
+from . import metrics
+from .metrics import timed
 
 class DateFeatureExtractor(BaseEstimator, TransformerMixin):
 
@@ -31,6 +47,205 @@ except Exception as e:
     print(f"모델 로드 중 오류 발생: {e}")
     model = None
 
+# 마이크로 배치 스케줄러 (ONBID_BATCH=0이거나 모델이 없으면 요청마다 바로 예측)
+def _make_scheduler(model) -> BatchScheduler | None:
+    return BatchScheduler(model) if model is not None and BATCH_ENABLED else None
+
+scheduler = _make_scheduler(model)
+
+# 모델 재로드 (운영 서버 SIGHUP): 새 모델로 교체 후 스케줄러 재생성, 캐시 비움 (실패하면 기존 모델 유지)
+# 기존 스케줄러는 교체 후 종료 (이미 받은 요청은 기존 모델로 처리하고 작업 스레드가 끝나 기존 모델을 놓음)
+def reload_model():
+    global model, scheduler
+    new_model = PredictModel()
+    old_scheduler = scheduler
+    model = new_model
+    scheduler = _make_scheduler(model)
+    if old_scheduler is not None:
+        old_scheduler.stop()
+    if item_cache is not None:
+        item_cache.clear()
+    if precomputed is not None:
+        precomputed.model_version = manifest_version() or ""
+
+# 물건 단위 캐시: 전처리 결과와 추천 낙찰가율 (ONBID_CACHE=0이면 사용 안 함)
+item_cache = TTLCache() if CACHE_ENABLED else None
+
+# 사전 계산한 추천 결과 (python -m popup.precompute, ONBID_PRECOMPUTE가 비어 있으면 사용 안 함)
+precomputed = RecommendationStore(PRECOMPUTE_PATH) if PRECOMPUTE_PATH else None
+
+# 같은 물건의 동시 요청 병합 (전처리 / 추천 입찰가 계산을 한 번만 수행)
+flights = SingleFlight()
+
+# 요청 수락 제한: 가벼운 요청(상태 확인, 캐시 적중)과 무거운 요청(전처리 / 모델 계산)을 따로 제한
+cheap_limiter = Limiter('cheap', CHEAP_LIMIT)
+expensive_limiter = Limiter('expensive', EXPENSIVE_LIMIT)
+
+# 물건 단위 예측 엔드포인트 (캐시에 결과가 있으면 가벼운 요청으로 처리)
+ITEM_ENDPOINTS = {'predict', 'prob_predict', 'prob_curve', 'bid_for_prob'}
+EXPENSIVE_ENDPOINTS = ITEM_ENDPOINTS | {'predict_batch'}
+
+# 요청 분류: /predict는 추천 낙찰가율까지, 나머지 물건 엔드포인트는 전처리 결과까지 캐시에 있으면 가벼운 요청
+def _limiter_for() -> Limiter:
+    if request.method == 'OPTIONS' or request.endpoint not in EXPENSIVE_ENDPOINTS:
+        return cheap_limiter
+    data = request.get_json(force=True, silent=True)
+    if request.endpoint == 'predict' and _precomputed(data) is not None:
+        return cheap_limiter
+    if request.endpoint in ITEM_ENDPOINTS and item_cache is not None:
+        entry = item_cache.peek(item_key(data)) if isinstance(data, dict) else None
+        if entry is not None and (request.endpoint != 'predict' or entry['recommend'] is not None):
+            return cheap_limiter
+    return expensive_limiter
+
+# 요청 처리 시간 / 오류 응답 집계
+@app.before_request
+def _start_timer():
+    g.start_time = time.perf_counter()
+    g.deadline = request_deadline(request.headers)   # X-Deadline-Ms 헤더 또는 ONBID_DEADLINE_MS
+
+    # 자리가 없으면 바로 429(대기열 가득 참) / 503(대기 시간 초과) 응답
+    limiter = _limiter_for()
+    try:
+        limiter.acquire(timeout=timeout_for(g.deadline))
+    except Rejected as e:
+        response = jsonify({'error': str(e)})
+        response.status_code = e.status
+        response.headers['Retry-After'] = str(RETRY_AFTER)
+        return response
+    g.limiter = limiter
+
+@app.teardown_request
+def _release_slot(exc):
+    limiter = g.pop('limiter', None)
+    if limiter is not None:
+        limiter.release()
+
+@app.after_request
+def _record_request(response):
+    endpoint = request.endpoint or 'unknown'
+    if 'start_time' in g:
+        metrics.REQUEST_LATENCY.observe(time.perf_counter() - g.start_time, endpoint=endpoint)
+    if response.status_code >= 400:
+        metrics.ERRORS.inc(endpoint=endpoint, status=response.status_code)
+    # 요청 기록 (ONBID_RECORD, 부하 테스트 재생용)
+    if recorder.enabled() and request.method == 'POST':
+        recorder.record(request.path, request.get_json(force=True, silent=True), response.status_code)
+    return response
+
+# 예측 스케줄러 대기열 지표
+SCHEDULER_QUEUE = metrics.Gauge("onbid_scheduler_queue_depth", "마이크로 배치 대기열 길이")
+SCHEDULER_BATCH = metrics.Gauge("onbid_scheduler_avg_batch_size", "마이크로 배치 평균 크기")
+CACHE_HIT_RATE = metrics.Gauge("onbid_cache_hit_rate", "물건 캐시 적중률")
+CACHE_SIZE = metrics.Gauge("onbid_cache_size", "물건 캐시 항목 수")
+ADMISSION_ACTIVE = metrics.Gauge("onbid_admission_active", "처리 중인 요청 수", ("cls",))
+ADMISSION_WAITING = metrics.Gauge("onbid_admission_waiting", "자리를 기다리는 요청 수", ("cls",))
+
+# JSON 데이터 파싱 (오류 시 응답 반환, 모든 엔드포인트가 같은 오류 응답 사용)
+def _parse_json():
+    try:
+        with timed('json_parse'):
+            data = request.get_json(force=True)  # force=True로 강제 JSON 파싱
+    except Exception as json_error:
+        print(f"JSON 파싱 오류: {json_error}")
+        print(f"받은 데이터: {request.get_data()}")
+        return None, (jsonify({'error': 'JSON 형식이 올바르지 않습니다'}), 400)
+    if data is None:
+        return None, (jsonify({'error': 'JSON 데이터가 없습니다'}), 400)
+    if not isinstance(data, dict):
+        return None, (jsonify({'error': 'JSON 객체 형식이어야 합니다'}), 400)
+    return data, None
+
+# 숫자 목록인지 확인 (None / 문자열 / bool / NaN / 무한대 원소가 있으면 False)
+def _is_number_list(values) -> bool:
+    return isinstance(values, list) and all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v) for v in values
+    )
+
+# 1차 최저입찰가 (낙찰가율 <-> 금액 변환 기준): 0보다 큰 유한한 값이 아니면 None
+def _first_min_bid(input_df: pd.DataFrame) -> float | None:
+    try:
+        value = float(input_df.loc[0, '1차최저입찰가'])
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) and value > 0 else None
+
+INVALID_MIN_BID = '최저입찰가(1차 최저입찰가)가 0보다 큰 숫자가 아니어서 계산할 수 없습니다'
+
+# 사전 계산한 추천 결과 조회 (요청당 한 번만 조회)
+def _precomputed(data) -> dict | None:
+    if precomputed is None or not isinstance(data, dict):
+        return None
+    if 'precomputed' not in g:
+        g.precomputed = precomputed.get(data)
+    return g.precomputed
+
+# 물건 단위 전처리: 캐시에 있으면 재사용, 없으면 전처리 후 저장 (동시 요청은 한 번만 전처리)
+# 항목: {'key': 물건 키, 'df': 전처리 결과, 'recommend': (추천 낙찰가율, 그 확률)}
+# (입찰가와 무관한 값만 저장, recommend는 다른 요청이 반쯤 채워진 값을 보지 않도록 튜플 하나로 한 번에 저장)
+def _item_entry(data: dict) -> dict:
+    key = item_key(data)
+    entry = item_cache.get(key) if item_cache is not None else None
+    if entry is None:
+        entry = flights.do(('item', key), lambda: _load_item(data, key),
+                           timeout=timeout_for(g.deadline, flights.timeout))
+    return entry
+
+# 기한 안에 DB 조회가 끝나지 않으면 DB에 없는 물건과 같이(1차 기본값) 처리하고 degraded로 표시 (캐시하지 않음)
+def _load_item(data: dict, key: str) -> dict:
+    input_df = pd.DataFrame([build_input_data(data)])
+    # 비동기 경로: DB 조회와 문자열 전처리를 동시에 실행 (ONBID_ASYNC=0이면 순서대로)
+    if aio.ASYNC_ENABLED:
+        input_df = aio.run(preprocessor_async(input_df, g.deadline))
+    else:
+        input_df = preprocessor(input_df, g.deadline)
+    degraded = bool(input_df.attrs.get(DEGRADED_ATTR, False))
+    entry = {'key': key, 'df': input_df, 'recommend': None, 'degraded': degraded}
+    if item_cache is not None and not degraded:
+        item_cache.put(key, entry)
+    return entry
+
+# 기한 초과로 1차 기본값을 사용한 결과 표시
+def _flag(result: dict, entry: dict) -> dict:
+    if entry.get('degraded'):
+        result['degraded'] = True
+    return result
+
+# 추천 낙찰가율과 그 확률 (항목에 없으면 계산해서 저장, 같은 물건의 동시 요청은 한 번만 계산)
+# 캐시를 쓰지 않거나 계산 중에 캐시가 바뀌면 요청마다 항목 객체가 다르므로 flights.do가 돌려준 값을 자기 항목에도 저장
+# (기한 초과로 1차 기본값을 사용한 항목은 정상 항목과 결과를 공유하지 않음)
+def _recommend(entry: dict) -> tuple:
+    recommend = entry['recommend']
+    if recommend is None:
+        recommend = flights.do(('predict', entry['key'], entry.get('degraded', False)),
+                               lambda: _predict_entry(entry),
+                               timeout=timeout_for(g.deadline, flights.timeout))
+        entry['recommend'] = recommend
+    return recommend
+
+def _predict_entry(entry: dict) -> tuple:
+    if entry['recommend'] is not None:
+        return entry['recommend']
+    input_df = entry['df']
+    if scheduler is not None:
+        ratio, prob = scheduler.submit(input_df, timeout=timeout_for(g.deadline, BATCH_TIMEOUT))
+    elif aio.ASYNC_ENABLED:
+        ratio, prob = aio.run(_predict_async(input_df), timeout=timeout_for(g.deadline))
+    else:
+        ratio = model.price_predict(input_df)
+        prob = _prob_at(input_df, ratio)
+    entry['recommend'] = (ratio, prob)
+    return entry['recommend']
+
+# 모델 계산은 크기가 제한된 CPU 스레드 풀에서 실행 (동시에 실행되는 모델 계산 수 제한)
+async def _predict_async(input_df: pd.DataFrame) -> tuple:
+    ratio = await aio.to_cpu(model.price_predict, input_df)
+    prob = await aio.to_cpu(_prob_at, input_df, ratio)
+    return ratio, prob
+
+# 캐시된 전처리 결과는 공유되므로 낙찰가율 칼럼을 추가한 새 프레임으로 확률 계산
+def _prob_at(input_df: pd.DataFrame, ratio) -> float:
+    return model.prob_predict(input_df.assign(**{'낙찰가율_최초최저가기준': ratio}))
 
 @app.route('/predict', methods=['POST', 'OPTIONS'])
 def predict():
@@ -45,64 +260,29 @@ def predict():
             return jsonify({'error': '모델이 로드되지 않았습니다'}), 500
         
         # JSON 데이터 파싱
-        try:
-            # Content-Type 확인
-            if not request.is_json:
-                print(f"Content-Type: {request.content_type}")
-                print(f"Raw data: {request.get_data()}")
-            
-            data = request.get_json(force=True)  # force=True로 강제 JSON 파싱
-            
-        except Exception as json_error:
-            print(f"JSON 파싱 오류: {json_error}")
-            print(f"받은 데이터: {request.get_data()}")
-            print(f"Content-Type: {request.content_type}")
-            return jsonify({'error': 'JSON 형식이 올바르지 않습니다'}), 400
-            
-        if data is None:
-            return jsonify({'error': 'JSON 데이터가 없습니다'}), 400
-            
+        data, error = _parse_json()
+        if error is not None:
+            return error
+
         print(f"받은 데이터: {data}")
         
         bidAmount = data.get('bidAmount')
         if bidAmount is None:
             return jsonify({'error': '필수 입력값인 입찰가 누락'}), 400
         
-        # 모델 입력값 구성 (불필요한 정보까지 보내도 모델에서 처리)
-        input_data = {
-            '입찰가': bidAmount,
-            '일련번호': data.get('id', ''),
-            '카테고리':data.get('category', ''),
-            '대분류': data.get('mainCategory', ''),
-            '중분류': data.get('subCategory', ''),
-            '물건정보': data.get('title', ''),
-            '제조사 / 모델명': data.get('name', ''),
-            '개찰일시': data.get('endDate', ''),
-            '입찰방식': data.get('bidType', ''),
-            '처분방식 / 자산구분': data.get('assetType', ''),
-            '용도': data.get('usage', ''),
-            '제조사': data.get('manufacturer', ''),
-            '모델명': data.get('modelName', ''),
-            '감정평가금액': data.get('evaluationPrice', ''),
-            '유찰횟수': data.get('failureCount', ''),
-            '기관/담당부점': data.get('agency', ''),
-            '최저입찰가 (예정가격)(원)': data.get('minBidPrice', '')
-        }
-        
-        #type:object로 설정
-        input_df = pd.DataFrame([input_data]).astype('object') 
-        print(f"입력 데이터 타입 (object 처리 완료): {input_df.dtypes}")
-        print(f"입력 데이터 내용:\n{input_df.head()}")
+        # 사전 계산한 추천 결과가 있으면 바로 응답 (물건 정보와 모델이 계산 시점과 같은 경우)
+        result = _precomputed(data)
+        if result is not None:
+            return jsonify(result)
 
-        # 전처리
-        input_df = preprocessor(input_df)
+        # 전처리 (같은 물건이면 캐시된 결과 사용, 추천 입찰가는 입찰가와 무관)
+        entry = _item_entry(data)
+        input_df = entry['df']
 
-        # 예측 실행: 기존 방식 (둘 다 묶어서)
+        # 예측 실행: 기존 방식 (둘 다 묶어서), 캐시에 추천 낙찰가율이 있으면 생략
         try:
-            recommend_bid = model.price_predict(input_df)
-            input_df['낙찰가율_최초최저가기준'] = recommend_bid
+            recommend_bid, predicted_rate = _recommend(entry)
             recommend_bid = input_df.loc[0, '1차최저입찰가'] * recommend_bid
-            predicted_rate = model.prob_predict(input_df)
 
             # 결과 검증
             if predicted_rate < 0:
@@ -117,13 +297,18 @@ def predict():
             }
             print(f"최종 예측 결과: {result}")
             
-            return jsonify(result)
+            return jsonify(_flag(result, entry))
         
+        except TIMEOUT_ERRORS:
+            raise
         except Exception as model_error:
             print(f"모델 예측 오류: {model_error}")
             print(f"입력 데이터 형태: {input_df.dtypes}")
             return jsonify({'error': f'모델 예측 중 오류: {str(model_error)}'}), 500          
         
+    except TIMEOUT_ERRORS as e:
+        print(f"처리 시간 초과: {e}")
+        return jsonify({'error': str(e) or '처리 시간 제한을 넘었습니다'}), 504
     except Exception as e:
         print(f"전체 처리 중 오류 발생: {e}")
         import traceback
@@ -144,63 +329,31 @@ def prob_predict():
             return jsonify({'error': '모델이 로드되지 않았습니다'}), 500
         
         # JSON 데이터 파싱
-        try:
-            # Content-Type 확인
-            if not request.is_json:
-                print(f"Content-Type: {request.content_type}")
-                print(f"Raw data: {request.get_data()}")
-            
-            data = request.get_json(force=True)  # force=True로 강제 JSON 파싱
-            
-        except Exception as json_error:
-            print(f"JSON 파싱 오류: {json_error}")
-            print(f"받은 데이터: {request.get_data()}")
-            print(f"Content-Type: {request.content_type}")
-            return jsonify({'error': 'JSON 형식이 올바르지 않습니다'}), 400
-            
-        if data is None:
-            return jsonify({'error': 'JSON 데이터가 없습니다'}), 400
-            
+        data, error = _parse_json()
+        if error is not None:
+            return error
+
         print(f"받은 데이터: {data}")
         
         bidAmount = data.get('bidAmount')
         if bidAmount is None:
             return jsonify({'error': '필수 입력값인 입찰가 누락'}), 400
         
-        # 모델 입력값 구성
-        input_data = {
-            '입찰가': bidAmount,
-            '일련번호': data.get('id', ''),
-            '카테고리':data.get('category', ''),
-            '대분류': data.get('mainCategory', ''),
-            '중분류': data.get('subCategory', ''),
-            '물건정보': data.get('title', ''),
-            '제조사 / 모델명': data.get('name', ''),
-            '개찰일시': data.get('endDate', ''),
-            '입찰방식': data.get('bidType', ''),
-            '처분방식 / 자산구분': data.get('assetType', ''),
-            '용도': data.get('usage', ''),
-            '제조사': data.get('manufacturer', ''),
-            '모델명': data.get('modelName', ''),
-            '감정평가금액': data.get('evaluationPrice', ''),
-            '유찰횟수': data.get('failureCount', ''),
-            '기관/담당부점': data.get('agency', ''),
-            '최저입찰가 (예정가격)(원)': data.get('minBidPrice', '')
-        }
-        
-        #type:object로 설정
-        input_df = pd.DataFrame([input_data]).astype('object') 
-        print(f"입력 데이터 타입 (object 처리 완료): {input_df.dtypes}")
-        print(f"입력 데이터 내용:\n{input_df.head()}")
-
-        # 전처리
-        input_df = preprocessor(input_df)
+        # 전처리 (같은 물건이면 캐시된 결과 사용)
+        entry = _item_entry(data)
+        input_df = entry['df']
         recommend_bid = bidAmount # 사용자가 입력한 가격
+        first_min_bid = _first_min_bid(input_df)
+        if first_min_bid is None:
+            return jsonify({'error': INVALID_MIN_BID}), 400
 
         # 예측 실행: 확률만
         try:
-            input_df['낙찰가율_최초최저가기준'] = recommend_bid / input_df.loc[0, '1차최저입찰가']
-            predicted_rate = model.prob_predict(input_df)
+            ratio = recommend_bid / first_min_bid
+            if scheduler is not None:
+                _, predicted_rate = scheduler.submit(input_df, ratio, timeout=timeout_for(g.deadline, BATCH_TIMEOUT))
+            else:
+                predicted_rate = _prob_at(input_df, ratio)
 
             predicted_rate = predicted_rate * 100
             
@@ -217,13 +370,190 @@ def prob_predict():
             }
             print(f"최종 예측 결과: {result}")
             
-            return jsonify(result)
+            return jsonify(_flag(result, entry))
         
+        except TIMEOUT_ERRORS:
+            raise
         except Exception as model_error:
             print(f"모델 예측 오류: {model_error}")
             print(f"입력 데이터 형태: {input_df.dtypes}")
             return jsonify({'error': f'모델 예측 중 오류: {str(model_error)}'}), 500         
         
+    except TIMEOUT_ERRORS as e:
+        print(f"처리 시간 초과: {e}")
+        return jsonify({'error': str(e) or '처리 시간 제한을 넘었습니다'}), 504
+    except Exception as e:
+        print(f"전체 처리 중 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'예측 처리 중 오류: {str(e)}'}), 500
+
+# 일괄 예측 함수: 여러 물건을 한 번에 예측
+@app.route('/predict_batch', methods=['POST', 'OPTIONS'])
+def predict_batch():
+
+    # OPTIONS 요청 처리 (CORS preflight)
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    try:
+        # 모델 로드 확인
+        if model is None:
+            return jsonify({'error': '모델이 로드되지 않았습니다'}), 500
+
+        # JSON 데이터 파싱
+        data, error = _parse_json()
+        if error is not None:
+            return error
+
+        items = data.get('items')
+        if not isinstance(items, list):
+            return jsonify({'error': '필수 입력값인 items(물건 목록) 누락'}), 400
+
+        # 예측 실행: 입력 순서대로 결과 반환 (항목별 오류 포함)
+        results = predict_items(model, items)
+        print(f"일괄 예측 완료: {len(results)}건")
+
+        return jsonify({'count': len(results), 'results': results})
+
+    except Exception as e:
+        print(f"전체 처리 중 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'예측 처리 중 오류: {str(e)}'}), 500
+
+# 확률 곡선 함수: 전처리 한 번으로 여러 입찰가의 낙찰 확률 계산
+@app.route('/prob_curve', methods=['POST', 'OPTIONS'])
+def prob_curve():
+
+    # OPTIONS 요청 처리 (CORS preflight)
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    try:
+        # 모델 로드 확인
+        if model is None:
+            return jsonify({'error': '모델이 로드되지 않았습니다'}), 500
+
+        # JSON 데이터 파싱
+        data, error = _parse_json()
+        if error is not None:
+            return error
+
+        # 격자: bidAmounts(원) 또는 ratios(낙찰가율), 둘 다 없으면 KDE 격자 전체
+        bid_amounts = data.get('bidAmounts')
+        ratios = data.get('ratios')
+        for name, grid in (('bidAmounts', bid_amounts), ('ratios', ratios)):
+            if grid is not None and not _is_number_list(grid):
+                return jsonify({'error': f'{name}는 숫자(유한한 값) 목록이어야 합니다'}), 400
+
+        # 전처리 (한 번만 수행, 같은 물건이면 캐시된 결과 사용)
+        entry = _item_entry(data)
+        input_df = entry['df']
+        first_min_bid = _first_min_bid(input_df)
+        if first_min_bid is None:
+            return jsonify({'error': INVALID_MIN_BID}), 400
+
+        # 예측 실행: 격자 전체를 한 번에 계산
+        try:
+            if bid_amounts is not None:
+                bid_amounts = np.asarray(bid_amounts, dtype=float)
+                ratios, probs = model.prob_curve(input_df, bid_amounts / first_min_bid)
+            else:
+                ratios, probs = model.prob_curve(input_df, ratios)
+                bid_amounts = ratios * first_min_bid
+
+            predicted_rates = np.clip(probs * 100, 0, 100)
+
+            result = {
+                'bid_amounts': np.round(bid_amounts, 0).tolist(),
+                'ratios': ratios.tolist(),
+                'predicted_rates': np.round(predicted_rates, 2).tolist()
+            }
+            print(f"확률 곡선 계산 완료: {len(ratios)}개 지점")
+
+            return jsonify(_flag(result, entry))
+
+        except Exception as model_error:
+            print(f"모델 예측 오류: {model_error}")
+            return jsonify({'error': f'모델 예측 중 오류: {str(model_error)}'}), 500
+
+    except TIMEOUT_ERRORS as e:
+        print(f"처리 시간 초과: {e}")
+        return jsonify({'error': str(e) or '처리 시간 제한을 넘었습니다'}), 504
+    except Exception as e:
+        print(f"전체 처리 중 오류 발생: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'예측 처리 중 오류: {str(e)}'}), 500
+
+# 목표 확률 입찰가 함수: 원하는 낙찰 확률(%)에 필요한 입찰가 계산
+@app.route('/bid_for_prob', methods=['POST', 'OPTIONS'])
+def bid_for_prob():
+
+    # OPTIONS 요청 처리 (CORS preflight)
+    if request.method == 'OPTIONS':
+        return jsonify({'status': 'ok'}), 200
+
+    try:
+        # 모델 로드 확인
+        if model is None:
+            return jsonify({'error': '모델이 로드되지 않았습니다'}), 500
+
+        # JSON 데이터 파싱
+        data, error = _parse_json()
+        if error is not None:
+            return error
+
+        # 목표 확률(%): 숫자 하나 또는 숫자 목록
+        target_rate = data.get('targetRate')
+        if target_rate is None:
+            return jsonify({'error': '필수 입력값인 목표 확률(targetRate) 누락'}), 400
+        # 0%(어떤 금액이든 만족)와 100%(확률 1을 보장하는 낙찰가율 없음)는 제외
+        invalid = 'targetRate는 0보다 크고 100보다 작은 숫자여야 합니다'
+        try:
+            target_rates = np.asarray(target_rate, dtype=float)
+        except (TypeError, ValueError):
+            return jsonify({'error': invalid}), 400
+        if target_rates.ndim > 1 or not np.all(np.isfinite(target_rates)) \
+                or np.any((target_rates <= 0) | (target_rates >= 100)):
+            return jsonify({'error': invalid}), 400
+
+        # 전처리 (같은 물건이면 캐시된 결과 사용)
+        entry = _item_entry(data)
+        input_df = entry['df']
+        first_min_bid = _first_min_bid(input_df)
+        if first_min_bid is None:
+            return jsonify({'error': INVALID_MIN_BID}), 400
+
+        # 예측 실행: 역CDF로 낙찰가율을 구한 뒤 1차 최저입찰가 기준 금액으로 변환
+        try:
+            ratios = model.prob_quantile(input_df, target_rates / 100)
+            bid_amounts = ratios * first_min_bid
+
+            if target_rates.ndim == 0:
+                result = {
+                    'target_rate': float(target_rates),
+                    'ratio': float(ratios),
+                    'recommend_bid': round(float(bid_amounts), 0)
+                }
+            else:
+                result = {
+                    'target_rates': target_rates.tolist(),
+                    'ratios': ratios.tolist(),
+                    'bid_amounts': np.round(bid_amounts, 0).tolist()
+                }
+            print(f"목표 확률 입찰가 계산 결과: {result}")
+
+            return jsonify(_flag(result, entry))
+
+        except Exception as model_error:
+            print(f"모델 예측 오류: {model_error}")
+            return jsonify({'error': f'모델 예측 중 오류: {str(model_error)}'}), 500
+
+    except TIMEOUT_ERRORS as e:
+        print(f"처리 시간 초과: {e}")
+        return jsonify({'error': str(e) or '처리 시간 제한을 넘었습니다'}), 504
     except Exception as e:
         print(f"전체 처리 중 오류 발생: {e}")
         import traceback
@@ -236,16 +566,51 @@ def health_check():
     return jsonify({
         'status': 'running',
         'model_loaded': model is not None,
-        'model_path_exists': os.path.exists('pipeline.pkl')
+        'model_path_exists': os.path.exists('pipeline.pkl'),
+        'batching': scheduler is not None,
+        'model_load_seconds': round(model.load_seconds, 2) if model is not None else None,
+        'cache': item_cache.stats() if item_cache is not None else {'enabled': False},
+        'in_flight': flights.in_flight(),
+        'precomputed': precomputed is not None,
+        'serial_filter': get_filter().stats() if get_filter() is not None else {'enabled': False},
+        'admission': {'cheap': cheap_limiter.stats(), 'expensive': expensive_limiter.stats()}
     })
 
+# 마이크로 배치 통계 (대기열 길이, 배치 크기)
+@app.route('/scheduler_stats', methods=['GET'])
+def scheduler_stats():
+    if scheduler is None:
+        return jsonify({'enabled': False})
+    return jsonify({'enabled': True, **scheduler.stats()})
+
+# 게이지 갱신: /metrics 응답과 작업 프로세스의 주기적 기록 직전에 호출 (metrics.add_collector)
+@metrics.add_collector
+def _update_gauges():
+    if scheduler is not None:
+        stats = scheduler.stats()
+        SCHEDULER_QUEUE.set(stats['queue_depth'])
+        SCHEDULER_BATCH.set(stats['avg_batch_size'])
+    if item_cache is not None:
+        stats = item_cache.stats()
+        CACHE_HIT_RATE.set(stats['hit_rate'])
+        CACHE_SIZE.set(stats['size'])
+    for limiter in (cheap_limiter, expensive_limiter):
+        stats = limiter.stats()
+        ADMISSION_ACTIVE.set(stats['active'], cls=limiter.name)
+        ADMISSION_WAITING.set(stats['waiting'], cls=limiter.name)
+
+# 단계별 지연 시간 / 카운터 (Prometheus 텍스트 형식, 운영 서버에서는 모든 작업 프로세스 합계)
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # 루트 경로
 @app.route('/', methods=['GET'])
 def root():
     return jsonify({
         'message': 'Onbid Prediction Server',
         'status': 'running',
-        'endpoints': ['/health', '/predict', '/prob_predict']
+        'endpoints': ['/health', '/predict', '/prob_predict', '/predict_batch', '/prob_curve', '/bid_for_prob', '/scheduler_stats', '/metrics']
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,56 @@
+# singleflight.py
+
+import os
+import threading
+from concurrent.futures import Future
+from .metrics import SINGLEFLIGHT
+from .deadline import TIMEOUT_ERRORS
+
+# 설정: 환경 변수로 변경 가능
+FLIGHT_TIMEOUT = float(os.getenv("ONBID_SINGLEFLIGHT_TIMEOUT", "15"))   # 후속 요청의 최대 대기 시간(초)
+
+# 먼저 들어온 요청의 계산이 끝나지 않아 대기 시간을 넘긴 경우
+class FlightTimeout(TimeoutError):
+    pass
+
+# 동시 요청 병합: 같은 키로 진행 중인 계산이 있으면 새로 계산하지 않고 그 결과를 기다림
+class SingleFlight:
+
+    def __init__(self, timeout: float = FLIGHT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls = {}   # 키 -> 진행 중인 계산의 Future
+
+    # fn() 결과 반환: 먼저 온 요청(leader)이 계산하고, 그동안 들어온 요청(follower)은 결과(또는 예외)를 공유
+    def do(self, key, fn, timeout: float | None = None):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            SINGLEFLIGHT.inc(role='follower')
+            try:
+                return future.result(timeout=self.timeout if timeout is None else timeout)
+            except TIMEOUT_ERRORS:
+                SINGLEFLIGHT.inc(role='timeout')
+                raise FlightTimeout(f"같은 물건의 계산이 {self.timeout if timeout is None else timeout:g}초 안에 끝나지 않았습니다")
+
+        SINGLEFLIGHT.inc(role='leader')
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    # 진행 중인 키 수
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
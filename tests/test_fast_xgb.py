@@ -0,0 +1,88 @@
+# 빠른 예측기(원-핫 어휘 + 부스터 inplace_predict)가 sklearn 파이프라인 predict와 같은 결과인지 확인
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("xgboost")
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+from xgboost import XGBClassifier, XGBRegressor
+from popup.predict_model import fast_xgb
+from popup.predict_model.fast_xgb import FastPipeline, export_pipeline
+
+CAT_COLS = ["대분류", "중분류", "기관"]
+NUM_COLS = ["최초입찰_연도", "최초입찰_월", "1차최저입찰가", "2차최저입찰가"]
+
+def _frame(n: int, seed: int = 0, unknown: bool = False) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    majors = ["자동차", "부동산", "기타"] + (["미지대분류"] if unknown else [])
+    minors = [f"중분류{i}" for i in range(30)] + (["미지중분류"] if unknown else [])
+    orgs = ["국세청", "자산관리공사", np.nan] + (["미지기관"] if unknown else [])
+    df = pd.DataFrame({
+        "대분류": [majors[i] for i in rng.integers(0, len(majors), n)],
+        "중분류": [minors[i] for i in rng.integers(0, len(minors), n)],
+        "기관": pd.Series([orgs[i] for i in rng.integers(0, len(orgs), n)], dtype=object),
+        "최초입찰_연도": rng.integers(2019, 2025, n).astype(float),
+        "최초입찰_월": rng.integers(1, 13, n).astype(float),
+        "1차최저입찰가": rng.uniform(1e5, 5e7, n),
+        "2차최저입찰가": rng.uniform(1e5, 5e7, n),
+    })
+    df.loc[rng.random(n) < 0.2, "2차최저입찰가"] = np.nan
+    df.loc[rng.random(n) < 0.1, "최초입찰_월"] = 0.0
+    return df
+
+def _pipeline(estimator, step: str, sparse_threshold: float = 0.3) -> Pipeline:
+    preprocessor = ColumnTransformer(
+        transformers=[("ohe", OneHotEncoder(handle_unknown="ignore"), CAT_COLS)],
+        remainder="passthrough",
+        sparse_threshold=sparse_threshold,
+    )
+    return Pipeline([("preprocessor", preprocessor), (step, estimator)])
+
+def _fit(kind: str, sparse_threshold: float) -> Pipeline:
+    train = _frame(400)
+    if kind == "regressor":
+        pipeline = _pipeline(XGBRegressor(n_estimators=15, max_depth=3, random_state=0), kind, sparse_threshold)
+        y = train["1차최저입찰가"] / 1e7 + (train["대분류"] == "자동차") * 0.3
+    else:
+        pipeline = _pipeline(XGBClassifier(n_estimators=15, max_depth=3, random_state=0), kind, sparse_threshold)
+        y = (train["최초입찰_월"] % 3).astype(int)
+    return pipeline.fit(train[CAT_COLS + NUM_COLS], y)
+
+@pytest.mark.parametrize("kind", ["regressor", "classifier"])
+@pytest.mark.parametrize("sparse_threshold", [0.0, 1.0])   # 밀집 / 희소 ColumnTransformer 출력
+def test_fast_pipeline_matches_pipeline(kind, sparse_threshold):
+    pipeline = _fit(kind, sparse_threshold)
+    spec = export_pipeline(pipeline)
+    assert spec["sparse"] == (sparse_threshold > 0)
+    fast = FastPipeline(spec)
+
+    X = _frame(300, seed=1, unknown=True)[CAT_COLS + NUM_COLS]
+    expected = pipeline.predict(X)
+    if kind == "regressor":
+        np.testing.assert_allclose(fast.predict(X), expected, rtol=0, atol=1e-6)
+        np.testing.assert_allclose(fast.predict_records(X.to_dict("records")), expected, rtol=0, atol=1e-6)
+    else:
+        np.testing.assert_array_equal(fast.predict(X), expected)
+        np.testing.assert_array_equal(fast.predict_records(X.to_dict("records")), expected)
+
+def test_export_all_writes_only_model_dir(tmp_path, monkeypatch):
+    model_dir = tmp_path / "models"
+    src = tmp_path / "src.pkl"
+    fast_xgb.joblib.dump(_fit("regressor", 0.0), src)
+    fast_xgb.add_artifact("test/onbid-fast", "pipeline.pkl", str(src), "test", str(model_dir))
+    os.remove(src)
+
+    work = tmp_path / "work"
+    work.mkdir()
+    monkeypatch.chdir(work)
+    monkeypatch.setattr(fast_xgb, "EXPORT_TARGETS", [("test/onbid-fast", "pipeline.pkl", fast_xgb.FAST_FILENAME)])
+    fast_xgb.export_all(str(model_dir))
+
+    # 중간 파일이 작업 디렉토리에 남지 않고, 모델 저장소에서 로드 가능
+    assert os.listdir(work) == []
+    fast = fast_xgb.load_fast_pipeline("test/onbid-fast", fast_xgb.FAST_FILENAME, str(model_dir))
+    assert fast is not None
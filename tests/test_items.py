@@ -0,0 +1,34 @@
+import pandas as pd
+
+from popup import items
+from popup.metrics import BATCH_FALLBACKS
+
+
+class _Model:
+
+    def price_predict_batch(self, df):
+        return pd.DataFrame({'predicted': 0.9, 'error': None}, index=df.index)
+
+    def prob_predict_batch(self, df):
+        return pd.Series(50.0, index=df.index)
+
+
+def _broken_batch(df):
+    raise RuntimeError("batch bug")
+
+
+def _single(df):
+    return pd.DataFrame([{'1차최저입찰가': 1000000.0}])
+
+
+# 일괄 전처리가 실패하면 기록(로그, 지표)한 뒤 한 행씩 처리
+def test_batch_failure_is_counted_and_falls_back(monkeypatch, capsys):
+    monkeypatch.setattr(items, 'preprocessor_batch', _broken_batch)
+    monkeypatch.setattr(items, 'preprocessor', _single)
+    before = BATCH_FALLBACKS.value(stage='preprocess')
+
+    results = items.predict_items(_Model(), [{'id': 'A'}, {'id': 'B'}])
+
+    assert results == [{'predicted_rate': 50.0, 'recommend_bid': 900000.0}] * 2
+    assert BATCH_FALLBACKS.value(stage='preprocess') == before + 1
+    assert "batch bug" in capsys.readouterr().out
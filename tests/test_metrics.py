@@ -0,0 +1,55 @@
+import json
+import os
+
+from popup import metrics
+
+
+# 다른 작업 프로세스가 남긴 파일처럼 지표 값을 기록
+def _write_as(tmp_path, name, values):
+    (tmp_path / f"{name}.json").write_text(json.dumps(values), encoding="utf-8")
+
+
+def test_render_merges_worker_snapshots(tmp_path, monkeypatch):
+    counter = metrics.Counter("test_merge_total", "테스트 카운터", ("result",))
+    hist = metrics.Histogram("test_merge_seconds", "테스트 히스토그램", buckets=(0.1, 1.0))
+    gauge = metrics.Gauge("test_merge_depth", "테스트 게이지")
+    monkeypatch.setattr(metrics, "_registry", [counter, hist, gauge])
+    monkeypatch.setattr(metrics, "_collectors", [])
+    monkeypatch.setattr(metrics, "_dir", str(tmp_path))
+
+    counter.inc(2, result="hit")
+    hist.observe(0.05)
+    gauge.set(3)
+
+    # 종료된 프로세스(보관 파일)와 없는 pid: 카운터/히스토그램은 합치고 게이지는 제외
+    _write_as(tmp_path, "999999999-1", {
+        counter.name: [[["hit"], 5], [["miss"], 1]],
+        hist.name: [[[], [[0, 2, 1], 3.5, 3]]],
+    })
+    _write_as(tmp_path, "999999998", {counter.name: [[["hit"], 1]], gauge.name: [[[], 7]]})
+
+    text = metrics.render()
+    assert 'test_merge_total{result="hit"} 8' in text
+    assert 'test_merge_total{result="miss"} 1' in text
+    assert 'test_merge_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_merge_seconds_bucket{le="1.0"} 3' in text
+    assert 'test_merge_seconds_bucket{le="+Inf"} 4' in text
+    assert "test_merge_seconds_count 4" in text
+    assert f'test_merge_depth{{worker="{os.getpid()}"}} 3' in text
+    assert 'worker="999999998"' not in text
+
+
+def test_retire_keeps_values_when_pid_reused(tmp_path, monkeypatch):
+    counter = metrics.Counter("test_retire_total", "테스트 카운터")
+    monkeypatch.setattr(metrics, "_registry", [counter])
+    monkeypatch.setattr(metrics, "_collectors", [])
+    monkeypatch.setattr(metrics, "_dir", str(tmp_path))
+
+    counter.inc(4)
+    metrics.write_snapshot()
+    metrics.retire(os.getpid())
+    metrics.reset()
+    counter.inc(1)
+
+    assert "test_retire_total 5" in metrics.render()
+    assert metrics.render().count("test_retire_total 5") == 1
@@ -0,0 +1,51 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from popup import model as model_module
+from popup.model import PredictModel
+
+
+class _RoundModel:
+
+    def predict(self, df):
+        return np.ones(len(df), dtype=int)
+
+
+class _EtcPrice:
+
+    def __init__(self, order):
+        self.order = order
+
+    def predict(self, df):
+        return pd.Series(0.8, index=df.index)
+
+
+class _BrokenCarPrice:
+
+    def __init__(self, order):
+        raise OSError(f"자동차 {order}차 모델 파일 없음")
+
+
+# 지연 로드 모드에서 모델 하나가 로드되지 않으면 그 그룹 항목만 오류
+def test_price_batch_reports_load_error_per_group(monkeypatch):
+    monkeypatch.setattr(model_module, 'CarPricePredictor', _BrokenCarPrice)
+    monkeypatch.setattr(model_module, 'EtcPricePredictor', _EtcPrice)
+    predictor = PredictModel.__new__(PredictModel)
+    predictor._lazy = True
+    predictor._load_lock = threading.Lock()
+    predictor._price_models = {}
+    predictor._round_model = _RoundModel()
+
+    df = pd.DataFrame({
+        '대분류': ['자동차', '물품', '자동차', '부동산'],
+        '낙찰차수': [1, 1, 2, 0],
+    }, index=[10, 11, 12, 13])
+    result = predictor.price_predict_batch(df)
+
+    assert result.loc[[11, 13], 'predicted'].tolist() == [0.8, 0.8]
+    assert result.loc[[11, 13], 'error'].isna().all()
+    assert result.loc[[10, 12], 'predicted'].isna().all()
+    assert result.loc[10, 'error'].startswith('가격 모델 로드 오류') and '2차' in result.loc[10, 'error']
+    assert '3차' in result.loc[12, 'error']
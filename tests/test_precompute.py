@@ -0,0 +1,18 @@
+import pandas as pd
+
+from popup.precompute import iter_listings, read_listings
+
+
+# 청크는 항상 chunk_size개 단위 (체크포인트의 청크 번호가 입력 읽기 방식과 무관)
+def test_iter_listings_streams_fixed_size_chunks(tmp_path):
+    path = tmp_path / "listings.csv"
+    pd.DataFrame({
+        '일련번호': [f"2024-{i:05d}-001" for i in range(25)],
+        '카테고리': ["[물품 / 가전]"] * 25,
+        '최저입찰가 (예정가격)(원)': ["1,000,000"] * 25,
+    }).to_csv(path, index=False, encoding="utf-8-sig")
+
+    chunks = list(iter_listings(str(path), chunk_size=10))
+    assert [len(c) for c in chunks] == [10, 10, 5]
+    assert [item['id'] for c in chunks for item in c] == [f"2024-{i:05d}-001" for i in range(25)]
+    assert [item for c in chunks for item in c] == read_listings(str(path))
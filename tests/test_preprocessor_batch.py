@@ -0,0 +1,87 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from popup import db, serial_filter
+from popup.db import SQLiteBackend, CAR_HISTORY_COLS, ETC_HISTORY_COLS
+from popup.items import build_input_data
+from popup.preprocessor import preprocessor, preprocessor_batch, ROW_COL
+from popup.serial_filter import SerialFilter
+
+BIDS = ['1차최저입찰가', '2차최저입찰가', '3차최저입찰가', '4차최저입찰가', '5차최저입찰가']
+
+
+def _item(serial, category, title, min_bid, end_date="2024-03-02 10:00", agency="한국자산관리공사"):
+    main, sub = category.split(" / ")
+    return {"id": serial, "category": f"[{category}]", "mainCategory": main, "subCategory": sub,
+            "title": title, "endDate": end_date, "agency": agency, "minBidPrice": min_bid, "failureCount": "1"}
+
+
+# DB 이력: (일련번호, 대분류, 중분류, 물건정보, 기관, 최초입찰시기, 1~5차 최저입찰가)
+ETC_ROWS = [
+    ("E-HIT-2", "물품", "가전", "불용품 일괄 매각", "국방부", "2023-11-04 10:00", 3000000.0, None, None, None, None),
+    ("E-HIT-4", "물품", "사무기기", "불용품 일괄 매각", "국방부", "2023-10-01", 2000000.0, 1800000.0, 1600000.0, None, None),
+    ("E-FILTERED", "물품", "가전", "불용품 일괄 매각", "국방부", "2023-09-01 11:00", 1000000.0, None, None, None, None),
+]
+CAR_ROWS = [
+    ("C-HIT-3", "자동차", "승용차", "소형", "르노삼성", "SM3", "2007년식 SM3", "한국자산관리공사", "2023-12-01 14:00",
+     2500000.0, 2300000.0, None, None, None),
+]
+
+ITEMS = [
+    _item("E-HIT-2", "물품 / 가전", "불용품 일괄 매각", "2,700,000", agency="국방부"),
+    _item("C-MISS", "자동차 / 승합차", "2009년식 스타렉스", "4,100,000", end_date="2024-02-11 14:00"),
+    _item("E-MISS", "물품 / 사무기기", "사무용 가구 일괄", "1,961,000", end_date="2024-01-20 11:00"),
+    _item("E-BAD", "물품 / 가전", "불용품", "abc"),                                   # 문자열 전처리에서 오류
+    _item("C-HIT-3", "자동차 / 승용차", "2007년식 SM3", "2,109,600"),
+    _item("E-FILTERED", "물품 / 가전", "불용품 일괄 매각", "900,000", agency="국방부"),   # DB에 있지만 필터에 없음
+    _item("E-HIT-4", "물품 / 사무기기", "불용품 일괄 매각", "1,400,000", end_date="2024-03-09 10:00", agency="국방부"),
+]
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    path = str(tmp_path / "onbid.sqlite3")
+    conn = sqlite3.connect(path)
+    etc_cols = ", ".join(f'"{c}" {"REAL" if c in BIDS else "TEXT"}' for c in ETC_HISTORY_COLS)
+    car_cols = ", ".join(f'"{c}" {"REAL" if c in BIDS else "TEXT"}' for c in CAR_HISTORY_COLS)
+    conn.execute(f"CREATE TABLE ONBID_RESULTS ({etc_cols})")
+    conn.execute(f"CREATE TABLE CAR_TABLE ({car_cols})")
+    conn.executemany(f"INSERT INTO ONBID_RESULTS VALUES ({', '.join('?' * len(ETC_HISTORY_COLS))})", ETC_ROWS)
+    conn.executemany(f"INSERT INTO ONBID_RESULTS VALUES ({', '.join('?' * len(ETC_HISTORY_COLS))})",
+                     [r[:1] + r[1:3] + r[6:] for r in CAR_ROWS])
+    conn.executemany(f"INSERT INTO CAR_TABLE VALUES ({', '.join('?' * len(CAR_HISTORY_COLS))})", CAR_ROWS)
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(db, "_backend", SQLiteBackend(path, pool_size=1))
+    serials = [r[0] for r in ETC_ROWS + CAR_ROWS if r[0] != "E-FILTERED"]
+    serial_filter.set_filter(SerialFilter.build(serials, 0.0001))
+    yield
+    serial_filter.set_filter(None)
+
+
+def test_batch_matches_single_row(backend):
+    df = pd.DataFrame([build_input_data(item) for item in ITEMS])
+    car, etc = preprocessor_batch(df)
+    batch = {int(row): part.loc[part[ROW_COL] == row].drop(columns=ROW_COL).reset_index(drop=True)
+             for part in (car, etc) for row in part[ROW_COL]}
+
+    for pos, item in enumerate(ITEMS):
+        try:
+            single = preprocessor(pd.DataFrame([build_input_data(item)]))
+        except Exception:
+            # 한 행씩 처리하면 오류가 나는 물건은 일괄 결과에 없음
+            assert pos not in batch, item["id"]
+            continue
+        assert pos in batch, item["id"]
+        pd.testing.assert_frame_equal(batch[pos], single.reset_index(drop=True), obj=item["id"])
+
+    # 경로별 결과 확인: DB 적중(차수별 입찰가 교체), DB 없음, 필터로 조회 생략
+    assert set(batch) == {0, 1, 2, 4, 5, 6}
+    assert batch[0].loc[0, '낙찰차수'] == 2 and batch[0].loc[0, '2차최저입찰가'] == 2700000.0
+    assert batch[6].loc[0, '낙찰차수'] == 4 and batch[6].loc[0, '4차최저입찰가'] == 1400000.0
+    assert batch[4].loc[0, '낙찰차수'] == 3 and batch[4].loc[0, '3차최저입찰가'] == 2109600.0
+    for pos in (1, 2, 5):
+        assert batch[pos].loc[0, '낙찰차수'] == 1 and pd.isna(batch[pos].loc[0, '2차최저입찰가'])
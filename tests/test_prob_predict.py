@@ -0,0 +1,127 @@
+# ProbPredictor.predict (그룹별 벡터 계산)가 행 단위 계산(_compute_ensemble_prob)과 같은지 확인
+
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from popup.predict_model.probability_model.onbid_map_prob_predict import ProbPredictor, _compute_ensemble_prob
+
+# 정규분포 모양의 누적확률 격자 (학습 스크립트의 KDE dict와 같은 형식)
+def _kde_dict(center: float, scale: float, margin: float = 0.5, num_grid: int = 200) -> dict:
+    x_min, x_max = center - 3 * scale - margin, center + 3 * scale + margin
+    x_range = np.linspace(x_min, x_max, num_grid)
+    pdf = np.exp(-0.5 * ((x_range - center) / scale) ** 2)
+    cdf = np.cumsum(pdf) / pdf.sum()
+    return {'x_range': x_range, 'cdf': cdf, 'x_min': x_min, 'x_max': x_max}
+
+def _predictor(weights=(1.0, 1.0, 1.0)) -> ProbPredictor:
+    predictor = ProbPredictor.__new__(ProbPredictor)
+    predictor.overall_dict = _kde_dict(0.9, 0.2)
+    predictor.major_dict = {'자동차': _kde_dict(0.8, 0.1), '부동산': _kde_dict(1.1, 0.3)}
+    predictor.minor_dict = {'승용차': _kde_dict(0.7, 0.05), '토지': _kde_dict(1.2, 0.25)}
+    predictor.w_all, predictor.w_major, predictor.w_minor = weights
+    predictor._inverse_tables = {}
+    predictor._inverse_lock = threading.Lock()
+    return predictor
+
+# 기존 구현: 행마다 _compute_ensemble_prob
+def _reference(predictor: ProbPredictor, df: pd.DataFrame) -> pd.Series:
+    probs = []
+    for _, row in df.iterrows():
+        probs.append(_compute_ensemble_prob(
+            overall_dict=predictor.overall_dict,
+            major_dict=predictor.major_dict,
+            minor_dict=predictor.minor_dict,
+            major=str(row['대분류']),
+            minor=str(row['중분류']),
+            value=float(row['낙찰가율_최초최저가기준']),
+            w_all=predictor.w_all,
+            w_major=predictor.w_major,
+            w_minor=predictor.w_minor
+        ))
+    return pd.Series(probs, index=df.index, name='prob_낙찰가율_최초최저가기준')
+
+def _frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    majors = np.array(['자동차', '부동산', '미지대분류', None, np.nan], dtype=object)
+    minors = np.array(['승용차', '토지', '미지중분류', None, np.nan], dtype=object)
+    values = rng.uniform(-1.0, 3.0, n)   # x_min 미만 / x_max 초과 포함
+    values[rng.random(n) < 0.1] = np.nan
+    return pd.DataFrame({
+        '대분류': majors[rng.integers(0, len(majors), n)],
+        '중분류': minors[rng.integers(0, len(minors), n)],
+        '낙찰가율_최초최저가기준': values,
+    })
+
+@pytest.mark.parametrize('weights', [(1.0, 1.0, 1.0), (0.5, 2.0, 1.5)])
+def test_predict_matches_rowwise(weights):
+    predictor = _predictor(weights)
+    df = _frame(500)
+    pd.testing.assert_series_equal(predictor.predict(df), _reference(predictor, df), check_exact=True)
+
+def test_predict_keeps_shuffled_index():
+    predictor = _predictor()
+    df = _frame(200, seed=1)
+    df.index = np.random.default_rng(2).permutation(np.arange(1000, 1200))
+    df = df.sample(frac=1.0, random_state=3)
+    result = predictor.predict(df)
+    pd.testing.assert_index_equal(result.index, df.index)
+    pd.testing.assert_series_equal(result, _reference(predictor, df), check_exact=True)
+
+def test_predict_boundaries():
+    predictor = _predictor()
+    points = []
+    for d in [predictor.overall_dict, *predictor.major_dict.values(), *predictor.minor_dict.values()]:
+        points += [d['x_min'], d['x_max'], np.nextafter(d['x_min'], np.inf), np.nextafter(d['x_max'], -np.inf),
+                   d['x_range'][1], d['x_min'] - 100, d['x_max'] + 100]
+    df = pd.DataFrame({
+        '대분류': ['자동차', '부동산', '기타'] * len(points),
+        '중분류': ['승용차', '미지중분류', '토지'] * len(points),
+        '낙찰가율_최초최저가기준': np.repeat(points, 3),
+    })
+    pd.testing.assert_series_equal(predictor.predict(df), _reference(predictor, df), check_exact=True)
+
+def test_predict_series_input():
+    predictor = _predictor()
+    row = pd.Series({'대분류': '자동차', '중분류': '승용차', '낙찰가율_최초최저가기준': 0.75})
+    expected = _reference(predictor, pd.DataFrame([row]))
+    pd.testing.assert_series_equal(predictor.predict(row), expected, check_exact=True)
+
+# 역CDF 테이블은 요청된 (대분류, 중분류)만 처음 사용할 때 생성 (모델에 없는 분류는 None 키를 공유)
+def test_quantile_builds_tables_lazily():
+    predictor = _predictor()
+    assert predictor._inverse_tables == {}
+    predictor.quantile('자동차', '승용차', [0.5])
+    predictor.quantile('기타', '미지중분류', [0.5])
+    predictor.quantile('없는대분류', '없는중분류', [0.5])
+    assert set(predictor._inverse_tables) == {('자동차', '승용차'), (None, None)}
+
+def test_quantile_concurrent_first_use():
+    predictor = _predictor()
+    built = []
+    build = predictor._build_inverse_table
+    predictor._build_inverse_table = lambda *key: built.append(key) or build(*key)
+    start = threading.Barrier(8)
+    results = [None] * 8
+
+    def run(i):
+        start.wait()
+        results[i] = predictor.quantile('부동산', '토지', [0.1, 0.5, 0.9])
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert built == [('부동산', '토지')]
+    assert all(np.array_equal(r, results[0]) for r in results)
+
+# 분위수는 목표 확률 이상이 되는 최소 낙찰가율 (0 이상)
+@pytest.mark.parametrize('major,minor', [('자동차', '승용차'), ('부동산', '토지'), ('기타', '기타')])
+def test_quantile_reaches_target(major, minor):
+    predictor = _predictor()
+    targets = np.linspace(0.01, 0.99, 50)
+    ratios = predictor.quantile(major, minor, targets)
+    assert (ratios >= 0).all()
+    _, probs = predictor.predict_curve(major, minor, ratios)
+    assert (probs >= targets - 1e-12).all()
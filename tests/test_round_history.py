@@ -0,0 +1,62 @@
+import sqlite3
+
+import pytest
+
+from popup.db import SQLiteBackend, RoundHistory, ETC_HISTORY_COLS, CAR_HISTORY_COLS, SERIAL_COL
+
+
+# 입찰가 칼럼이 문자열(TEXT)로 저장된 DB
+@pytest.fixture
+def backend(tmp_path):
+    path = str(tmp_path / "onbid.sqlite3")
+    conn = sqlite3.connect(path)
+    etc_cols = ", ".join(f'"{c}" TEXT' for c in ETC_HISTORY_COLS)
+    car_cols = ", ".join(f'"{c}" TEXT' for c in CAR_HISTORY_COLS)
+    conn.execute(f"CREATE TABLE ONBID_RESULTS ({etc_cols})")
+    conn.execute(f"CREATE TABLE CAR_TABLE ({car_cols})")
+    rows = [
+        ("A-1", "부동산", "토지", "정보", "기관", "2024-01-01", "1000000", "900000.5", None, None, None),
+        ("A-2", "부동산", "토지", "정보", "기관", "2024-01-01", "1,000,000", "", "abc", None, None),
+        ("C-1", "자동차", "승용차", "정보", "기관", "2024-01-01", "5000000", "4,500,000", "4000000", "", None),
+    ]
+    marks = ", ".join("?" * len(ETC_HISTORY_COLS))
+    conn.executemany(f"INSERT INTO ONBID_RESULTS VALUES ({marks})", rows)
+    conn.execute(
+        f'INSERT INTO CAR_TABLE ("{SERIAL_COL}", "대분류", "중분류", "소분류", "제조사", "차종", "물건정보", "기관", '
+        '"최초입찰시기", "1차최저입찰가", "2차최저입찰가", "3차최저입찰가", "4차최저입찰가", "5차최저입찰가") '
+        "VALUES ('C-1', '자동차', '승용차', '소형', '현대', '아반떼', '정보', '기관', '2024-01-01', "
+        "'5000000', '4,500,000', '4000000', '', NULL)")
+    conn.commit()
+    conn.close()
+    return SQLiteBackend(path, pool_size=1)
+
+
+def test_numeric_strings_are_parsed(backend):
+    history = backend.fetch_row("A-1", False)
+    assert history.bids == (1000000.0, 900000.5, None, None, None)
+    assert history.round == 3
+
+
+def test_unparsable_bids_become_none(backend):
+    # 쉼표가 있는 값, 빈 문자열, 문자는 pd.to_numeric(errors="coerce")와 같이 결측 처리
+    # (낙찰차수는 DB에서 NULL 기준으로 계산하므로 빈 문자열도 값이 있는 차수)
+    history = backend.fetch_row("A-2", False)
+    assert history.bids == (None, None, None, None, None)
+    assert history.round == 4
+
+
+def test_fetch_rows_matches_fetch_row(backend):
+    found = backend.fetch_rows(["A-1", "A-2", "missing"], False)
+    assert set(found) == {"A-1", "A-2"}
+    for serial, history in found.items():
+        assert history == backend.fetch_row(serial, False)
+
+    car = backend.fetch_rows(["C-1"], True)["C-1"]
+    assert car == backend.fetch_row("C-1", True)
+    assert car.bids == (5000000.0, None, 4000000.0, None, None)
+    assert car.round == 5
+
+
+def test_from_row_accepts_numbers_and_none():
+    row = ("B-1", "부동산", "토지", "정보", "기관", "2024-01-01", 100, 90.0, None, None, None, 3)
+    assert RoundHistory.from_row(row, False).bids == (100.0, 90.0, None, None, None)
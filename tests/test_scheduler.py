@@ -0,0 +1,72 @@
+import threading
+
+import pandas as pd
+
+from popup import server
+from popup.scheduler import BatchScheduler
+
+
+# 배치마다 호출 수를 세는 모델 (release 전까지 첫 배치에서 멈춤)
+class _Model:
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = 0
+
+    def price_predict_batch(self, df):
+        self.release.wait(5)
+        self.batches += 1
+        return pd.DataFrame({'predicted': df['x'] / 10, 'error': None}, index=df.index)
+
+    def prob_predict_batch(self, df):
+        return pd.Series(0.5, index=df.index)
+
+
+def test_stop_drains_pending_jobs_and_joins():
+    model = _Model()
+    scheduler = BatchScheduler(model, max_wait=0.0, max_size=2)
+    results = [None] * 5
+
+    def call(i):
+        results[i] = scheduler.submit(pd.DataFrame([{'x': float(i)}]), timeout=5)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(5)]
+    for t in threads:
+        t.start()
+    while scheduler.stats()['queue_depth'] + scheduler.stats()['items'] < 5:
+        pass
+    worker = scheduler._thread
+
+    stopper = threading.Thread(target=scheduler.stop)
+    stopper.start()
+    model.release.set()
+    stopper.join(5)
+    for t in threads:
+        t.join(5)
+
+    assert not worker.is_alive()
+    assert results == [(i / 10, 0.5) for i in range(5)]
+
+    # 종료 후 제출은 요청 스레드에서 바로 처리
+    assert scheduler.submit(pd.DataFrame([{'x': 7.0}])) == (0.7, 0.5)
+    assert scheduler._thread is worker
+
+
+def test_reload_model_stops_old_scheduler(monkeypatch):
+    old_model = _Model()
+    old_model.release.set()
+    old = BatchScheduler(old_model, max_wait=0.0)
+    assert old.submit(pd.DataFrame([{'x': 1.0}])) == (0.1, 0.5)
+    worker = old._thread
+
+    monkeypatch.setattr(server, 'PredictModel', _Model)
+    monkeypatch.setattr(server, 'BATCH_ENABLED', True)
+    monkeypatch.setattr(server, 'model', old_model)
+    monkeypatch.setattr(server, 'scheduler', old)
+    monkeypatch.setattr(server, 'item_cache', None)
+    monkeypatch.setattr(server, 'precomputed', None)
+    server.reload_model()
+
+    assert not worker.is_alive()
+    assert server.scheduler is not old and server.scheduler.model is server.model
+    server.scheduler.stop()
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+from popup import serve
+from popup.admission import EXPENSIVE_LIMIT, QUEUE_LIMIT
+
+
+@pytest.mark.skipif("ONBID_THREADS" in os.environ, reason="ONBID_THREADS가 지정되어 기본값을 확인할 수 없음")
+def test_default_threads_leave_room_for_cheap_requests():
+    assert serve.THREADS > EXPENSIVE_LIMIT + QUEUE_LIMIT
+    assert serve.THREADS == EXPENSIVE_LIMIT + QUEUE_LIMIT + max(1, serve.THREADS_RESERVE)
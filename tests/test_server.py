@@ -0,0 +1,128 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from popup import aio
+from popup import server
+from popup.admission import Limiter
+
+
+# 가격 모델 호출 수를 세는 느린 모델 (동시 요청이 한 번의 계산을 기다리도록)
+class _SlowModel:
+
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self.price_calls = 0
+        self._lock = threading.Lock()
+
+    def price_predict(self, df):
+        with self._lock:
+            self.price_calls += 1
+        time.sleep(self.delay)
+        return 0.8
+
+    def prob_predict(self, df):
+        return 0.5
+
+
+PAYLOAD = {'id': '2024-0001-000001', 'category': '부동산 / 토지', 'minBidPrice': 1000000,
+           'failureCount': 0, 'endDate': '2024-01-01 10:00', 'bidAmount': 900000}
+
+
+# 캐시를 쓰지 않으면(ONBID_CACHE=0) 요청마다 항목 객체가 다름: 후속 요청도 먼저 온 요청의 추천 결과를 받아야 함
+def test_concurrent_predict_without_cache(monkeypatch):
+    n = 8
+    model = _SlowModel()
+    arrived = threading.Barrier(n)
+
+    def fresh_entry(data):
+        entry = {'key': server.item_key(data), 'df': pd.DataFrame([{'1차최저입찰가': 1000000.0}]),
+                 'recommend': None, 'degraded': False}
+        arrived.wait(5)
+        return entry
+
+    monkeypatch.setattr(server, 'model', model)
+    monkeypatch.setattr(server, 'scheduler', None)
+    monkeypatch.setattr(server, 'item_cache', None)
+    monkeypatch.setattr(server, 'precomputed', None)
+    monkeypatch.setattr(server, 'expensive_limiter', Limiter('expensive', n, queue=n, wait=10))
+    monkeypatch.setattr(server, '_item_entry', fresh_entry)
+    monkeypatch.setattr(aio, 'ASYNC_ENABLED', False)
+
+    client = server.app.test_client()
+    responses = [None] * n
+
+    def call(i):
+        responses[i] = client.post('/predict', json=PAYLOAD)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(10)
+
+    assert [r.status_code for r in responses] == [200] * n
+    assert all(r.get_json() == {'predicted_rate': 0.5, 'recommend_bid': 800000.0} for r in responses)
+    assert model.price_calls == 1
+
+
+# 확률 곡선 / 분위수 / 확률 계산용 모델
+class _CurveModel:
+
+    def prob_curve(self, df, ratios=None):
+        ratios = np.asarray([0.8, 1.0] if ratios is None else ratios, dtype=float)
+        return ratios, np.full(len(ratios), 0.5)
+
+    def prob_quantile(self, df, probs):
+        return np.asarray(probs, dtype=float) + 0.5
+
+    def prob_predict(self, df):
+        return 0.5
+
+
+@pytest.mark.parametrize('first_min_bid', [0.0, float('nan'), -1000.0, None])
+@pytest.mark.parametrize('endpoint,body', [
+    ('/prob_curve', {'bidAmounts': [900000, 1000000]}),
+    ('/prob_curve', {}),
+    ('/bid_for_prob', {'targetRate': 50}),
+    ('/prob_predict', {'bidAmount': 900000}),
+])
+def test_invalid_first_min_bid_returns_400(monkeypatch, endpoint, body, first_min_bid):
+    entry = {'key': 'k', 'df': pd.DataFrame([{'1차최저입찰가': first_min_bid}]), 'recommend': None, 'degraded': False}
+    monkeypatch.setattr(server, 'model', _CurveModel())
+    monkeypatch.setattr(server, 'scheduler', None)
+    monkeypatch.setattr(server, '_item_entry', lambda data: entry)
+
+    response = server.app.test_client().post(endpoint, json={**PAYLOAD, **body})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': server.INVALID_MIN_BID}
+
+
+def test_valid_first_min_bid(monkeypatch):
+    entry = {'key': 'k', 'df': pd.DataFrame([{'1차최저입찰가': 1000000.0}]), 'recommend': None, 'degraded': False}
+    monkeypatch.setattr(server, 'model', _CurveModel())
+    monkeypatch.setattr(server, 'scheduler', None)
+    monkeypatch.setattr(server, '_item_entry', lambda data: entry)
+    client = server.app.test_client()
+
+    curve = client.post('/prob_curve', json={**PAYLOAD, 'bidAmounts': [900000, 1000000]}).get_json()
+    assert curve['ratios'] == [0.9, 1.0]
+    bid = client.post('/bid_for_prob', json={**PAYLOAD, 'targetRate': 50}).get_json()
+    assert bid['recommend_bid'] == 1000000.0
+
+
+# JSON 본문 오류는 모든 엔드포인트가 같은 응답 (_parse_json)
+@pytest.mark.parametrize('endpoint', ['/predict', '/prob_predict', '/predict_batch', '/prob_curve', '/bid_for_prob'])
+@pytest.mark.parametrize('body,error', [
+    ('{"id": ', 'JSON 형식이 올바르지 않습니다'),
+    ('null', 'JSON 데이터가 없습니다'),
+    ('[1, 2]', 'JSON 객체 형식이어야 합니다'),
+])
+def test_bad_json_body_is_rejected_the_same_way(monkeypatch, endpoint, body, error):
+    monkeypatch.setattr(server, 'model', _CurveModel())
+    response = server.app.test_client().post(endpoint, data=body, content_type='application/json')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
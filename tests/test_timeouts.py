@@ -0,0 +1,72 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import pandas as pd
+import pytest
+
+from popup import aio
+from popup.deadline import TIMEOUT_ERRORS
+from popup.scheduler import BatchScheduler
+from popup.singleflight import FlightTimeout, SingleFlight
+
+
+def test_timeout_errors_cover_all_timeout_classes():
+    for exc in (TimeoutError, concurrent.futures.TimeoutError, asyncio.TimeoutError, FlightTimeout):
+        assert issubclass(exc, TIMEOUT_ERRORS)
+
+
+def test_aio_run_cancels_on_timeout():
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    async def slow():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TIMEOUT_ERRORS):
+        aio.run(slow(), timeout=0.05)
+    assert started.is_set()
+    assert cancelled.wait(1)
+
+
+def test_singleflight_follower_timeout():
+    flight = SingleFlight(timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=flight.do, args=("key", release.wait))
+    leader.start()
+    try:
+        while flight.in_flight() == 0:
+            pass
+        with pytest.raises(FlightTimeout):
+            flight.do("key", lambda: None)
+    finally:
+        release.set()
+        leader.join()
+
+
+# 배치를 처리하지 않고 멈춰 있는 모델
+class _StuckModel:
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def __getattr__(self, name):
+        def stuck(*args, **kwargs):
+            self.release.wait()
+            raise RuntimeError("stuck")
+        return stuck
+
+
+def test_scheduler_submit_timeout_raises_builtin_timeout():
+    model = _StuckModel()
+    scheduler = BatchScheduler(model, max_wait=0.0)
+    try:
+        with pytest.raises(TimeoutError, match="배치 예측"):
+            scheduler.submit(pd.DataFrame([{'x': 1}]), timeout=0.05)
+    finally:
+        model.release.set()